@@ -46,6 +46,38 @@ def remove_framework_files():
         files_to_remove = [
             f"src/{project_slug}/data/datamodule.py",
             f"src/{project_slug}/data/transforms.py",
+            f"src/{project_slug}/data/memmap.py",
+            f"src/{project_slug}/data/parquet.py",
+            f"src/{project_slug}/data/cache.py",
+            f"src/{project_slug}/data/samplers.py",
+            f"src/{project_slug}/data/stats.py",
+            f"src/{project_slug}/data/chunks.py",
+            f"src/{project_slug}/data/shards.py",
+            f"src/{project_slug}/data/images.py",
+            f"src/{project_slug}/data/text.py",
+            f"src/{project_slug}/data/dedup.py",
+            f"src/{project_slug}/cli/tune_data.py",
+            f"src/{project_slug}/cli/dedup.py",
+            f"src/{project_slug}/models/compile.py",
+            f"src/{project_slug}/models/quantize.py",
+            f"src/{project_slug}/evaluation/latency.py",
+            f"src/{project_slug}/cli/quantize.py",
+            f"src/{project_slug}/models/compress.py",
+            f"src/{project_slug}/cli/compress.py",
+            f"src/{project_slug}/models/distill.py",
+            f"src/{project_slug}/cli/distill.py",
+            f"src/{project_slug}/models/ensemble.py",
+            f"src/{project_slug}/training/precision.py",
+            "config/tune_data.yaml",
+            "config/dedup.yaml",
+            "config/quantize.yaml",
+            "config/compress.yaml",
+            "config/distill.yaml",
+            "config/data/imagefolder.yaml",
+            "config/model/compile/none.yaml",
+            "config/model/compile/torchscript.yaml",
+            "config/model/compile/inductor.yaml",
+            "tools/bench_data.py",
         ]
         
         for file_path in files_to_remove:
@@ -53,6 +85,15 @@ def remove_framework_files():
                 os.remove(file_path)
                 print(f"Removed unused file: {file_path}")
 
+        dirs_to_remove = [
+            "config/model/compile",
+        ]
+
+        for dir_path in dirs_to_remove:
+            if os.path.isdir(dir_path) and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+                print(f"Removed unused directory: {dir_path}")
+
 def run_pre_commit_update():
     """Runs 'pre-commit autoupdate' if pre-commit is installed."""
     if shutil.which("pre-commit"):
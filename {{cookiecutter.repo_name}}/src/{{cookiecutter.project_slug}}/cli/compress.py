@@ -0,0 +1,152 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""Hydra entrypoint that compresses a trained MLP into a smaller dense model.
+
+Loads the Lightning checkpoint and applies `compress.methods` in order:
+structured pruning of hidden units, then SVD low-rank factorization of
+the hidden Linear layers. The result is fine-tuned for a few epochs with
+the usual `ClassificationModule`/`fit` path and written as TorchScript
+for `Predictor.load`. Parameters, FLOPs per row, latency and accuracy of
+the base and compressed models go to `compress.json` in the run directory.
+
+    python -m {{cookiecutter.project_slug}}.cli.compress \\
+        compress.checkpoint=checkpoints/<model>/last.ckpt
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+import hydra
+import torch
+from hydra.core.hydra_config import HydraConfig
+from loguru import logger
+from omegaconf import DictConfig, open_dict
+
+from {{cookiecutter.project_slug}}.data.factory import build_datamodule
+from {{cookiecutter.project_slug}}.evaluation.latency import measure_latency
+from {{cookiecutter.project_slug}}.models.compress import (
+    factorize_linears,
+    model_cost,
+    prune_hidden_units,
+)
+from {{cookiecutter.project_slug}}.models.factory import build_lightning_module
+from {{cookiecutter.project_slug}}.models.lightning.modules import ClassificationModule
+from {{cookiecutter.project_slug}}.models.quantize import (
+    evaluate_accuracy,
+    serialized_bytes,
+    to_torchscript,
+)
+from {{cookiecutter.project_slug}}.models.torch.nets import MLPClassifier
+from {{cookiecutter.project_slug}}.training.loops import fit
+from {{cookiecutter.project_slug}}.utils.seed import seed_everything
+
+COMPRESS_METHODS = ("prune", "lowrank")
+
+
+@hydra.main(
+    version_base=None,
+    config_path=str(Path(__file__).resolve().parents[3] / "config"),
+    config_name="compress",
+)
+def main(cfg: DictConfig) -> None:
+    seed_everything(int(cfg.get("seed", 42)))
+    c = cfg.compress
+    unknown = set(c.methods) - set(COMPRESS_METHODS)
+    if unknown or not c.methods:
+        raise ValueError(
+            f"compress.methods must be a non-empty subset of {COMPRESS_METHODS}, "
+            f"got {list(c.methods)}"
+        )
+    with open_dict(cfg):
+        cfg.model.compile = None  # compress the plain eager module
+        cfg.trainer.max_epochs = int(c.finetune_epochs)
+        cfg.trainer.enable_checkpointing = False
+
+    dm = build_datamodule(cfg)
+    dm.setup("fit")
+    lm = build_lightning_module(cfg)
+    state = torch.load(str(c.checkpoint), map_location="cpu", weights_only=False)
+    lm.load_state_dict(state["state_dict"])
+    base = lm.model.eval()
+    transform = lm.batch_transform
+
+    def prepared(batches: Iterable[Any]) -> Iterator[Tuple[torch.Tensor, Any]]:
+        for x, y in batches:
+            yield (transform(x) if transform is not None else x), y
+
+    eval_loader = dm.val_dataloader()
+    if c.eval_split == "test":
+        eval_loader = dm.test_dataloader()
+    # Exported artifacts include the device transform and take raw batches.
+    example = next(iter(dm.val_dataloader()))[0][:1]
+    batch_sizes = [int(b) for b in c.latency_batch_sizes]
+
+    def describe(model: torch.nn.Module) -> Dict[str, Any]:
+        scripted = to_torchscript(model, example, transform)
+        latency = measure_latency(
+            scripted, tuple(example.shape[1:]), batch_sizes, int(c.latency_iters)
+        )
+        return {
+            **model_cost(model).to_dict(),
+            "accuracy": evaluate_accuracy(model.eval(), prepared(eval_loader)),
+            "size_bytes": serialized_bytes(scripted),
+            "latency": {bs: lat.to_dict() for bs, lat in latency.items()},
+            "scripted": scripted,
+        }
+
+    model = base
+    report: Dict[str, Any] = {"methods": list(c.methods)}
+    if "prune" in c.methods:
+        assert isinstance(model, MLPClassifier)
+        model = prune_hidden_units(model, float(c.keep_ratio))
+        report["hidden_width"] = model.head.in_features
+    if "lowrank" in c.methods:
+        model, ranks = factorize_linears(model, float(c.rank_energy))
+        report["ranks"] = ranks
+    report["accuracy_before_finetune"] = evaluate_accuracy(
+        model.eval(), prepared(eval_loader)
+    )
+    if int(c.finetune_epochs) > 0:
+        # Same optimizer settings and device-side transform as training.
+        student = ClassificationModule(
+            model.train(), lm.lr, lm.weight_decay, batch_transform=transform
+        )
+        fit(cfg, lightning_module=student, datamodule=dm)
+        model = student.model
+
+    base_entry, entry = describe(base), describe(model)
+    scripted = entry.pop("scripted")
+    base_entry.pop("scripted")
+    entry["ratio"] = {
+        key: base_entry[key] / entry[key]
+        for key in ("params", "flops_per_row", "size_bytes")
+    }
+    entry["speedup"] = {
+        bs: base_entry["latency"][bs]["p50_ms"] / lat["p50_ms"]
+        for bs, lat in entry["latency"].items()
+    }
+    out_dir = Path(str(c.output_dir))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{cfg.model.name}_compressed.pt"
+    torch.jit.save(scripted, str(path))
+    entry["path"] = str(path)
+    report.update(base=base_entry, compressed=entry)
+    logger.info(
+        "compressed: {:.1f}x fewer params, {:.1f}x fewer FLOPs, p50 speedup {}, "
+        "accuracy {:.4f} (base {:.4f}) -> {}",
+        entry["ratio"]["params"],
+        entry["ratio"]["flops_per_row"],
+        {bs: f"{s:.2f}x" for bs, s in entry["speedup"].items()},
+        entry["accuracy"],
+        base_entry["accuracy"],
+        path,
+    )
+    run_dir = Path(HydraConfig.get().runtime.output_dir)
+    (run_dir / "compress.json").write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+{%- endif %}
@@ -0,0 +1,94 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""Hydra entrypoint that finds exact and near-duplicate rows in the dataset.
+
+Streams the configured dataset (`data=...`), writes a boolean keep mask and
+a JSON report to the run directory. Train with the mask to leave the
+duplicates out of every split:
+
+    python -m {{cookiecutter.project_slug}}.cli.dedup data.format=memmap data.path=data/processed/train
+    python -m {{cookiecutter.project_slug}}.cli.train data.keep_mask=data/processed/train/keep_mask.npy
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import hydra
+from hydra.core.hydra_config import HydraConfig
+from loguru import logger
+from omegaconf import DictConfig
+
+from {{cookiecutter.project_slug}}.data.datamodule import ClassificationDataModule
+from {{cookiecutter.project_slug}}.data.dedup import (
+    KEEP_MASK_FILE,
+    find_duplicates,
+    save_keep_mask,
+)
+from {{cookiecutter.project_slug}}.data.factory import build_datamodule
+
+
+def _default_output(cfg: DictConfig) -> Path:
+    path = Path(str(cfg.data.get("path") or "."))
+    return path / KEEP_MASK_FILE if path.is_dir() else path.with_suffix(".keep.npy")
+
+
+@hydra.main(
+    version_base=None,
+    config_path=str(Path(__file__).resolve().parents[3] / "config"),
+    config_name="dedup",
+)
+def main(cfg: DictConfig) -> None:
+    dedup = cfg.dedup
+    dm = build_datamodule(cfg)
+    fmt = cfg.data.get("format")
+    if not isinstance(dm, ClassificationDataModule):
+        # e.g. streamed Parquet splits: no row positions to mask.
+        raise ValueError(
+            f"data.format={fmt!r} streams pre-split data and cannot be "
+            "deduplicated; use data.format=parquet_table, or write it with "
+            "data.memmap or data.shards first."
+        )
+    try:
+        dataset: Any = dm._build_dataset()
+    except NotImplementedError:
+        raise ValueError(
+            f"data.format={fmt!r} is not a map-style dataset; "
+            "write it with data.memmap or data.shards first."
+        ) from None
+    # Deduplicate the stored rows, not augmented or normalized ones.
+    dataset.transform = None
+
+    near = dedup.get("near")
+    bands = dedup.get("bands")
+    keep, report = find_duplicates(
+        dataset,
+        near=str(near) if near else None,
+        chunk_rows=int(dedup.chunk_rows),
+        max_hamming=int(dedup.max_hamming),
+        threshold=float(dedup.threshold),
+        num_perm=int(dedup.num_perm),
+        ngram=int(dedup.ngram),
+        bands=int(bands) if bands else None,
+        seed=int(cfg.get("seed", 42)),
+    )
+    output = Path(str(dedup.output)) if dedup.get("output") else _default_output(cfg)
+    save_keep_mask(output, keep)
+
+    run_dir = Path(HydraConfig.get().runtime.output_dir)
+    summary = {**report.to_dict(), "keep_mask": str(output)}
+    (run_dir / "dedup.json").write_text(json.dumps(summary, indent=2))
+    logger.info(
+        "Kept {:,} of {:,} rows ({:,} exact, {:,} near duplicates)",
+        report.n_kept,
+        report.n_rows,
+        report.n_exact,
+        report.n_near,
+    )
+    logger.info("Wrote {} (train with data.keep_mask={})", output, output)
+
+
+if __name__ == "__main__":
+    main()
+{%- endif %}
@@ -0,0 +1,172 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""Hydra entrypoint that distills a trained teacher into a small student.
+
+The teacher is rebuilt from `distill.teacher.model` (overrides on top of
+`model`) and `distill.teacher.checkpoint`; its logits over the dataset are
+cached once (see `models.distill`). The student is the configured `model`,
+trained with `DistillationModule` through the usual `fit` path, then
+written as TorchScript for `Predictor.load`. Teacher and student accuracy
+and latency, and whether the student meets `distill.latency_budget_ms`
+(p99 at batch size 1), go to `distill.json` in the run directory.
+
+    python -m {{cookiecutter.project_slug}}.cli.distill \\
+        distill.teacher.checkpoint=checkpoints/<teacher>/last.ckpt \\
+        +distill.teacher.model.hidden_dim=512 model.hidden_dim=64
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+import hydra
+import torch
+from hydra.core.hydra_config import HydraConfig
+from loguru import logger
+from omegaconf import DictConfig, OmegaConf, open_dict
+
+from {{cookiecutter.project_slug}}.data.datamodule import ClassificationDataModule
+from {{cookiecutter.project_slug}}.data.factory import build_datamodule
+from {{cookiecutter.project_slug}}.evaluation.latency import measure_latency
+from {{cookiecutter.project_slug}}.models.distill import (
+    cached_teacher_logits,
+    teacher_logits_key,
+    teacher_version,
+)
+from {{cookiecutter.project_slug}}.models.factory import build_lightning_module
+from {{cookiecutter.project_slug}}.models.lightning.modules import DistillationModule
+from {{cookiecutter.project_slug}}.models.quantize import (
+    evaluate_accuracy,
+    to_torchscript,
+)
+from {{cookiecutter.project_slug}}.training.loops import fit
+from {{cookiecutter.project_slug}}.utils.seed import seed_everything
+
+
+@hydra.main(
+    version_base=None,
+    config_path=str(Path(__file__).resolve().parents[3] / "config"),
+    config_name="distill",
+)
+def main(cfg: DictConfig) -> None:
+    seed_everything(int(cfg.get("seed", 42)))
+    d = cfg.distill
+    with open_dict(cfg):
+        # Keep the student's checkpoints apart from the teacher's.
+        root = cfg.paths.checkpoints_root
+        cfg.paths.checkpoints_dir = f"{root}/{cfg.model.name}-student"
+    teacher_cfg = cfg.copy()
+    with open_dict(teacher_cfg):
+        teacher_cfg.model = OmegaConf.merge(cfg.model, d.teacher.get("model") or {})
+        teacher_cfg.model.compile = None
+
+    dm = build_datamodule(cfg)
+    if not isinstance(dm, ClassificationDataModule):
+        # Teacher logits are stored per row position, which streams lack.
+        raise ValueError(
+            f"data.format={cfg.data.get('format')!r} streams pre-split data; "
+            "distillation needs a map-style dataset."
+        )
+    dm.setup("fit")
+    teacher_lm = build_lightning_module(teacher_cfg)
+    state = torch.load(
+        str(d.teacher.checkpoint), map_location="cpu", weights_only=False
+    )
+    teacher_lm.load_state_dict(state["state_dict"])
+    teacher = teacher_lm.model.eval()
+
+    version = d.teacher.get("version") or teacher_version(teacher)
+    key = teacher_logits_key(
+        str(version), dm.dataset_fingerprint(), teacher_lm.batch_transform
+    )
+    dm.soft_targets = str(
+        cached_teacher_logits(
+            d.cache_dir,
+            key,
+            teacher,
+            dm.dataset,
+            teacher_lm.batch_transform,
+            chunk_rows=int(d.chunk_rows),
+            device=str(d.teacher.device),
+        )
+    )
+    teacher.cpu()
+
+    lm = build_lightning_module(cfg)
+    student_lm = DistillationModule(
+        lm.model,
+        lm.lr,
+        lm.weight_decay,
+        batch_transform=lm.batch_transform,
+        warmup=lm.warmup,
+        temperature=float(d.temperature),
+        alpha=float(d.alpha),
+    )
+    fit(cfg, lightning_module=student_lm, datamodule=dm)
+    student = student_lm.model.cpu().eval()
+
+    transform = lm.batch_transform
+
+    def prepared(batches: Iterable[Any]) -> Iterator[Tuple[torch.Tensor, Any]]:
+        for x, y, *_ in batches:
+            yield (transform(x) if transform is not None else x), y
+
+    eval_loader = dm.val_dataloader()
+    if d.eval_split == "test":
+        eval_loader = dm.test_dataloader()
+    # Exported artifacts include the device transform and take raw batches.
+    example = next(iter(dm.val_dataloader()))[0][:1]
+    batch_sizes = [int(b) for b in d.latency_batch_sizes]
+
+    def describe(
+        model: torch.nn.Module, scripted: torch.jit.ScriptModule
+    ) -> Dict[str, Any]:
+        latency = measure_latency(
+            scripted, tuple(example.shape[1:]), batch_sizes, int(d.latency_iters)
+        )
+        return {
+            "accuracy": evaluate_accuracy(model, prepared(eval_loader)),
+            "latency": {bs: lat.to_dict() for bs, lat in latency.items()},
+        }
+
+    scripted = to_torchscript(student, example, transform)
+    teacher_scripted = to_torchscript(teacher, example, teacher_lm.batch_transform)
+    report: Dict[str, Any] = {
+        "teacher_version": str(version),
+        "teacher_logits": dm.soft_targets,
+        "teacher": describe(teacher, teacher_scripted),
+        "student": describe(student, scripted),
+    }
+    budget = float(d.latency_budget_ms)
+    p99 = report["student"]["latency"][1]["p99_ms"] if 1 in batch_sizes else None
+    report["latency_budget_ms"] = budget
+    report["within_budget"] = p99 is not None and bool(p99 <= budget)
+
+    out_dir = Path(str(d.output_dir))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{cfg.model.name}_student.pt"
+    torch.jit.save(scripted, str(path))
+    report["path"] = str(path)
+    run_dir = Path(HydraConfig.get().runtime.output_dir)
+    (run_dir / "distill.json").write_text(json.dumps(report, indent=2))
+    logger.info(
+        "student accuracy {:.4f} (teacher {:.4f}), p99 at batch 1: {} ms "
+        "(budget {} ms) -> {}",
+        report["student"]["accuracy"],
+        report["teacher"]["accuracy"],
+        f"{p99:.3f}" if p99 is not None else "n/a",
+        budget,
+        path,
+    )
+    if not report["within_budget"]:
+        logger.warning(
+            "Student misses the {} ms p99 budget; shrink model.hidden_dim/"
+            "num_layers or compress it (cli.compress, cli.quantize).",
+            budget,
+        )
+
+
+if __name__ == "__main__":
+    main()
+{%- endif %}
@@ -0,0 +1,136 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""Hydra entrypoint that quantizes a trained model to int8 for CPU serving.
+
+Loads the Lightning checkpoint, builds dynamic and/or static int8 variants
+(static calibrated on validation batches), compares their accuracy with
+fp32 on the evaluation split and measures latency. Variants within
+`quantize.max_accuracy_drop` are written as TorchScript for
+`Predictor.load`; the full comparison goes to `quantize.json` in the run
+directory.
+
+    python -m {{cookiecutter.project_slug}}.cli.quantize \\
+        quantize.checkpoint=checkpoints/<model>/last.ckpt
+"""
+
+from __future__ import annotations
+
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+import hydra
+import torch
+from hydra.core.hydra_config import HydraConfig
+from loguru import logger
+from omegaconf import DictConfig, open_dict
+
+from {{cookiecutter.project_slug}}.data.factory import build_datamodule
+from {{cookiecutter.project_slug}}.evaluation.latency import measure_latency
+from {{cookiecutter.project_slug}}.models.factory import build_lightning_module
+from {{cookiecutter.project_slug}}.models.quantize import (
+    check_accuracy,
+    evaluate_accuracy,
+    quantize_model,
+    serialized_bytes,
+    to_torchscript,
+)
+from {{cookiecutter.project_slug}}.utils.seed import seed_everything
+
+
+@hydra.main(
+    version_base=None,
+    config_path=str(Path(__file__).resolve().parents[3] / "config"),
+    config_name="quantize",
+)
+def main(cfg: DictConfig) -> None:
+    seed_everything(int(cfg.get("seed", 42)))
+    q = cfg.quantize
+    with open_dict(cfg):
+        cfg.model.compile = None  # quantize the plain eager module
+
+    dm = build_datamodule(cfg)
+    dm.setup("fit")
+    lm = build_lightning_module(cfg)
+    state = torch.load(str(q.checkpoint), map_location="cpu", weights_only=False)
+    lm.load_state_dict(state["state_dict"])
+    fp32 = lm.model.eval()
+    transform = lm.batch_transform
+
+    def prepared(batches: Iterable[Any]) -> Iterator[Tuple[torch.Tensor, Any]]:
+        for x, y in batches:
+            yield (transform(x) if transform is not None else x), y
+
+    eval_loader = dm.val_dataloader()
+    if q.eval_split == "test":
+        eval_loader = dm.test_dataloader()
+    calib_batches = islice(dm.val_dataloader(), int(q.calibration_batches))
+    calibration = [x for x, _ in prepared(calib_batches)]
+    # Exported artifacts include the device transform and take raw batches.
+    example = next(iter(dm.val_dataloader()))[0][:1]
+    input_shape = tuple(example.shape[1:])
+    batch_sizes = [int(b) for b in q.latency_batch_sizes]
+
+    def describe(
+        model: torch.nn.Module, scripted: torch.jit.ScriptModule
+    ) -> Dict[str, Any]:
+        latency = measure_latency(
+            scripted, input_shape, batch_sizes, int(q.latency_iters)
+        )
+        return {
+            "accuracy": evaluate_accuracy(model, prepared(eval_loader)),
+            "size_bytes": serialized_bytes(scripted),
+            "latency": {bs: lat.to_dict() for bs, lat in latency.items()},
+        }
+
+    report: Dict[str, Any] = {
+        "fp32": describe(fp32, to_torchscript(fp32, example, transform))
+    }
+    fp32_acc = report["fp32"]["accuracy"]
+    out_dir = Path(str(q.output_dir))
+    written = []
+    for method in q.methods:
+        qmodel = quantize_model(fp32, str(method), calibration, engine=str(q.engine))
+        scripted = to_torchscript(qmodel, example, transform)
+        entry = describe(qmodel, scripted)
+        entry["accuracy_drop"] = fp32_acc - entry["accuracy"]
+        entry["accepted"] = check_accuracy(
+            fp32_acc, entry["accuracy"], float(q.max_accuracy_drop)
+        )
+        entry["speedup"] = {
+            bs: report["fp32"]["latency"][bs]["p50_ms"] / lat["p50_ms"]
+            for bs, lat in entry["latency"].items()
+        }
+        if entry["accepted"]:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            path = out_dir / f"{cfg.model.name}_int8_{method}.pt"
+            torch.jit.save(scripted, str(path))
+            entry["path"] = str(path)
+            written.append(path)
+        report[str(method)] = entry
+        logger.info(
+            "{}: accuracy {:.4f} (fp32 {:.4f}), size {:.1f}x smaller, "
+            "p50 speedup {} -> {}",
+            method,
+            entry["accuracy"],
+            fp32_acc,
+            report["fp32"]["size_bytes"] / entry["size_bytes"],
+            {bs: f"{s:.2f}x" for bs, s in entry["speedup"].items()},
+            entry.get("path", "rejected: accuracy drop above tolerance"),
+        )
+
+    report["engine"] = str(q.engine)
+    report["max_accuracy_drop"] = float(q.max_accuracy_drop)
+    run_dir = Path(HydraConfig.get().runtime.output_dir)
+    (run_dir / "quantize.json").write_text(json.dumps(report, indent=2))
+    if not written:
+        raise RuntimeError(
+            f"No int8 variant stayed within quantize.max_accuracy_drop="
+            f"{q.max_accuracy_drop} of fp32 accuracy {fp32_acc:.4f}; "
+            f"see {run_dir / 'quantize.json'}."
+        )
+
+
+if __name__ == "__main__":
+    main()
+{%- endif %}
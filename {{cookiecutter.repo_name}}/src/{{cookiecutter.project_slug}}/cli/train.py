@@ -17,14 +17,19 @@ from {{cookiecutter.project_slug}}.data.factory import build_datamodule
 {% if cookiecutter.ml_framework == 'pytorch' %}
 from {{cookiecutter.project_slug}}.models.factory import build_lightning_module
 from {{cookiecutter.project_slug}}.training.loops import fit
+from {{cookiecutter.project_slug}}.training.precision import maybe_check_precision_parity
 from {{cookiecutter.project_slug}}.evaluation.evaluate import maybe_run_offline_eval
 {% elif cookiecutter.ml_framework == 'tensorflow' %}
 from {{cookiecutter.project_slug}}.models.factory import build_keras_model
 {% endif %}
 from {{cookiecutter.project_slug}}.utils.seed import seed_everything
 from {{cookiecutter.project_slug}}.integrations.mlflow import (
+    log_dataset_digest,
     log_resolved_config,
     maybe_init_mlflow,
+{%- if cookiecutter.ml_framework == 'pytorch' %}
+    maybe_log_artifact,
+{%- endif %}
     set_standard_tags,
 )
 
@@ -50,6 +55,7 @@ def main(cfg: DictConfig) -> None:
         with mlflow_ctx:
             set_standard_tags(cfg)
             log_resolved_config(cfg, artifact_path="config")
+            log_dataset_digest(cfg)
             _run_training(cfg)
     else:
         _run_training(cfg)
@@ -61,6 +67,12 @@ def _run_training(cfg: DictConfig) -> None:
     {% if cookiecutter.ml_framework == 'pytorch' %}
     lm = build_lightning_module(cfg)
     trainer = fit(cfg, lightning_module=lm, datamodule=dm)
+    if dm.stats is not None:
+        # Serving needs the training normalization (`Predictor.from_stats`).
+        maybe_log_artifact(dm.stats.save(Path.cwd() / "data_stats.json"), "data")
+    parity = maybe_check_precision_parity(cfg, trainer, dm, lm, out_dir=Path.cwd())
+    if parity is not None:
+        maybe_log_artifact(Path.cwd() / "precision_parity.json", "precision")
     maybe_run_offline_eval(cfg, trainer=trainer, datamodule=dm, lightning_module=lm)
     {% elif cookiecutter.ml_framework == 'tensorflow' %}
     logger.info("Initializing Keras model...")
@@ -0,0 +1,197 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""Hydra entrypoint that tunes DataLoader settings for this machine.
+
+Benchmarks combinations of `data.batch_size`, `data.num_workers`,
+`data.pin_memory` and `data.persistent_workers` against the configured
+dataset, reports samples/sec and peak memory, and writes the fastest
+combination as a data config variant (`data=tuned`).
+
+    python -m {{cookiecutter.project_slug}}.cli.tune_data
+    python -m {{cookiecutter.project_slug}}.cli.tune_data data=imagenet tune.budget_s=30
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import hydra
+import torch
+from hydra.core.hydra_config import HydraConfig
+from loguru import logger
+from omegaconf import DictConfig
+
+from {{cookiecutter.project_slug}}.data.factory import DataModule, build_datamodule
+from {{cookiecutter.project_slug}}.utils.memory import format_bytes, memory_report
+from {{cookiecutter.project_slug}}.utils.seed import seed_everything
+
+KNOBS = ("batch_size", "num_workers", "pin_memory", "persistent_workers")
+
+
+class _PeakMemory:
+    """Samples total RSS/PSS of this process and its workers in the background."""
+
+    def __init__(self, interval_s: float = 0.2):
+        self.interval_s = interval_s
+        self.rss = 0
+        self.pss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        report = memory_report()
+        self.rss = max(self.rss, sum(m["rss"] for m in report.values()))
+        self.pss = max(self.pss, sum(m["pss"] for m in report.values()))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def __enter__(self) -> "_PeakMemory":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _combinations(tune: DictConfig) -> List[Dict[str, Any]]:
+    pin_options = list(tune.pin_memory)
+    if not torch.cuda.is_available() and any(pin_options):
+        logger.info("No CUDA device: only trying pin_memory=false")
+        pin_options = [False]
+    combos = []
+    for bs, nw, pin, persistent in itertools.product(
+        tune.batch_size, tune.num_workers, pin_options, tune.persistent_workers
+    ):
+        if persistent and int(nw) == 0:
+            continue  # no workers to keep alive
+        combos.append(
+            {
+                "batch_size": int(bs),
+                "num_workers": int(nw),
+                "pin_memory": bool(pin),
+                "persistent_workers": bool(persistent),
+            }
+        )
+    return combos
+
+
+def _benchmark(
+    dm: DataModule, budget_s: float, warmup_batches: int
+) -> Dict[str, float]:
+    """Iterate train epochs for `budget_s` seconds after `warmup_batches`."""
+    loader = dm.train_dataloader()
+    n_samples = 0
+    with _PeakMemory() as peak:
+        batches = iter(loader)
+        for _ in range(warmup_batches):
+            if next(batches, None) is None:
+                batches = iter(loader)
+        t0 = time.perf_counter()
+        while True:
+            for x, _y in batches:
+                n_samples += len(x)
+                if time.perf_counter() - t0 >= budget_s:
+                    break
+            elapsed = time.perf_counter() - t0
+            if elapsed >= budget_s:
+                break
+            # A new epoch: without persistent_workers this restarts the workers,
+            # which is part of what is being measured.
+            batches = iter(loader)
+        del batches
+    return {
+        "samples_per_sec": n_samples / elapsed,
+        "peak_rss_bytes": peak.rss,
+        "peak_pss_bytes": peak.pss,
+    }
+
+
+def _write_override(
+    path: Path, parent: str, winner: Dict[str, Any], result: Dict[str, float]
+) -> None:
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    lines = [
+        f"# Generated by cli.tune_data on {socket.gethostname()} at {stamp}.",
+        f"# {result['samples_per_sec']:,.0f} samples/sec,"
+        f" peak RSS {format_bytes(result['peak_rss_bytes'])}"
+        f" (PSS {format_bytes(result['peak_pss_bytes'])}).",
+        "# Use with: data=tuned (re-run the tuner after hardware or dataset changes).",
+        "defaults:",
+        f"  - {parent}",
+        "  - _self_",
+        "",
+        *(f"{k}: {json.dumps(winner[k])}" for k in KNOBS),
+        "",
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines))
+
+
+@hydra.main(
+    version_base=None,
+    config_path=str(Path(__file__).resolve().parents[3] / "config"),
+    config_name="tune_data",
+)
+def main(cfg: DictConfig) -> None:
+    seed_everything(int(cfg.get("seed", 42)))
+    tune = cfg.tune
+    parent = HydraConfig.get().runtime.choices.get("data", "base")
+    if parent == "tuned":
+        raise ValueError("Tune from the source variant (e.g. data=base), not tuned.")
+
+    dm = build_datamodule(cfg)
+    dm.setup("fit")
+    base_cfg = dm.dm_cfg
+    max_bytes = (
+        float(tune.max_memory_gb) * 1024**3 if tune.get("max_memory_gb") else None
+    )
+
+    results = []
+    for combo in _combinations(tune):
+        dm.dm_cfg = dataclasses.replace(base_cfg, **combo)
+        result = _benchmark(dm, float(tune.budget_s), int(tune.warmup_batches))
+        results.append({**combo, **result})
+        logger.info(
+            "bs={batch_size:<6} workers={num_workers:<3} pin={pin_memory!s:<5} "
+            "persistent={persistent_workers!s:<5} -> {sps:>12,.0f} samples/sec, "
+            "peak rss {rss} (pss {pss})",
+            **combo,
+            sps=result["samples_per_sec"],
+            rss=format_bytes(result["peak_rss_bytes"]),
+            pss=format_bytes(result["peak_pss_bytes"]),
+        )
+    dm.dm_cfg = base_cfg
+
+    run_dir = Path(HydraConfig.get().runtime.output_dir)
+    (run_dir / "tune_data.json").write_text(json.dumps(results, indent=2))
+
+    eligible = [
+        r for r in results if max_bytes is None or r["peak_pss_bytes"] <= max_bytes
+    ]
+    if not eligible:
+        raise RuntimeError(
+            f"No combination stayed under tune.max_memory_gb={tune.max_memory_gb}."
+        )
+    best = max(eligible, key=lambda r: r["samples_per_sec"])
+    winner = {k: best[k] for k in KNOBS}
+    output = Path(str(tune.output))
+    _write_override(output, parent, winner, best)
+    logger.info("Best: {} ({:,.0f} samples/sec)", winner, best["samples_per_sec"])
+    logger.info("Wrote {} (select with data=tuned)", output)
+
+
+if __name__ == "__main__":
+    main()
+{%- endif %}
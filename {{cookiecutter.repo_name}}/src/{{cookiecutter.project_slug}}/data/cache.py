@@ -0,0 +1,178 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import marshal
+import os
+import shutil
+import types
+import uuid
+from pathlib import Path
+from typing import Any, Callable, FrozenSet, Optional, Set, Union
+
+import numpy as np
+import torch
+from loguru import logger
+
+from {{cookiecutter.project_slug}}.data.memmap import META_FILE
+
+_DATA_TYPES = (bool, int, float, str, list, tuple, dict, np.ndarray, torch.Tensor)
+
+
+def _code_digest(code: types.CodeType) -> str:
+    # Marshalled code objects hold bytecode, constants and names; the file
+    # path and line numbers are dropped so the key survives moving the repo.
+    def strip(c: types.CodeType) -> types.CodeType:
+        consts = tuple(
+            strip(k) if isinstance(k, types.CodeType) else k for k in c.co_consts
+        )
+        return c.replace(
+            co_filename="", co_firstlineno=1, co_linetable=b"", co_consts=consts
+        )
+
+    return hashlib.sha256(marshal.dumps(strip(code))).hexdigest()
+
+
+def _global_names(code: types.CodeType) -> Set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _describe_globals(func: Any, _seen: FrozenSet[int]) -> Any:
+    # Module-level values the function reads, e.g. a scale constant or a helper
+    # it calls. Modules, classes and other objects (loggers, devices, ...) are
+    # described by name only, since their state is not part of the transform.
+    scope = getattr(func, "__globals__", {})
+    described = {}
+    for name in sorted(_global_names(func.__code__)):
+        if name not in scope:
+            continue
+        value = scope[name]
+        if isinstance(value, types.ModuleType):
+            described[name] = {"module": value.__name__}
+        elif isinstance(value, _DATA_TYPES) or hasattr(value, "__code__"):
+            described[name] = _describe(value, _seen)
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            described[name] = _describe(value, _seen)
+        else:
+            kind = value if isinstance(value, type) else type(value)
+            described[name] = {"type": f"{kind.__module__}.{kind.__qualname__}"}
+    return described
+
+
+def _describe(obj: Any, _seen: FrozenSet[int] = frozenset()) -> Any:
+    # Stable, JSON-serializable description of configs and transform pipelines.
+    # Default reprs contain memory addresses, so objects are described by their
+    # type and state instead.
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, (list, tuple)):
+        return [_describe(o, _seen) for o in obj]
+    if isinstance(obj, dict):
+        return {str(k): _describe(v, _seen) for k, v in sorted(obj.items())}
+    if isinstance(obj, (np.ndarray, torch.Tensor)):
+        arr = obj.detach().cpu().numpy() if isinstance(obj, torch.Tensor) else obj
+        arr = np.ascontiguousarray(arr)
+        return {
+            "array": hashlib.sha256(arr.tobytes()).hexdigest(),
+            "dtype": str(arr.dtype),
+            "shape": list(arr.shape),
+        }
+    kind = f"{type(obj).__module__}.{type(obj).__qualname__}"
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {"type": kind, "fields": _describe(dataclasses.asdict(obj), _seen)}
+    if hasattr(obj, "__func__") and hasattr(obj, "__self__"):
+        return {
+            "method": _describe(obj.__func__, _seen),
+            "self": _describe(obj.__self__, _seen),
+        }
+    if callable(obj) and hasattr(obj, "__code__"):
+        # Plain functions and closures (e.g. `transforms.compose`). The code
+        # digest catches edited lambdas (`x * 2` -> `x * 3`) that keep the same
+        # qualified name; closure cells and referenced globals are folded in.
+        if id(obj) in _seen:
+            return {"function": f"{obj.__module__}.{obj.__qualname__}"}
+        _seen = _seen | {id(obj)}
+        cells = [c.cell_contents for c in (obj.__closure__ or ())]
+        return {
+            "function": f"{obj.__module__}.{obj.__qualname__}",
+            "code": _code_digest(obj.__code__),
+            "closure": _describe(cells, _seen),
+            "globals": _describe_globals(obj, _seen),
+        }
+    if hasattr(obj, "__dict__"):
+        return {"type": kind, "state": _describe(vars(obj), _seen)}
+    return {"type": kind, "repr": repr(obj)}
+
+
+def fingerprint(*parts: Any) -> str:
+    """Content hash of configs, transforms and seeds (order-sensitive)."""
+    payload = json.dumps(_describe(list(parts)), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class DatasetCache:
+    """
+    Content-addressed on-disk cache of materialized datasets.
+
+    Entries live in `root/<key>` and are built into a temporary directory,
+    then renamed into place, so concurrent jobs (e.g. Hydra multirun) never
+    observe partial entries; if two jobs race, the first rename wins. The
+    directory mtime records last use, and least-recently-used entries are
+    evicted once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def get_or_build(self, key: str, build: Callable[[Path], object]) -> Path:
+        final = self.root / key
+        if (final / META_FILE).exists():
+            os.utime(final)
+            logger.info("Dataset cache hit: {}", final)
+            return final
+
+        logger.info("Dataset cache miss; building {}", final)
+        tmp = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            build(tmp)
+            os.rename(tmp, final)
+        except OSError:
+            if not (final / META_FILE).exists():
+                raise
+            # Another job finished the same entry first.
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+        return final
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        if self.max_bytes is None:
+            return
+        entries = [
+            p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")
+        ]
+        sizes = {p: _dir_size(p) for p in entries}
+        total = sum(sizes.values())
+        for p in sorted(entries, key=lambda p: p.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if p.name == keep:
+                continue
+            logger.info("Evicting dataset cache entry {}", p)
+            shutil.rmtree(p, ignore_errors=True)
+            total -= sizes[p]
+{%- endif %}
@@ -0,0 +1,103 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+
+class ChunkedDataset(Dataset[Tuple[torch.Tensor, torch.Tensor]]):
+    """
+    Map-style dataset over a store that decodes whole chunks at a time
+    (Parquet row groups, compressed blocks, HDF5/zarr chunks).
+
+    Subclasses set `chunk_offsets` (`[n_chunks + 1]` row boundaries) and
+    implement `_read_chunk(i) -> (X, y)`. Decoded chunks are kept in an LRU of
+    `cache_chunks` entries. The cache is dropped when the dataset is pickled,
+    so each DataLoader worker has its own; within a process it is safe to
+    share between threads (see `compute_dataset_stats`). Pair with `ChunkShuffleSampler` so
+    that each worker touches few chunks at a time; `decodes` counts cache
+    misses, which measures read amplification.
+    """
+
+    chunk_offsets: np.ndarray
+
+    def __init__(
+        self,
+        cache_chunks: int = 16,
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    ):
+        self.cache_chunks = cache_chunks
+        self.transform = transform
+        self.decodes = 0
+        self._cache: "OrderedDict[int, Chunk]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _read_chunk(self, i: int) -> Chunk:
+        raise NotImplementedError
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.chunk_offsets) - 1
+
+    def chunk_of(self, rows: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.chunk_offsets, rows, side="right") - 1
+
+    def _chunk(self, i: int) -> Chunk:
+        with self._lock:
+            chunk = self._cache.get(i)
+            if chunk is not None:
+                self._cache.move_to_end(i)
+                return chunk
+        # Decoded outside the lock; two threads may occasionally both decode.
+        chunk = self._read_chunk(i)
+        with self._lock:
+            self.decodes += 1
+            self._cache[i] = chunk
+            while len(self._cache) > self.cache_chunks:
+                self._cache.popitem(last=False)
+        return chunk
+
+    def __len__(self) -> int:
+        return int(self.chunk_offsets[-1])
+
+    def __getitem__(self, idx: Any) -> Tuple[torch.Tensor, torch.Tensor]:
+        rows = np.asarray(idx)
+        flat = rows.reshape(-1)
+        chunk_ids = self.chunk_of(flat)
+        # Group rows by chunk so every chunk is looked up once per batch.
+        order = np.argsort(chunk_ids, kind="stable")
+        uniq, starts = np.unique(chunk_ids[order], return_index=True)
+        xs: Optional[np.ndarray] = None
+        ys: Optional[np.ndarray] = None
+        for c, group in zip(uniq.tolist(), np.split(order, starts[1:])):
+            cx, cy = self._chunk(c)
+            if xs is None or ys is None:
+                xs = np.empty((len(flat), *cx.shape[1:]), dtype=cx.dtype)
+                ys = np.empty(len(flat), dtype=cy.dtype)
+            local = flat[group] - self.chunk_offsets[c]
+            xs[group] = cx[local]
+            ys[group] = cy[local]
+        assert xs is not None and ys is not None
+        x = torch.from_numpy(xs.reshape(*rows.shape, *xs.shape[1:]))
+        y = torch.from_numpy(ys.reshape(rows.shape))
+        if self.transform:
+            x = self.transform(x)
+        return x, y
+{%- endif %}
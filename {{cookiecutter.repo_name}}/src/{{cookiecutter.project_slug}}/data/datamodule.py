@@ -1,14 +1,55 @@
 {% if cookiecutter.ml_framework == 'pytorch' %}
 
 from dataclasses import dataclass
-from typing import Callable, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Union, cast
 
+import numpy as np
 import pytorch_lightning as pl
-from torch.utils.data import DataLoader, Subset
+from torch.utils.data import (
+    BatchSampler,
+    DataLoader,
+    Dataset,
+    SequentialSampler,
+    Subset,
+)
 
-from {{cookiecutter.project_slug}}.data.datasets import RandomClassificationDataset, RandomDatasetConfig
-from {{cookiecutter.project_slug}}.data.splits import random_split_indices
-from {{cookiecutter.project_slug}}.data.transforms import Identity
+from {{cookiecutter.project_slug}}.data.cache import DatasetCache, fingerprint
+from {{cookiecutter.project_slug}}.data.datasets import (
+    BatchedSubset,
+    RandomClassificationDataset,
+    RandomDatasetConfig,
+    SoftTargetDataset,
+)
+from {{cookiecutter.project_slug}}.data.dedup import load_keep_mask
+from {{cookiecutter.project_slug}}.data.images import ImageFolderDataset, cached_image_folder
+from {{cookiecutter.project_slug}}.data.memmap import (
+    FEATURES_FILE,
+    MemmapClassificationDataset,
+    materialize_dataset,
+)
+from {{cookiecutter.project_slug}}.data.parquet import (
+    ParquetChunkedDataset,
+    ParquetIterableDataset,
+    parquet_files,
+)
+from {{cookiecutter.project_slug}}.data.samplers import (
+    ChunkShuffleSampler,
+    LengthBucketSampler,
+    ResumableSampler,
+    WeightedAliasSampler,
+)
+from {{cookiecutter.project_slug}}.data.shards import BLOCKS_FILE, ShardClassificationDataset
+from {{cookiecutter.project_slug}}.data.splits import Split, cached_split, split_indices
+from {{cookiecutter.project_slug}}.data.stats import (
+    DatasetStats,
+    cached_stats,
+    compute_batch_stats,
+    compute_dataset_stats,
+)
+from {{cookiecutter.project_slug}}.data.text import TokenizedTextDataset, cached_tokens
+from {{cookiecutter.project_slug}}.data.transforms import Identity, append_transform
+from {{cookiecutter.project_slug}}.utils.memory import log_worker_memory
 
 
 @dataclass(frozen=True)
@@ -20,63 +61,621 @@ class DataModuleConfig:
     seed: int = 42
     val_frac: float = 0.1
     test_frac: float = 0.1
+    # Fetch each batch with one fancy-index instead of per-row __getitem__ +
+    # collate. Transforms then receive `[B, F]` batches.
+    batch_fetch: bool = True
+    # Persist the transformed dataset under `cache_dir` (see `data.cache`).
+    cache_dir: Optional[str] = None
+    cache_max_bytes: Optional[int] = None
+    # random | stratified (by label) | group (by the dataset's `groups`)
+    split_mode: str = "random"
+    # Persist split indices under this directory (see `splits.cached_split`).
+    split_cache_dir: Optional[str] = None
+    # Back in-memory datasets with shared memory, created once in the main
+    # process, so workers do not each hold a copy (memmap data is already shared).
+    share_memory: bool = False
+    # Log each DataLoader worker's RSS/PSS/USS when it starts.
+    log_worker_memory: bool = False
+    # Standardize features with statistics of the training data (after the
+    # other transforms); cached as JSON under `stats_dir` (see `data.stats`).
+    normalize: bool = False
+    stats_dir: Optional[str] = None
+    # full: uniform permutation | chunk: shuffle chunk order, then rows within
+    # windows of `shuffle_buffer_chunks` chunks (chunked stores, see
+    # `ChunkShuffleSampler`); also the Parquet streaming shuffle buffer.
+    # length: batches of similar-length rows drawn from pools of
+    # `length_bucket_batches` batches (text, see `LengthBucketSampler`).
+    shuffle_mode: str = "full"
+    shuffle_buffer_chunks: int = 8
+    length_bucket_batches: int = 100
+    # Draw training rows with replacement so classes appear in proportion to
+    # these weights: "balanced" (equal) or one weight per class. None keeps
+    # the plain shuffle. `epoch_samples` draws per epoch (default: the split).
+    class_weights: Optional[Any] = None
+    epoch_samples: Optional[int] = None
+    # Boolean `.npy` mask from `cli.dedup`: rows marked False are left out
+    # of every split (see `data.dedup`).
+    keep_mask: Optional[str] = None
 
 
-class RandomDataModule(pl.LightningDataModule):
+class ClassificationDataModule(pl.LightningDataModule):
+    """
+    Splits a map-style dataset into train/val/test loaders.
+
+    Training order comes from a `ResumableSampler`; its position is saved in
+    Lightning checkpoints through `state_dict`, so resuming from a mid-epoch
+    checkpoint continues at the next unseen batch.
+    """
+
     def __init__(
         self,
-        ds_cfg: RandomDatasetConfig,
         dm_cfg: DataModuleConfig,
-        transform: Optional[Callable] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
     ):
         super().__init__()
-        self.ds_cfg = ds_cfg
         self.dm_cfg = dm_cfg
         self.transform = transform or Identity()
-        self._dataset = None
-        self._split = None
+        # Any map-style dataset with `y` (and `transform` for normalization).
+        self._dataset: Any = None
+        self._split: Optional[Split] = None
+        self._train_sampler: Optional[ResumableSampler] = None
+        self._sampler_state: Optional[Dict[str, Any]] = None
+        self.stats: Optional[DatasetStats] = None
+        self.stats_path: Optional[Path] = None
+        # `.npy` of per-row soft targets (teacher logits, see `models.distill`);
+        # when set, batches become `(x, y, targets)`.
+        self.soft_targets: Optional[str] = None
 
-    def setup(self, stage: Optional[str] = None) -> None:
-        self._dataset = RandomClassificationDataset(
-            self.ds_cfg, transform=self.transform, seed=self.dm_cfg.seed
+    @property
+    def dataset(self) -> Dataset[Any]:
+        """The full dataset in row order, with its transforms (after `setup`)."""
+        assert self._dataset is not None
+        dataset: Dataset[Any] = self._dataset
+        return dataset
+
+    def dataset_fingerprint(self) -> str:
+        """Identifies the rows of `dataset`, transforms and normalization included."""
+        return fingerprint(
+            "rows", self._cache_key(), self.transform, self.dm_cfg.seed, self.stats
         )
-        self._split = random_split_indices(
-            n=len(self._dataset),
-            seed=self.dm_cfg.seed,
-            val_frac=self.dm_cfg.val_frac,
-            test_frac=self.dm_cfg.test_frac,
+
+    def _build_dataset(self) -> Dataset[Any]:
+        raise NotImplementedError
+
+    def _cache_key(self) -> Any:
+        """
+        Identifies the untransformed dataset for the transform cache; must not
+        need `_build_dataset`, so a cache hit never builds the source.
+        """
+        raise NotImplementedError
+
+    def _cached(self, cache_dir: str) -> Dataset[Any]:
+        cache = DatasetCache(cache_dir, self.dm_cfg.cache_max_bytes)
+        key = fingerprint(self._cache_key(), self.transform, self.dm_cfg.seed)
+        path = cache.get_or_build(
+            key, lambda tmp: materialize_dataset(tmp, self._build_dataset())
         )
+        return MemmapClassificationDataset(path)
+
+    def setup(self, stage: Optional[str] = None) -> None:
+        if self.dm_cfg.cache_dir is not None:
+            self._dataset = self._cached(self.dm_cfg.cache_dir)
+        else:
+            self._dataset = self._build_dataset()
+        if self.dm_cfg.share_memory and hasattr(self._dataset, "share_memory_"):
+            self._dataset.share_memory_()
+        self._split = self._make_split(self._dataset)
+        if self.dm_cfg.normalize:
+            self.stats = self._train_stats()
+            self._dataset.transform = append_transform(
+                self._dataset.transform, self.stats.standardize()
+            )
+        if self.soft_targets is not None:
+            self._dataset = SoftTargetDataset(self._dataset, self.soft_targets)
+
+    def _train_stats(self) -> DatasetStats:
+        cfg = self.dm_cfg
 
-    def train_dataloader(self):
         assert self._dataset is not None and self._split is not None
-        return DataLoader(
-            Subset(self._dataset, self._split.train_idx),
-            batch_size=self.dm_cfg.batch_size,
-            shuffle=True,
-            num_workers=self.dm_cfg.num_workers,
-            pin_memory=self.dm_cfg.pin_memory,
-            persistent_workers=self.dm_cfg.persistent_workers,
+        dataset, train_idx = self._dataset, np.asarray(self._split.train_idx)
+
+        def compute() -> DatasetStats:
+            return compute_dataset_stats(dataset, train_idx, seed=cfg.seed)
+
+        if cfg.stats_dir is None:
+            return compute()
+        key = fingerprint(
+            "train-stats",
+            self._cache_key(),
+            self.transform,
+            [cfg.seed, cfg.split_mode, cfg.val_frac, cfg.test_frac],
         )
+        stats, self.stats_path = cached_stats(cfg.stats_dir, key, compute)
+        return stats
 
-    def val_dataloader(self):
-        assert self._dataset is not None and self._split is not None
+    def _make_split(self, dataset: Any) -> Split:
+        cfg = self.dm_cfg
+        labels = groups = None
+        if cfg.split_mode == "stratified":
+            labels = dataset.y.numpy()
+        elif cfg.split_mode == "group":
+            groups = getattr(dataset, "groups", None)
+        kwargs: Dict[str, Any] = dict(
+            n=len(dataset),
+            seed=cfg.seed,
+            val_frac=cfg.val_frac,
+            test_frac=cfg.test_frac,
+            mode=cfg.split_mode,
+            labels=labels,
+            groups=groups,
+            keep=(
+                load_keep_mask(cfg.keep_mask, len(dataset))
+                if cfg.keep_mask is not None
+                else None
+            ),
+        )
+        if cfg.split_cache_dir is not None:
+            return cached_split(cfg.split_cache_dir, **kwargs)
+        return split_indices(**kwargs)
+
+    def _worker_init_fn(self) -> Optional[Callable[[int], None]]:
+        if self.dm_cfg.log_worker_memory and self.dm_cfg.num_workers > 0:
+            return log_worker_memory
+        return None
+
+    def _train_sampler_for(
+        self, subset: Union[BatchedSubset, Subset[Any]]
+    ) -> ResumableSampler:
+        cfg = self.dm_cfg
+        batch_size = cfg.batch_size if cfg.batch_fetch else None
+        sampler: ResumableSampler
+        if cfg.class_weights is not None:
+            if cfg.shuffle_mode != "full":
+                raise ValueError("data.class_weights needs data.shuffle_mode=full")
+            sampler = WeightedAliasSampler(
+                subset,
+                labels=np.asarray(self._dataset.y)[np.asarray(subset.indices)],
+                class_weights=cfg.class_weights,
+                epoch_samples=cfg.epoch_samples,
+                seed=cfg.seed,
+                batch_size=batch_size,
+            )
+        elif cfg.shuffle_mode == "chunk":
+            chunk_of = getattr(self._dataset, "chunk_of", None)
+            if chunk_of is None:
+                raise ValueError(
+                    "data.shuffle_mode=chunk needs a chunked dataset "
+                    "(e.g. format: parquet_table, without the transform cache)"
+                )
+            sampler = ChunkShuffleSampler(
+                subset,
+                chunk_of(np.asarray(subset.indices)),
+                buffer_chunks=cfg.shuffle_buffer_chunks,
+                num_workers=cfg.num_workers,
+                lane_batch_size=cfg.batch_size,
+                shuffle=True,
+                seed=cfg.seed,
+                batch_size=batch_size,
+            )
+        elif cfg.shuffle_mode == "length":
+            lengths = getattr(self._dataset, "lengths", None)
+            if lengths is None:
+                raise ValueError(
+                    "data.shuffle_mode=length needs a dataset with `lengths` "
+                    "(e.g. format: text)"
+                )
+            sampler = LengthBucketSampler(
+                subset,
+                lengths[np.asarray(subset.indices)],
+                bucket_batches=cfg.length_bucket_batches,
+                bucket_batch_size=cfg.batch_size,
+                shuffle=True,
+                seed=cfg.seed,
+                batch_size=batch_size,
+            )
+        elif cfg.shuffle_mode == "full":
+            sampler = ResumableSampler(
+                subset, shuffle=True, seed=cfg.seed, batch_size=batch_size
+            )
+        else:
+            raise ValueError(
+                f"Unknown shuffle mode {cfg.shuffle_mode!r}; expected full|chunk|length"
+            )
+        if self._sampler_state is not None:
+            sampler.load_state_dict(self._sampler_state)
+            self._sampler_state = None
+        self._train_sampler = sampler
+        return sampler
+
+    def _loader(self, indices: np.ndarray, shuffle: bool) -> DataLoader[Any]:
+        if self.dm_cfg.batch_fetch:
+            batched = BatchedSubset(self._dataset, indices)
+            sampler: Union[ResumableSampler, BatchSampler]
+            if shuffle:
+                sampler = self._train_sampler_for(batched)
+            else:
+                sampler = BatchSampler(
+                    SequentialSampler(batched), self.dm_cfg.batch_size, drop_last=False
+                )
+            return DataLoader(
+                batched,
+                sampler=sampler,
+                batch_size=None,
+                num_workers=self.dm_cfg.num_workers,
+                pin_memory=self.dm_cfg.pin_memory,
+                persistent_workers=self.dm_cfg.persistent_workers,
+                worker_init_fn=self._worker_init_fn(),
+            )
+        # `Subset` only indexes and measures `indices`, which an array does too.
+        subset: Subset[Any] = Subset(self._dataset, cast(Sequence[int], indices))
         return DataLoader(
-            Subset(self._dataset, self._split.val_idx),
+            subset,
             batch_size=self.dm_cfg.batch_size,
-            shuffle=False,
+            sampler=self._train_sampler_for(subset) if shuffle else None,
             num_workers=self.dm_cfg.num_workers,
             pin_memory=self.dm_cfg.pin_memory,
             persistent_workers=self.dm_cfg.persistent_workers,
+            worker_init_fn=self._worker_init_fn(),
         )
 
-    def test_dataloader(self):
+    def train_dataloader(self) -> DataLoader[Any]:
         assert self._dataset is not None and self._split is not None
-        return DataLoader(
-            Subset(self._dataset, self._split.test_idx),
+        return self._loader(self._split.train_idx, shuffle=True)
+
+    def val_dataloader(self) -> DataLoader[Any]:
+        assert self._dataset is not None and self._split is not None
+        return self._loader(self._split.val_idx, shuffle=False)
+
+    def test_dataloader(self) -> DataLoader[Any]:
+        assert self._dataset is not None and self._split is not None
+        return self._loader(self._split.test_idx, shuffle=False)
+
+    def on_before_batch_transfer(self, batch: Any, dataloader_idx: int) -> Any:
+        # Runs once per batch the training loop consumes (after worker prefetch),
+        # which is what a checkpoint has actually trained on.
+        trainer = self.trainer
+        if trainer is not None and trainer.training and self._train_sampler is not None:
+            self._train_sampler.advance(len(batch[1]))
+        return batch
+
+    def state_dict(self) -> Dict[str, Any]:
+        if self._train_sampler is None:
+            return {}
+        return {"train_sampler": self._train_sampler.state_dict()}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        # Lightning restores the datamodule before requesting dataloaders, so
+        # the state is applied when the training sampler is built.
+        state = state_dict.get("train_sampler")
+        if state is None:
+            return
+        if self._train_sampler is not None:
+            self._train_sampler.load_state_dict(state)
+        else:
+            self._sampler_state = state
+
+
+class RandomDataModule(ClassificationDataModule):
+    def __init__(
+        self,
+        ds_cfg: RandomDatasetConfig,
+        dm_cfg: DataModuleConfig,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(dm_cfg, transform=transform)
+        self.ds_cfg = ds_cfg
+
+    def _build_dataset(self) -> Dataset[Any]:
+        return RandomClassificationDataset(
+            self.ds_cfg, transform=self.transform, seed=self.dm_cfg.seed
+        )
+
+    def _cache_key(self) -> Any:
+        return self.ds_cfg
+
+
+class MemmapDataModule(ClassificationDataModule):
+    """Serves a dataset written by `data.memmap.MemmapDatasetWriter`."""
+
+    def __init__(
+        self,
+        path: str,
+        dm_cfg: DataModuleConfig,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(dm_cfg, transform=transform)
+        self.path = path
+
+    def _build_dataset(self) -> Dataset[Any]:
+        return MemmapClassificationDataset(self.path, transform=self.transform)
+
+    def _cache_key(self) -> Any:
+        stat = (Path(self.path) / FEATURES_FILE).stat()
+        return [str(Path(self.path).resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+class ImageFolderDataModule(ClassificationDataModule):
+    """
+    Images under `path/<class>/...`, decoded and resized once into a uint8
+    memmap cache (see `data.images`) and served from it every epoch.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dm_cfg: DataModuleConfig,
+        image_size: Sequence[int] = (224, 224),
+        image_cache_dir: str = ".cache/images",
+        classmap_file: Optional[str] = None,
+        n_jobs: Optional[int] = None,
+        image_cache_max_bytes: Optional[int] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(dm_cfg, transform=transform)
+        self.path = path
+        height, width = image_size
+        self.image_size = (int(height), int(width))
+        self.image_cache_dir = image_cache_dir
+        self.classmap_file = classmap_file
+        self.n_jobs = n_jobs
+        self.image_cache_max_bytes = image_cache_max_bytes
+        self._entry: Optional[Path] = None
+
+    def _image_entry(self) -> Path:
+        if self._entry is None:
+            self._entry = cached_image_folder(
+                self.path,
+                self.image_cache_dir,
+                self.image_size,
+                classmap_file=self.classmap_file,
+                n_jobs=self.n_jobs,
+                max_bytes=self.image_cache_max_bytes,
+            )
+        return self._entry
+
+    def _build_dataset(self) -> Dataset[Any]:
+        return ImageFolderDataset(self._image_entry(), transform=self.transform)
+
+    def _cache_key(self) -> Any:
+        # The entry name is already a content key of the files and image size.
+        return self._image_entry().name
+
+
+class TextDataModule(ClassificationDataModule):
+    """
+    Text classification from local files, tokenized once into a token cache
+    (see `data.text`). Batches are `({"input_ids", "attention_mask"}, labels)`
+    padded per batch, so batched fetching is required.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dm_cfg: DataModuleConfig,
+        tokenizer_path: str,
+        token_cache_dir: str = ".cache/tokens",
+        text_column: str = "text",
+        label_column: str = "label",
+        max_len: int = 512,
+        num_proc: Optional[int] = None,
+        digest_cache_dir: Optional[str] = None,
+    ):
+        if not dm_cfg.batch_fetch:
+            raise ValueError("format: text needs data.batch_fetch=true")
+        if dm_cfg.normalize or dm_cfg.cache_dir is not None:
+            raise ValueError(
+                "format: text does not support data.normalize or data.cache"
+            )
+        super().__init__(dm_cfg)
+        self.path = path
+        self.tokenizer_path = tokenizer_path
+        self.token_cache_dir = token_cache_dir
+        self.text_column = text_column
+        self.label_column = label_column
+        self.max_len = max_len
+        self.num_proc = num_proc
+        self.digest_cache_dir = digest_cache_dir
+        self._entry: Optional[Path] = None
+
+    def _token_entry(self) -> Path:
+        if self._entry is None:
+            self._entry = cached_tokens(
+                self.path,
+                self.tokenizer_path,
+                self.token_cache_dir,
+                text_column=self.text_column,
+                label_column=self.label_column,
+                max_len=self.max_len,
+                num_proc=self.num_proc,
+                digest_cache_dir=self.digest_cache_dir,
+            )
+        return self._entry
+
+    def _build_dataset(self) -> Dataset[Any]:
+        return TokenizedTextDataset(self._token_entry())
+
+    def _cache_key(self) -> Any:
+        return self._token_entry().name
+
+
+class ShardDataModule(ClassificationDataModule):
+    """Serves a dataset written by `data.shards.ShardDatasetWriter`."""
+
+    def __init__(
+        self,
+        path: str,
+        dm_cfg: DataModuleConfig,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(dm_cfg, transform=transform)
+        self.path = path
+
+    def _build_dataset(self) -> Dataset[Any]:
+        return ShardClassificationDataset(
+            self.path,
+            # A batch can straddle two shuffle windows.
+            cache_chunks=2 * self.dm_cfg.shuffle_buffer_chunks,
+            transform=self.transform,
+        )
+
+    def _cache_key(self) -> Any:
+        stat = (Path(self.path) / BLOCKS_FILE).stat()
+        return [str(Path(self.path).resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+class ParquetTableDataModule(ClassificationDataModule):
+    """
+    Random access to one Parquet table (file or directory of files), split by
+    the datamodule like the in-memory formats. Row groups are decoded whole
+    and kept in a per-worker LRU sized for the chunk shuffle windows.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dm_cfg: DataModuleConfig,
+        label_column: str = "label",
+        feature_columns: Optional[Sequence[str]] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(dm_cfg, transform=transform)
+        self.path = path
+        self.label_column = label_column
+        self.feature_columns = feature_columns
+
+    def _build_dataset(self) -> Dataset[Any]:
+        return ParquetChunkedDataset(
+            self.path,
+            label_column=self.label_column,
+            feature_columns=self.feature_columns,
+            # A batch can straddle two shuffle windows.
+            cache_chunks=2 * self.dm_cfg.shuffle_buffer_chunks,
+            transform=self.transform,
+        )
+
+    def _cache_key(self) -> Any:
+        files = [
+            [str(f.resolve()), f.stat().st_size, f.stat().st_mtime_ns]
+            for f in parquet_files(Path(self.path))
+        ]
+        return [files, self.label_column, self.feature_columns]
+
+
+class ParquetDataModule(pl.LightningDataModule):
+    """
+    Streams pre-split Parquet data from `path/<split>` (file or directory).
+
+    `splits` maps train/val/test to locations relative to `path` (absolute
+    paths are used as-is); it defaults to `train/`, `val/` and `test/`.
+    The training stream shuffles rows within windows of
+    `shuffle_buffer_chunks` row groups for both `shuffle_mode` full and
+    chunk. Options that need random access to one table (`keep_mask`,
+    `class_weights`, `split_mode`, `shuffle_mode=length`) are rejected: use
+    `ParquetTableDataModule` (`format: parquet_table`) for those.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dm_cfg: DataModuleConfig,
+        splits: Optional[Dict[str, str]] = None,
+        label_column: str = "label",
+        feature_columns: Optional[Sequence[str]] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__()
+        unsupported = {
+            "data.keep_mask": dm_cfg.keep_mask is not None,
+            "data.class_weights": dm_cfg.class_weights is not None,
+            f"data.split_mode={dm_cfg.split_mode}": dm_cfg.split_mode != "random",
+            f"data.shuffle_mode={dm_cfg.shuffle_mode}": dm_cfg.shuffle_mode
+            not in ("full", "chunk"),
+        }
+        rejected = [name for name, used in unsupported.items() if used]
+        if rejected:
+            raise ValueError(
+                f"{', '.join(rejected)} not supported for streamed Parquet "
+                "splits; use data.format=parquet_table to split one table."
+            )
+        self.path = Path(path)
+        self.dm_cfg = dm_cfg
+        self.splits = dict(splits or {s: s for s in ("train", "val", "test")})
+        self.label_column = label_column
+        self.feature_columns = feature_columns
+        self.transform = transform or Identity()
+        self.stats: Optional[DatasetStats] = None
+        self.stats_path: Optional[Path] = None
+        self._loader_transform = self.transform
+        self._train_dataset: Optional[ParquetIterableDataset] = None
+
+    def set_epoch(self, epoch: int) -> None:
+        """Reshuffle the training stream for `epoch` (called each train epoch)."""
+        if self._train_dataset is not None:
+            self._train_dataset.set_epoch(epoch)
+
+    def _split_dataset(
+        self, split: str, shuffle: bool, **kwargs: Any
+    ) -> ParquetIterableDataset:
+        return ParquetIterableDataset(
+            self.path / self.splits[split],
+            label_column=self.label_column,
+            feature_columns=self.feature_columns,
+            shuffle=shuffle,
+            seed=self.dm_cfg.seed,
+            **kwargs,
+        )
+
+    def setup(self, stage: Optional[str] = None) -> None:
+        if not self.dm_cfg.normalize or self.stats is not None:
+            return
+        train = self._split_dataset(
+            "train", shuffle=False, batch_size=65536, transform=self.transform
+        )
+
+        def compute() -> DatasetStats:
+            return compute_batch_stats(train, seed=self.dm_cfg.seed)
+
+        if self.dm_cfg.stats_dir is None:
+            self.stats = compute()
+        else:
+            files = [
+                (str(f.resolve()), f.stat().st_size, f.stat().st_mtime_ns)
+                for f in train.files
+            ]
+            key = fingerprint(
+                "train-stats", files, train.feature_columns, self.transform
+            )
+            self.stats, self.stats_path = cached_stats(
+                self.dm_cfg.stats_dir, key, compute
+            )
+        self._loader_transform = append_transform(
+            self.transform, self.stats.standardize()
+        )
+
+    def _loader(self, split: str, shuffle: bool) -> DataLoader[Any]:
+        ds = self._split_dataset(
+            split,
+            shuffle,
             batch_size=self.dm_cfg.batch_size,
-            shuffle=False,
+            transform=self._loader_transform,
+            shuffle_buffer_chunks=self.dm_cfg.shuffle_buffer_chunks,
+        )
+        if split == "train":
+            self._train_dataset = ds
+        return DataLoader(
+            ds,
+            batch_size=None,
             num_workers=self.dm_cfg.num_workers,
             pin_memory=self.dm_cfg.pin_memory,
             persistent_workers=self.dm_cfg.persistent_workers,
         )
+
+    def train_dataloader(self) -> DataLoader[Any]:
+        return self._loader("train", shuffle=True)
+
+    def val_dataloader(self) -> DataLoader[Any]:
+        return self._loader("val", shuffle=False)
+
+    def test_dataloader(self) -> DataLoader[Any]:
+        return self._loader("test", shuffle=False)
 {% endif %}
@@ -1,49 +1,157 @@
 {% if cookiecutter.ml_framework == 'pytorch' %}
 
 from dataclasses import dataclass
-from typing import Callable, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sized, Tuple, Union
 
+import numpy as np
 import torch
 from torch.utils.data import Dataset
 
+from {{cookiecutter.project_slug}}.data.rng import counter_integers, counter_normal
+
 
 @dataclass(frozen=True)
 class RandomDatasetConfig:
     n_samples: int = 1000
     n_features: int = 32
     n_classes: int = 2
+    # Generate rows on demand instead of materializing X/y up front.
+    lazy: bool = False
 
 
-class RandomClassificationDataset(Dataset):
+class RandomClassificationDataset(Dataset[Tuple[torch.Tensor, torch.Tensor]]):
     """
     A synthetic dataset for classification tasks.
+
+    Every row is a pure function of `(seed, index)` (counter-based Philox, see
+    `data.rng`), so lazy mode produces exactly the rows eager mode would hold
+    in memory while using O(batch) memory.
     """
 
     def __init__(
         self,
         cfg: RandomDatasetConfig,
-        transform: Optional[Callable] = None,
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
         seed: int = 42,
+        chunk_rows: int = 65536,
     ):
         self.cfg = cfg
         self.transform = transform
-        
-        # Determine generator for reproducibility
-        g = torch.Generator()
-        g.manual_seed(seed)
-        
-        self.X = torch.randn(cfg.n_samples, cfg.n_features, generator=g)
-        self.y = torch.randint(0, cfg.n_classes, (cfg.n_samples,), generator=g)
+        self.seed = seed
+        self._y: Optional[torch.Tensor] = None
+
+        self.X: Optional[torch.Tensor] = None
+        if not cfg.lazy:
+            self.X = torch.empty(cfg.n_samples, cfg.n_features)
+            for start in range(0, cfg.n_samples, chunk_rows):
+                rows = np.arange(start, min(start + chunk_rows, cfg.n_samples))
+                self.X[start : start + len(rows)] = self._features(rows)
+            self._y = self._labels(np.arange(cfg.n_samples))
+
+    def _features(self, rows: np.ndarray) -> torch.Tensor:
+        return torch.from_numpy(counter_normal(rows, self.cfg.n_features, self.seed))
+
+    def _labels(self, rows: np.ndarray) -> torch.Tensor:
+        return torch.from_numpy(counter_integers(rows, self.cfg.n_classes, self.seed))
+
+    @property
+    def y(self) -> torch.Tensor:
+        # Labels are cheap (8 bytes/row), so lazy mode materializes them on first
+        # use for consumers that need the full label vector (e.g. splitting).
+        if self._y is None:
+            self._y = self._labels(np.arange(self.cfg.n_samples))
+        return self._y
+
+    def share_memory_(self) -> "RandomClassificationDataset":
+        """
+        Move `X`/`y` into shared memory (POSIX shm) so DataLoader workers map
+        one copy instead of each holding their own: pickling to spawned workers
+        sends a handle, and forked workers never copy-on-write the pages.
+        """
+        if self.X is not None:
+            self.X.share_memory_()  # type: ignore[no-untyped-call]
+        self.y.share_memory_()  # type: ignore[no-untyped-call]
+        return self
 
     def __len__(self) -> int:
         return self.cfg.n_samples
 
-    def __getitem__(self, idx: int):
-        x, y = self.X[idx], self.y[idx]
+    def __getitem__(self, idx: Any) -> Tuple[torch.Tensor, torch.Tensor]:
+        # `idx` may be an int or an array of indices (see `BatchedSubset`).
+        if self.X is not None:
+            x, y = self.X[idx], self.y[idx]
+        else:
+            rows = np.asarray(idx)
+            x = self._features(rows).reshape(*rows.shape, self.cfg.n_features)
+            y = self._labels(rows).reshape(rows.shape)
         if self.transform:
             x = self.transform(x)
         return x, y
 
+
+class BatchedSubset(Dataset[Any]):
+    """
+    A `Subset` whose `__getitem__` takes a whole batch of positions.
+
+    Meant to be driven by a `BatchSampler` with `DataLoader(batch_size=None)`:
+    each batch becomes a single fancy-index into the wrapped dataset's backing
+    arrays, and the dataset's transform runs once on the `[B, F]` batch.
+    """
+
+    def __init__(self, dataset: Dataset[Any], indices: Any):
+        self.dataset = dataset
+        self.indices = np.asarray(indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, idx: Any) -> Any:
+        return self.dataset[self.indices[idx]]
+
+
+class SoftTargetDataset(Dataset[Tuple[Any, Any, torch.Tensor]]):
+    """
+    Appends per-row soft targets (e.g. cached teacher logits) to each row.
+
+    Rows become `(x, y, targets)`, with `targets` read from the `.npy` file
+    at `path` (row `i` belongs to row `i` of `dataset`). Accepts index
+    arrays like the wrapped dataset; other attributes (`y`, `lengths`, ...)
+    are forwarded to it.
+    """
+
+    def __init__(self, dataset: Dataset[Any], path: Union[str, Path]):
+        assert isinstance(dataset, Sized)
+        self.dataset = dataset
+        self.path = Path(path)
+        self._targets: Optional[np.ndarray] = None
+        if len(self._arrays()) != len(dataset):
+            raise ValueError(
+                f"{self.path} holds {len(self._arrays())} rows, "
+                f"dataset has {len(dataset)}"
+            )
+
+    def _arrays(self) -> np.ndarray:
+        # Mapped lazily so workers map the file instead of unpickling a copy.
+        if self._targets is None:
+            self._targets = np.load(self.path, mmap_mode="r")
+        return self._targets
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, "_targets": None}
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "dataset":  # not yet set (e.g. while unpickling)
+            raise AttributeError(name)
+        return getattr(self.dataset, name)
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, idx: Any) -> Tuple[Any, Any, torch.Tensor]:
+        x, y = self.dataset[idx]
+        return x, y, torch.from_numpy(np.array(self._arrays()[idx]))
+
 {% elif cookiecutter.ml_framework == 'tensorflow' %}
 
 from dataclasses import dataclass
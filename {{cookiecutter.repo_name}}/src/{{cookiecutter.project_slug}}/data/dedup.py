@@ -0,0 +1,407 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""
+Exact and near-duplicate detection for processed datasets.
+
+`find_duplicates` streams a map-style dataset in index batches (so memory
+stays at a few bytes per row, not the dataset) and returns a boolean keep
+mask: the first row of every duplicate cluster is kept. Save it with
+`save_keep_mask` and point `data.keep_mask` at it; splits are then drawn
+from kept rows only, so a duplicate cannot land on both sides of a split.
+
+- exact: a vectorized 64-bit hash per row, then byte-for-byte verification
+  of hash collisions, so no row is dropped on a hash match alone.
+- simhash (dense features): 64 random-hyperplane bits of the standardized
+  row; a pair is near-duplicate within `max_hamming` bits.
+- minhash (token rows): MinHash of token n-gram shingles; a pair is
+  near-duplicate when the estimated Jaccard similarity >= `threshold`.
+
+Near-duplicate candidates come from LSH banding (rows sharing a band of the
+signature), and clusters are joined transitively. Only signatures are held
+in memory: 8 bytes per row for simhash, `4 * num_perm` for minhash.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sized, Tuple, Union
+
+import numpy as np
+from loguru import logger
+from torch.utils.data import Dataset
+
+KEEP_MASK_FILE = "keep_mask.npy"
+NEAR_METHODS = ("simhash", "minhash")
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+@dataclass(frozen=True)
+class DedupReport:
+    n_rows: int
+    n_exact: int  # rows dropped as exact copies of an earlier row
+    n_near: int  # rows dropped as near-duplicates (after the exact pass)
+    n_candidates: int  # LSH candidate pairs that were checked
+    method: Optional[str]
+
+    @property
+    def n_kept(self) -> int:
+        return self.n_rows - self.n_exact - self.n_near
+
+    def to_dict(self) -> Dict[str, object]:
+        return {**asdict(self), "n_kept": self.n_kept}
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer; uint64 arithmetic wraps, which is intended.
+    h = h + _GOLDEN
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    mixed: np.ndarray = h ^ (h >> np.uint64(31))
+    return mixed
+
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    counts: np.ndarray
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        counts = np.bitwise_count(x)
+    else:
+        bits = np.unpackbits(np.ascontiguousarray(x).view(np.uint8))
+        counts = bits.reshape(len(x), -1).sum(1)
+    return counts
+
+
+def _canonical_bytes(x: np.ndarray) -> np.ndarray:
+    """`[B, ...]` rows as `[B, nbytes]` uint8, with -0.0 and all NaNs unified."""
+    x = np.asarray(x)
+    x = x.reshape(len(x), -1)
+    if np.issubdtype(x.dtype, np.floating):
+        x = np.where(np.isnan(x), np.nan, x + 0.0).astype(x.dtype)
+    return np.ascontiguousarray(x).view(np.uint8).reshape(len(x), -1)
+
+
+def row_hashes(x: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    64-bit hash of each row of `x`, vectorized over rows.
+
+    With `mask` (`[B, L]` bool, e.g. an attention mask), only masked-in
+    positions are hashed, so the same row hashes alike at any padded width.
+    """
+    if mask is not None:
+        x = np.where(mask, np.asarray(x).astype(np.uint64), 0).astype(np.uint64)
+        words = x.reshape(len(x), -1)
+        mask = np.asarray(mask, dtype=bool).reshape(len(x), -1)
+        h = _mix(mask.sum(1).astype(np.uint64))
+        for j in range(words.shape[1]):
+            h = np.where(mask[:, j], _mix(h ^ words[:, j]), h)
+        return h
+    raw = _canonical_bytes(x)
+    pad = -raw.shape[1] % 8
+    if pad:
+        raw = np.pad(raw, ((0, 0), (0, pad)))
+    words = np.ascontiguousarray(raw).view(np.uint64)
+    h = np.full(len(raw), np.uint64(raw.shape[1]))
+    for j in range(words.shape[1]):
+        h = _mix(h ^ words[:, j])
+    return h
+
+
+def _to_numpy(batch: Any) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Token batches are `{"input_ids", "attention_mask"}` dicts.
+    if isinstance(batch, dict):
+        return (
+            np.asarray(batch["input_ids"]),
+            np.asarray(batch["attention_mask"]).astype(bool),
+        )
+    return np.asarray(batch), None
+
+
+def _batches(
+    dataset: Dataset[Any], rows: np.ndarray, chunk_rows: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+    for start in range(0, len(rows), chunk_rows):
+        idx = rows[start : start + chunk_rows]
+        x, mask = _to_numpy(dataset[idx][0])
+        yield idx, x, mask
+
+
+def _same_rows(
+    a: np.ndarray,
+    b: np.ndarray,
+    mask_a: Optional[np.ndarray],
+    mask_b: Optional[np.ndarray],
+) -> np.ndarray:
+    same: np.ndarray
+    if mask_a is None or mask_b is None:
+        same = (_canonical_bytes(a) == _canonical_bytes(b)).all(1)
+        return same
+    # Padding is -1 (never a token id), compared at a common width.
+    width = max(a.shape[1], b.shape[1])
+    padded = []
+    for t, m in ((a, mask_a), (b, mask_b)):
+        t = np.where(m, t, -1)
+        padded.append(np.pad(t, [(0, 0), (0, width - t.shape[1])], constant_values=-1))
+    same = (padded[0] == padded[1]).all(1)
+    return same
+
+
+def _leaders(keys: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `(members, leaders)`: every row whose key repeats, paired with the first
+    (lowest-index) row holding that key. `rows` must be ascending.
+    """
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    group_start = np.flatnonzero(starts)[np.cumsum(starts) - 1]
+    dup = ~starts
+    return rows[order[dup]], rows[order[group_start[dup]]]
+
+
+def _exact_duplicates(
+    dataset: Dataset[Any], n: int, chunk_rows: int
+) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """Boolean `[n]` mask of exact duplicates, plus per-feature mean/std."""
+    hashes = np.empty(n, dtype=np.uint64)
+    total = sq = None
+    for idx, x, mask in _batches(dataset, np.arange(n), chunk_rows):
+        hashes[idx] = row_hashes(x, mask)
+        if mask is None:
+            xf = x.reshape(len(x), -1).astype(np.float64)
+            total = xf.sum(0) if total is None else total + xf.sum(0)
+            sq = (xf**2).sum(0) if sq is None else sq + (xf**2).sum(0)
+
+    members, leaders = _leaders(hashes, np.arange(n))
+    del hashes
+    dup = np.zeros(n, dtype=bool)
+    # Verify collisions on the actual bytes, a chunk of pairs at a time.
+    for start in range(0, len(members), chunk_rows):
+        m, ld = members[start : start + chunk_rows], leaders[start : start + chunk_rows]
+        xm, mm = _to_numpy(dataset[m][0])
+        xl, ml = _to_numpy(dataset[ld][0])
+        dup[m[_same_rows(xm, xl, mm, ml)]] = True
+
+    if total is None or sq is None:
+        return dup, None, None
+    mean = total / max(n, 1)
+    std = np.sqrt(np.maximum(sq / max(n, 1) - mean**2, 0.0))
+    return dup, mean, np.where(std > 0, std, 1.0)
+
+
+def simhash(x: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """64-bit SimHash of each row: the signs of 64 random projections."""
+    bits = (x.reshape(len(x), -1).astype(np.float32) @ planes) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view(np.uint64).reshape(-1)
+
+
+def minhash(
+    ids: np.ndarray,
+    mask: np.ndarray,
+    params: Tuple[np.ndarray, np.ndarray],
+    ngram: int = 3,
+) -> np.ndarray:
+    """
+    `[B, P]` uint32 MinHash signatures of each row's token `ngram` shingles,
+    using the `P` multiply-shift hashes `(a * s + b) >> 32` in `params`.
+    """
+    # Zero padding, and pad to at least one shingle, so a row's signature
+    # does not depend on the width of the batch it was read in.
+    ids = np.where(mask, ids, 0).astype(np.uint64)
+    ids = np.pad(ids, ((0, 0), (0, max(ngram - ids.shape[1], 0))))
+    lengths = mask.sum(1)
+    width = ids.shape[1] - ngram + 1
+    shingles = np.zeros((len(ids), width), dtype=np.uint64)
+    for k in range(ngram):
+        shingles = _mix(shingles ^ ids[:, k : k + width])
+    # Rows shorter than one shingle hash what they have.
+    n_shingles = np.maximum(lengths - ngram + 1, np.minimum(lengths, 1))
+    empty = np.arange(width) >= n_shingles[:, None]
+    a, b = params
+    sig = np.empty((len(ids), len(a)), dtype=np.uint32)
+    for p in range(len(a)):
+        hp = ((shingles * a[p] + b[p]) >> np.uint64(32)).astype(np.uint32)
+        hp[empty] = np.iinfo(np.uint32).max
+        sig[:, p] = hp.min(1)
+    return sig
+
+
+def _band_keys(sig: np.ndarray, band: int, bands: int) -> np.ndarray:
+    if sig.ndim == 1:  # simhash: `bands` slices of the 64 bits
+        width = 64 // bands
+        return (sig >> np.uint64(band * width)) & np.uint64((1 << width) - 1)
+    rows = sig.shape[1] // bands  # minhash: hash of each band's columns
+    h = np.full(len(sig), np.uint64(band))
+    for col in sig[:, band * rows : (band + 1) * rows].T.astype(np.uint64):
+        h = _mix(h ^ col)
+    return h
+
+
+def _bucket_pairs(
+    keys: np.ndarray, secondary: np.ndarray, window: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Candidate pairs: rows sharing a key that are within `window` places of
+    each other once sorted by `(key, secondary)`. Bounded work per row, where
+    comparing all pairs inside a bucket is quadratic in its size.
+    """
+    order = np.lexsort((secondary, keys))
+    sorted_keys = keys[order]
+    a, b = [], []
+    for offset in range(1, window + 1):
+        same = sorted_keys[offset:] == sorted_keys[:-offset]
+        a.append(order[offset:][same])
+        b.append(order[:-offset][same])
+    return np.concatenate(a), np.concatenate(b)
+
+
+def _components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Smallest member of each connected component, by min-label propagation."""
+    label = np.arange(n)
+    while len(a):
+        prev = label.copy()
+        np.minimum.at(label, a, label[b])
+        np.minimum.at(label, b, label[a])
+        label = label[label]
+        if np.array_equal(label, prev):
+            break
+    return label
+
+
+def _signatures(
+    dataset: Dataset[Any],
+    rows: np.ndarray,
+    method: str,
+    chunk_rows: int,
+    num_perm: int,
+    ngram: int,
+    seed: int,
+    mean: Optional[np.ndarray],
+    std: Optional[np.ndarray],
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if method == "simhash":
+        if mean is None:
+            raise ValueError("simhash needs dense feature rows; use minhash for tokens")
+        planes = rng.standard_normal((len(mean), 64)).astype(np.float32)
+        sig = np.empty(len(rows), dtype=np.uint64)
+    else:
+        params = (
+            rng.integers(1, 1 << 63, num_perm, dtype=np.uint64) | np.uint64(1),
+            rng.integers(0, 1 << 63, num_perm, dtype=np.uint64),
+        )
+        sig = np.empty((len(rows), num_perm), dtype=np.uint32)
+    pos = 0
+    for _idx, x, mask in _batches(dataset, rows, chunk_rows):
+        if method == "simhash":
+            xf = (x.reshape(len(x), -1) - mean) / std
+            sig[pos : pos + len(x)] = simhash(xf, planes)
+        elif mask is None:
+            raise ValueError("minhash needs token rows (input_ids/attention_mask)")
+        else:
+            sig[pos : pos + len(x)] = minhash(x, mask, params, ngram)
+        pos += len(x)
+    return sig
+
+
+def _near_duplicates(
+    sig: np.ndarray,
+    bands: int,
+    window: int,
+    max_hamming: int,
+    threshold: float,
+) -> Tuple[np.ndarray, int]:
+    """Mask over `sig` rows that are near-duplicates of a lower row."""
+    n = len(sig)
+    secondary = sig if sig.ndim == 1 else sig[:, 0]
+    pairs_a, pairs_b, n_candidates = [], [], 0
+    for band in range(bands):
+        a, b = _bucket_pairs(_band_keys(sig, band, bands), secondary, window)
+        n_candidates += len(a)
+        if sig.ndim == 1:
+            close = _popcount(sig[a] ^ sig[b]) <= max_hamming
+        else:
+            close = (sig[a] == sig[b]).mean(1) >= threshold
+        pairs_a.append(a[close])
+        pairs_b.append(b[close])
+    root = _components(n, np.concatenate(pairs_a), np.concatenate(pairs_b))
+    return root != np.arange(n), n_candidates
+
+
+def find_duplicates(
+    dataset: Dataset[Any],
+    near: Optional[str] = "auto",
+    chunk_rows: int = 65536,
+    max_hamming: int = 3,
+    threshold: float = 0.8,
+    num_perm: int = 64,
+    ngram: int = 3,
+    bands: Optional[int] = None,
+    window: int = 4,
+    seed: int = 0,
+) -> Tuple[np.ndarray, DedupReport]:
+    """
+    Keep mask (`[N]` bool) dropping exact and, unless `near` is None,
+    near-duplicate rows of `dataset`.
+
+    `near="auto"` picks minhash for token datasets and simhash otherwise.
+    `bands` defaults to `max_hamming + 1` for simhash, so any pair within
+    `max_hamming` bits agrees on at least one band, and to 16 for minhash
+    (4 hashes per band with `num_perm=64`). Rows are read as
+    `dataset[index_array]` batches of `chunk_rows`, with any transform
+    applied; clear it first to deduplicate the stored values.
+    """
+    assert isinstance(dataset, Sized)
+    n = len(dataset)
+    dup, mean, std = _exact_duplicates(dataset, n, chunk_rows)
+    n_exact = int(dup.sum())
+    logger.info("Exact duplicates: {:,} of {:,} rows", n_exact, n)
+
+    method = near
+    if method == "auto":
+        method = "simhash" if mean is not None else "minhash"
+    n_near = n_candidates = 0
+    if method is not None:
+        if method not in NEAR_METHODS:
+            raise ValueError(f"near must be auto|simhash|minhash|None, got {near!r}")
+        if bands is None:
+            bands = max_hamming + 1 if method == "simhash" else 16
+        if method == "simhash" and not 0 < bands <= 64:
+            raise ValueError(f"simhash bands must be in 1..64, got {bands}")
+        if method == "minhash" and num_perm % bands:
+            raise ValueError(f"num_perm={num_perm} must be a multiple of bands={bands}")
+        rows = np.flatnonzero(~dup)
+        sig = _signatures(
+            dataset, rows, method, chunk_rows, num_perm, ngram, seed, mean, std
+        )
+        near_mask, n_candidates = _near_duplicates(
+            sig, bands, window, max_hamming, threshold
+        )
+        del sig
+        dup[rows[near_mask]] = True
+        n_near = int(near_mask.sum())
+        logger.info(
+            "Near duplicates ({}): {:,} rows from {:,} candidate pairs",
+            method,
+            n_near,
+            n_candidates,
+        )
+    report = DedupReport(n, n_exact, n_near, n_candidates, method)
+    return ~dup, report
+
+
+def save_keep_mask(path: Union[str, Path], keep: np.ndarray) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.asarray(keep, dtype=bool))
+    return path
+
+
+def load_keep_mask(path: Union[str, Path], n: int) -> np.ndarray:
+    keep: np.ndarray = np.load(path, mmap_mode="r")
+    if keep.dtype != np.bool_ or keep.shape != (n,):
+        raise ValueError(
+            f"{path}: expected a bool keep mask of shape ({n},), "
+            f"got {keep.dtype} {keep.shape}; re-run cli.dedup for this dataset."
+        )
+    return keep
+{%- endif %}
@@ -1,25 +1,54 @@
 from omegaconf import DictConfig
 
 {% if cookiecutter.ml_framework == 'pytorch' %}
-from {{cookiecutter.project_slug}}.data.datamodule import DataModuleConfig, RandomDataModule
+from typing import Any, Callable, Union
+
+from omegaconf import OmegaConf
+
+from {{cookiecutter.project_slug}}.data.datamodule import (
+    ClassificationDataModule,
+    DataModuleConfig,
+    ImageFolderDataModule,
+    MemmapDataModule,
+    ParquetDataModule,
+    ParquetTableDataModule,
+    RandomDataModule,
+    ShardDataModule,
+    TextDataModule,
+)
 from {{cookiecutter.project_slug}}.data.datasets import RandomDatasetConfig
-from {{cookiecutter.project_slug}}.data.transforms import Identity
+from {{cookiecutter.project_slug}}.data.transforms import Identity, build_batch_transform
+
+# A datamodule over one split map-style dataset, or streamed Parquet splits.
+DataModule = Union[ClassificationDataModule, ParquetDataModule]
 {% else %}
 from dataclasses import dataclass
 @dataclass
 class RandomDataModule:
     n_features: int
     n_classes: int
+
+ClassificationDataModule = RandomDataModule
+DataModule = RandomDataModule
 {% endif %}
 
 
-def build_datamodule(cfg: DictConfig) -> RandomDataModule:
+def build_datamodule(cfg: DictConfig) -> DataModule:
     {% if cookiecutter.ml_framework == 'pytorch' %}
     ds_cfg = RandomDatasetConfig(
         n_samples=int(cfg.data.get("n_samples", 1024)),
         n_features=int(cfg.data.get("n_features", 32)),
         n_classes=int(cfg.data.get("n_classes", 2)),
+        lazy=bool(cfg.data.get("lazy", False)),
     )
+    cache = cfg.data.get("cache") or {}
+    cache_enabled = bool(cache.get("enabled", False))
+    max_gb = cache.get("max_gb")
+    max_bytes = int(float(max_gb) * 1024**3) if max_gb is not None else None
+    class_weights = cfg.data.get("class_weights")
+    if class_weights is not None and not isinstance(class_weights, str):
+        class_weights = tuple(float(w) for w in class_weights)
+    epoch_samples = cfg.data.get("epoch_samples")
     dm_cfg = DataModuleConfig(
         batch_size=int(cfg.data.get("batch_size", 64)),
         num_workers=int(cfg.data.get("num_workers", 0)),
@@ -28,8 +57,100 @@ def build_datamodule(cfg: DictConfig) -> RandomDataModule:
         seed=int(cfg.get("seed", 42)),
         val_frac=float(cfg.data.get("val_frac", 0.1)),
         test_frac=float(cfg.data.get("test_frac", 0.1)),
+        batch_fetch=bool(cfg.data.get("batch_fetch", True)),
+        cache_dir=str(cache.get("dir")) if cache_enabled else None,
+        cache_max_bytes=max_bytes,
+        split_mode=str(cfg.data.get("split_mode", "random")),
+        split_cache_dir=(
+            str(cfg.data.split_cache_dir) if cfg.data.get("split_cache_dir") else None
+        ),
+        share_memory=bool(cfg.data.get("share_memory", False)),
+        log_worker_memory=bool(cfg.data.get("log_worker_memory", False)),
+        normalize=bool(cfg.data.get("normalize", False)),
+        stats_dir=str(cfg.data.stats_dir) if cfg.data.get("stats_dir") else None,
+        shuffle_mode=str(cfg.data.get("shuffle_mode", "full")),
+        shuffle_buffer_chunks=int(cfg.data.get("shuffle_buffer_chunks", 8)),
+        length_bucket_batches=int(cfg.data.get("length_bucket_batches", 100)),
+        class_weights=class_weights,
+        epoch_samples=int(epoch_samples) if epoch_samples else None,
+        keep_mask=str(cfg.data.keep_mask) if cfg.data.get("keep_mask") else None,
     )
-    transform = Identity()
+    transform: Callable[[Any], Any] = Identity()
+    transforms_on = str(cfg.data.get("transforms_on", "loader"))
+    if transforms_on not in ("loader", "device"):
+        raise ValueError(
+            f"data.transforms_on must be loader|device, got {transforms_on!r}"
+        )
+    if dm_cfg.normalize and transforms_on == "device" and cfg.data.get("transforms"):
+        # Stats describe the loader output, which device transforms would change.
+        raise ValueError("data.normalize requires data.transforms_on=loader")
+    if transforms_on == "loader":
+        specs = cfg.data.get("transforms")
+        specs = OmegaConf.to_container(specs, resolve=True) if specs else []
+        if not isinstance(specs, list):
+            raise ValueError("data.transforms must be a list of {name: ...} specs")
+        transform = build_batch_transform(specs) or transform
+    fmt = cfg.data.get("format")
+    if fmt == "memmap":
+        return MemmapDataModule(str(cfg.data.path), dm_cfg, transform=transform)
+    if fmt == "shards":
+        return ShardDataModule(str(cfg.data.path), dm_cfg, transform=transform)
+    if fmt == "text":
+        text = cfg.data.get("text") or {}
+        if not text.get("tokenizer_path"):
+            raise ValueError("format: text needs data.text.tokenizer_path")
+        num_proc = text.get("num_proc")
+        digest_cache_dir = text.get("digest_cache_dir")
+        return TextDataModule(
+            str(cfg.data.path),
+            dm_cfg,
+            tokenizer_path=str(text.get("tokenizer_path")),
+            token_cache_dir=str(text.get("cache_dir", ".cache/tokens")),
+            text_column=str(text.get("text_column", "text")),
+            label_column=str(cfg.data.get("label_column", "label")),
+            max_len=int(text.get("max_len", 512)),
+            num_proc=int(num_proc) if num_proc else None,
+            digest_cache_dir=str(digest_cache_dir) if digest_cache_dir else None,
+        )
+    if fmt == "imagefolder":
+        image = cfg.data.get("image") or {}
+        index = cfg.data.get("index") or {}
+        size = image.get("size", 224)
+        image_max_gb = image.get("cache_max_gb")
+        classmap_file = index.get("classmap_file")
+        return ImageFolderDataModule(
+            str(cfg.data.path),
+            dm_cfg,
+            image_size=[size, size] if isinstance(size, int) else list(size),
+            image_cache_dir=str(image.get("cache_dir", ".cache/images")),
+            classmap_file=str(classmap_file) if classmap_file else None,
+            n_jobs=image.get("n_jobs"),
+            image_cache_max_bytes=(
+                int(float(image_max_gb) * 1024**3) if image_max_gb is not None else None
+            ),
+            transform=transform,
+        )
+    feature_columns = cfg.data.get("feature_columns")
+    if fmt == "parquet_table":
+        return ParquetTableDataModule(
+            str(cfg.data.path),
+            dm_cfg,
+            label_column=str(cfg.data.get("label_column", "label")),
+            feature_columns=list(feature_columns) if feature_columns else None,
+            transform=transform,
+        )
+    if fmt == "parquet":
+        splits = cfg.data.get("splits")
+        return ParquetDataModule(
+            str(cfg.data.path),
+            dm_cfg,
+            splits=dict(splits) if splits else None,
+            label_column=str(cfg.data.get("label_column", "label")),
+            feature_columns=list(feature_columns) if feature_columns else None,
+            transform=transform,
+        )
+    if fmt is not None:
+        raise ValueError(f"Unsupported data.format: {fmt!r}")
     return RandomDataModule(ds_cfg, dm_cfg, transform=transform)
     {% else %}
     return RandomDataModule(
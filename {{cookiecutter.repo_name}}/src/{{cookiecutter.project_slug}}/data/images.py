@@ -0,0 +1,244 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from loguru import logger
+from torch.utils.data import Dataset
+
+from {{cookiecutter.project_slug}}.data.cache import DatasetCache, fingerprint
+from {{cookiecutter.project_slug}}.data.memmap import LABELS_FILE, META_FILE
+
+IMAGES_FILE = "images.npy"  # uint8 [N, H, W, 3]
+INDEX_FILE = "files.txt"  # source path of each row, relative to the root
+CLASSMAP_FILE = "class_to_idx.json"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+
+
+@dataclass(frozen=True)
+class ImageCacheMeta:
+    n_samples: int
+    height: int
+    width: int
+    n_classes: int
+    root: str
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "ImageCacheMeta":
+        return ImageCacheMeta(**json.loads((Path(path) / META_FILE).read_text()))
+
+
+def scan_image_folder(
+    root: Union[str, Path],
+    class_to_idx: Optional[Dict[str, int]] = None,
+    extensions: Sequence[str] = IMAGE_EXTENSIONS,
+) -> Tuple[List[str], np.ndarray, Dict[str, int]]:
+    """
+    List `root/<class>/**/<image>` in sorted order.
+
+    Returns relative paths, int64 labels and the class map, which defaults to
+    the sorted class directory names (as in torchvision's `ImageFolder`).
+    """
+    root = Path(root)
+    class_dirs = sorted(p.name for p in root.iterdir() if p.is_dir())
+    if class_to_idx is None:
+        class_to_idx = {name: i for i, name in enumerate(class_dirs)}
+    unknown = sorted(set(class_dirs) - set(class_to_idx))
+    if unknown:
+        raise ValueError(f"Class directories missing from the class map: {unknown}")
+    files, labels = [], []
+    for name in class_dirs:
+        for dirpath, dirnames, filenames in os.walk(root / name):
+            dirnames.sort()
+            for f in sorted(filenames):
+                if f.lower().endswith(tuple(extensions)):
+                    files.append((Path(dirpath) / f).relative_to(root).as_posix())
+                    labels.append(class_to_idx[name])
+    if not files:
+        raise ValueError(f"No images found under {root}")
+    return files, np.asarray(labels, dtype=np.int64), dict(class_to_idx)
+
+
+def load_image(path: Union[str, Path], size: Tuple[int, int]) -> np.ndarray:
+    """Decode to RGB, resize the shorter side and center-crop to `(h, w)`."""
+    from PIL import Image, ImageOps
+
+    h, w = size
+    with Image.open(path) as img:
+        # JPEGs are decoded at the smallest DCT scale (1/2, 1/4, 1/8) that is
+        # still at least (w, h): far less work than a full decode + resize.
+        img.draft("RGB", (w, h))
+        fitted = ImageOps.fit(img.convert("RGB"), (w, h), Image.Resampling.BILINEAR)
+        return np.asarray(fitted)
+
+
+def _decode_range(
+    cache: str, root: str, files: List[str], start: int, size: Tuple[int, int]
+) -> List[str]:
+    # Runs in a pool worker and writes its rows straight into the memmap, so
+    # pixels are never pickled back to the parent.
+    images = np.load(Path(cache) / IMAGES_FILE, mmap_mode="r+")
+    failed = []
+    for i, rel in enumerate(files):
+        try:
+            images[start + i] = load_image(Path(root) / rel, size)
+        except (OSError, ValueError):
+            failed.append(rel)
+    images.flush()
+    return failed
+
+
+def build_image_cache(
+    out: Union[str, Path],
+    root: Union[str, Path],
+    files: List[str],
+    labels: np.ndarray,
+    class_to_idx: Dict[str, int],
+    size: Tuple[int, int],
+    n_jobs: Optional[int] = None,
+    chunk_files: int = 256,
+) -> ImageCacheMeta:
+    """Decode and resize `files` once, in a process pool, into a cache at `out`."""
+    out, root = Path(out), Path(root)
+    out.mkdir(parents=True, exist_ok=True)
+    h, w = size
+    images = np.lib.format.open_memmap(
+        out / IMAGES_FILE, mode="w+", dtype=np.uint8, shape=(len(files), h, w, 3)
+    )
+    del images  # preallocated; workers fill their own rows
+    n_jobs = n_jobs or os.cpu_count() or 1
+    failed: List[str] = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [
+            pool.submit(
+                _decode_range,
+                str(out),
+                str(root),
+                files[start : start + chunk_files],
+                start,
+                size,
+            )
+            for start in range(0, len(files), chunk_files)
+        ]
+        for future in futures:
+            failed.extend(future.result())
+    if failed:
+        raise ValueError(
+            f"{len(failed)} image(s) under {root} could not be decoded, "
+            f"e.g. {failed[:5]}; fix or remove them."
+        )
+    np.save(out / LABELS_FILE, labels)
+    (out / INDEX_FILE).write_text("\n".join(files) + "\n")
+    (out / CLASSMAP_FILE).write_text(json.dumps(class_to_idx, indent=2))
+    meta = ImageCacheMeta(len(files), h, w, len(class_to_idx), str(root.resolve()))
+    # Written last: DatasetCache treats its presence as a complete entry.
+    (out / META_FILE).write_text(json.dumps(asdict(meta), indent=2))
+    return meta
+
+
+def cached_image_folder(
+    root: Union[str, Path],
+    cache_dir: Union[str, Path],
+    size: Tuple[int, int],
+    classmap_file: Optional[Union[str, Path]] = None,
+    n_jobs: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> Path:
+    """
+    Cache entry for the images under `root`, building it on first use.
+
+    The key covers every file's relative path, size and mtime plus `size`
+    and the class map, so added, removed or edited images produce a new
+    entry. An existing `classmap_file` fixes the label ids; otherwise the
+    sorted class directories are used and the map is written there.
+    """
+    root = Path(root)
+    class_to_idx = None
+    if classmap_file is not None and Path(classmap_file).exists():
+        class_to_idx = json.loads(Path(classmap_file).read_text())
+    files, labels, class_to_idx = scan_image_folder(root, class_to_idx)
+    if classmap_file is not None and not Path(classmap_file).exists():
+        Path(classmap_file).parent.mkdir(parents=True, exist_ok=True)
+        Path(classmap_file).write_text(json.dumps(class_to_idx, indent=2))
+        logger.info("Wrote class map {}", classmap_file)
+
+    stats = [(root / f).stat() for f in files]
+    key = fingerprint(
+        "imagefolder",
+        str(root.resolve()),
+        [[f, s.st_size, s.st_mtime_ns] for f, s in zip(files, stats)],
+        list(size),
+        class_to_idx,
+    )
+    cache = DatasetCache(cache_dir, max_bytes)
+    return cache.get_or_build(
+        key,
+        lambda tmp: build_image_cache(
+            tmp, root, files, labels, class_to_idx, size, n_jobs=n_jobs
+        ),
+    )
+
+
+class ImageFolderDataset(Dataset[Tuple[torch.Tensor, torch.Tensor]]):
+    """
+    Decoded, resized images served from a cache built by `build_image_cache`.
+
+    Returns uint8 `[..., 3, H, W]` tensors (channels-first views of the HWC
+    memmap). Keeping uint8 until the device makes batches 4x smaller to
+    collate, pin and copy; convert with a device transform
+    (`data.transforms_on=device`).
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    ):
+        self.path = Path(path)
+        self.transform = transform
+        self.meta = ImageCacheMeta.load(self.path)
+        self.class_to_idx: Dict[str, int] = json.loads(
+            (self.path / CLASSMAP_FILE).read_text()
+        )
+        self._images: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Opened lazily, like the memmap dataset, so workers map the files.
+        if self._images is None or self._labels is None:
+            self._images = np.load(self.path / IMAGES_FILE, mmap_mode="c")
+            self._labels = np.load(self.path / LABELS_FILE, mmap_mode="c")
+        return self._images, self._labels
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_images"] = None
+        state["_labels"] = None
+        return state
+
+    @property
+    def files(self) -> List[str]:
+        return (self.path / INDEX_FILE).read_text().splitlines()
+
+    @property
+    def y(self) -> torch.Tensor:
+        return torch.from_numpy(self._arrays()[1])
+
+    def __len__(self) -> int:
+        return self.meta.n_samples
+
+    def __getitem__(self, idx: Any) -> Tuple[torch.Tensor, torch.Tensor]:
+        images, labels = self._arrays()
+        x = torch.from_numpy(images[idx]).movedim(-1, -3)
+        y = torch.from_numpy(np.asarray(labels[idx]))
+        if self.transform:
+            x = self.transform(x)
+        return x, y
+{%- endif %}
@@ -0,0 +1,206 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sized, Tuple, Union
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+GROUPS_FILE = "groups.npy"  # optional, used by group-aware splits
+META_FILE = "meta.json"
+
+
+@dataclass(frozen=True)
+class MemmapMeta:
+    n_samples: int
+    n_features: int
+    n_classes: int
+    dtype: str = "float32"
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "MemmapMeta":
+        return MemmapMeta(**json.loads((Path(path) / META_FILE).read_text()))
+
+
+def _to_numpy(a: Any) -> np.ndarray:
+    if isinstance(a, torch.Tensor):
+        return a.detach().cpu().numpy()
+    return np.asarray(a)
+
+
+class MemmapDatasetWriter:
+    """
+    Writes a classification dataset as `.npy` memmaps under `path`.
+
+    Arrays are preallocated on disk and filled chunk by chunk, so datasets
+    larger than RAM can be produced without materializing them.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        n_samples: int,
+        n_features: int,
+        n_classes: Optional[int] = None,
+        dtype: str = "float32",
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        # n_classes=None: inferred from the largest label written.
+        self.meta = MemmapMeta(n_samples, n_features, n_classes or 0, dtype)
+        self._infer_classes = n_classes is None
+        self._X = np.lib.format.open_memmap(
+            self.path / FEATURES_FILE,
+            mode="w+",
+            dtype=np.dtype(dtype),
+            shape=(n_samples, n_features),
+        )
+        self._y = np.lib.format.open_memmap(
+            self.path / LABELS_FILE, mode="w+", dtype=np.int64, shape=(n_samples,)
+        )
+        self._offset = 0
+
+    def write(self, X: Any, y: Any) -> None:
+        X, y = _to_numpy(X), _to_numpy(y)
+        n = len(X)
+        if len(y) != n:
+            raise ValueError(f"Got {n} feature rows but {len(y)} labels.")
+        if self._offset + n > self.meta.n_samples:
+            raise ValueError(
+                f"Writing {n} rows at offset {self._offset} exceeds "
+                f"n_samples={self.meta.n_samples}."
+            )
+        self._X[self._offset : self._offset + n] = X
+        self._y[self._offset : self._offset + n] = y
+        self._offset += n
+        if self._infer_classes and n:
+            n_classes = max(self.meta.n_classes, int(y.max()) + 1)
+            self.meta = replace(self.meta, n_classes=n_classes)
+
+    def close(self) -> None:
+        if self._offset != self.meta.n_samples:
+            raise ValueError(
+                f"Only {self._offset}/{self.meta.n_samples} rows were written."
+            )
+        self._X.flush()
+        self._y.flush()
+        del self._X, self._y
+        (self.path / META_FILE).write_text(json.dumps(asdict(self.meta), indent=2))
+
+    def __enter__(self) -> "MemmapDatasetWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def write_memmap_dataset(
+    path: Union[str, Path],
+    X: Any,
+    y: Any,
+    n_classes: Optional[int] = None,
+    chunk_rows: int = 65536,
+    groups: Any = None,
+) -> MemmapMeta:
+    """Write in-memory `X`/`y` (and optional `groups`) to a memmap directory."""
+    X, y = _to_numpy(X), _to_numpy(y)
+    n_classes = int(n_classes if n_classes is not None else y.max() + 1)
+    with MemmapDatasetWriter(
+        path, len(X), X.shape[1], n_classes, dtype=str(X.dtype)
+    ) as writer:
+        for start in range(0, len(X), chunk_rows):
+            writer.write(X[start : start + chunk_rows], y[start : start + chunk_rows])
+    if groups is not None:
+        np.save(Path(path) / GROUPS_FILE, _to_numpy(groups))
+    return writer.meta
+
+
+def materialize_dataset(
+    path: Union[str, Path], dataset: Dataset[Any], chunk_rows: int = 65536
+) -> MemmapMeta:
+    """
+    Write `dataset` (after its transform) to a memmap directory.
+
+    The dataset must accept index arrays in `__getitem__`, like the datasets
+    in this package; rows are read and written `chunk_rows` at a time.
+    """
+    assert isinstance(dataset, Sized)
+    n = len(dataset)
+    writer = None
+    for start in range(0, n, chunk_rows):
+        x, y = dataset[np.arange(start, min(start + chunk_rows, n))]
+        x = _to_numpy(x)
+        if writer is None:
+            writer = MemmapDatasetWriter(path, n, x.shape[1], dtype=str(x.dtype))
+        writer.write(x, y)
+    if writer is None:
+        raise ValueError("Cannot materialize an empty dataset.")
+    writer.close()
+    return writer.meta
+
+
+class MemmapClassificationDataset(Dataset[Tuple[torch.Tensor, torch.Tensor]]):
+    """
+    A classification dataset served from `.npy` memmaps on disk.
+
+    Rows are returned as zero-copy `torch.from_numpy` views, so only the pages
+    actually touched are resident and they are shared through the page cache
+    between DataLoader workers.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    ):
+        self.path = Path(path)
+        self.transform = transform
+        self.meta = MemmapMeta.load(self.path)
+        self._X: Optional[np.ndarray] = None
+        self._y: Optional[np.ndarray] = None
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Opened lazily so that spawned workers map the files themselves instead
+        # of receiving a pickled copy. "c" (copy-on-write) keeps the mapping
+        # writable, which `torch.from_numpy` requires, without touching the files.
+        if self._X is None or self._y is None:
+            self._X = np.load(self.path / FEATURES_FILE, mmap_mode="c")
+            self._y = np.load(self.path / LABELS_FILE, mmap_mode="c")
+        return self._X, self._y
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_X"] = None
+        state["_y"] = None
+        return state
+
+    @property
+    def X(self) -> torch.Tensor:
+        return torch.from_numpy(self._arrays()[0])
+
+    @property
+    def y(self) -> torch.Tensor:
+        return torch.from_numpy(self._arrays()[1])
+
+    @property
+    def groups(self) -> Optional[np.ndarray]:
+        path = self.path / GROUPS_FILE
+        return np.load(path, mmap_mode="r") if path.exists() else None
+
+    def __len__(self) -> int:
+        return self.meta.n_samples
+
+    def __getitem__(self, idx: Any) -> Tuple[torch.Tensor, torch.Tensor]:
+        X, Y = self._arrays()
+        x, y = torch.from_numpy(X[idx]), torch.from_numpy(np.asarray(Y[idx]))
+        if self.transform:
+            x = self.transform(x)
+        return x, y
+{%- endif %}
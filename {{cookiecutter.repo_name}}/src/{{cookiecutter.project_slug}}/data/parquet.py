@@ -0,0 +1,225 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+
+from {{cookiecutter.project_slug}}.data.chunks import Chunk, ChunkedDataset
+from {{cookiecutter.project_slug}}.data.samplers import rank_and_world_size
+
+
+def parquet_files(path: Path) -> List[Path]:
+    files = sorted(path.rglob("*.parquet")) if path.is_dir() else [path]
+    if not files:
+        raise FileNotFoundError(f"No .parquet files found under {path}")
+    return files
+
+
+def _row_groups(files: Sequence[Path]) -> Tuple[List[Tuple[int, int]], List[int]]:
+    # (file index, row group index) and row count per row group; footers only.
+    units, sizes = [], []
+    for i, f in enumerate(files):
+        md = pq.ParquetFile(f).metadata
+        for rg in range(md.num_row_groups):
+            units.append((i, rg))
+            sizes.append(md.row_group(rg).num_rows)
+    return units, sizes
+
+
+def _feature_columns(
+    files: Sequence[Path], label_column: str, feature_columns: Optional[Sequence[str]]
+) -> List[str]:
+    if feature_columns is None:
+        schema = pq.read_schema(files[0])
+        feature_columns = [n for n in schema.names if n != label_column]
+    return list(feature_columns)
+
+
+def _to_numpy(
+    data: Union[pa.RecordBatch, pa.Table],
+    feature_columns: Sequence[str],
+    label_column: str,
+) -> Chunk:
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])  # zero-copy; uniform column API
+    x = np.empty((data.num_rows, len(feature_columns)), dtype=np.float32)
+    for j, name in enumerate(feature_columns):
+        x[:, j] = data.column(name).to_numpy()
+    y = data.column(label_column).to_numpy().astype(np.int64, copy=False)
+    return x, y
+
+
+class ParquetIterableDataset(IterableDataset[Tuple[torch.Tensor, torch.Tensor]]):
+    """
+    Streams `(features, labels)` batches from a directory of Parquet files.
+
+    The unit of work is a row group: row groups are assigned round-robin to
+    ranks, then to DataLoader workers within a rank, so no two readers ever
+    decode the same rows. Each record batch is converted to tensors with one
+    copy per column. Memory stays bounded by `batch_size` x `num_workers`
+    regardless of table size.
+
+    With `shuffle`, row-group order is permuted every epoch and rows are
+    shuffled within a buffer of `shuffle_buffer_chunks` decoded row groups
+    (with 1, within each row group).
+    Call `set_epoch` before each epoch (`ParquetDataModule` does, driven by
+    the LightningModule); the epoch lives in shared memory, so persistent
+    workers see it too.
+
+    Use with `DataLoader(batch_size=None)`; the dataset already yields batches.
+    Ranks can receive a different number of batches when row groups do not
+    divide evenly.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        label_column: str = "label",
+        feature_columns: Optional[Sequence[str]] = None,
+        batch_size: int = 4096,
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+        shuffle: bool = False,
+        seed: int = 42,
+        shuffle_buffer_chunks: int = 1,
+    ):
+        super().__init__()
+        self.path = Path(path)
+        self.label_column = label_column
+        self.batch_size = batch_size
+        self.transform = transform
+        self.shuffle = shuffle
+        self.seed = seed
+        self.shuffle_buffer_chunks = shuffle_buffer_chunks
+        self._epoch = torch.zeros((), dtype=torch.int64)
+        self._epoch.share_memory_()  # type: ignore[no-untyped-call]
+        # Resolved in the rank's main process: workers may not see the process group.
+        self.rank, self.world_size = rank_and_world_size()
+
+        self.files = parquet_files(self.path)
+        self.row_groups, sizes = _row_groups(self.files)
+        self.n_rows = sum(sizes)
+        self.feature_columns = _feature_columns(
+            self.files, label_column, feature_columns
+        )
+
+    def set_epoch(self, epoch: int) -> None:
+        self._epoch.fill_(int(epoch))
+
+    def _assigned_row_groups(
+        self,
+    ) -> Tuple[List[Tuple[int, int]], np.random.Generator]:
+        units = self.row_groups[self.rank :: self.world_size]
+
+        info = get_worker_info()
+        worker_id, num_workers = (0, 1) if info is None else (info.id, info.num_workers)
+        epoch = int(self._epoch)
+        if self.shuffle:
+            # Seeded by (seed, epoch) only, so all workers of one rank agree on
+            # the permutation before taking disjoint slices.
+            order = np.random.default_rng([self.seed, epoch]).permutation(len(units))
+            units = [units[i] for i in order]
+        rng = np.random.default_rng([self.seed, epoch, self.rank, worker_id])
+        return units[worker_id::num_workers], rng
+
+    def _emit(self, x: np.ndarray, y: np.ndarray) -> Tuple[torch.Tensor, torch.Tensor]:
+        xt, yt = torch.from_numpy(x), torch.from_numpy(y)
+        if self.transform:
+            xt = self.transform(xt)
+        return xt, yt
+
+    def _batches(self) -> Iterator[Chunk]:
+        columns = self.feature_columns + [self.label_column]
+        units, rng = self._assigned_row_groups()
+        current, reader = None, None
+        for file_idx, rg in units:
+            if reader is None or file_idx != current:
+                current, reader = file_idx, pq.ParquetFile(self.files[file_idx])
+            for batch in reader.iter_batches(
+                batch_size=self.batch_size, row_groups=[rg], columns=columns
+            ):
+                yield _to_numpy(batch, self.feature_columns, self.label_column)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        if not self.shuffle:
+            for x, y in self._batches():
+                yield self._emit(x, y)
+            return
+        yield from self._iter_buffered()
+
+    def _iter_buffered(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        # Decode `shuffle_buffer_chunks` row groups, shuffle their rows together,
+        # emit full batches and carry the remainder into the next buffer.
+        columns = self.feature_columns + [self.label_column]
+        units, rng = self._assigned_row_groups()
+        carry: List[Chunk] = []
+        for start in range(0, len(units), self.shuffle_buffer_chunks):
+            parts = list(carry)
+            for file_idx, rg in units[start : start + self.shuffle_buffer_chunks]:
+                table = pq.ParquetFile(self.files[file_idx]).read_row_group(
+                    rg, columns=columns
+                )
+                parts.append(_to_numpy(table, self.feature_columns, self.label_column))
+            x = np.concatenate([p[0] for p in parts])
+            y = np.concatenate([p[1] for p in parts])
+            perm = rng.permutation(len(x))
+            x, y = x[perm], y[perm]
+            n_full = len(x) // self.batch_size * self.batch_size
+            for b in range(0, n_full, self.batch_size):
+                end = b + self.batch_size
+                yield self._emit(x[b:end], y[b:end])
+            carry = [(x[n_full:], y[n_full:])] if n_full < len(x) else []
+        for x, y in carry:
+            yield self._emit(x, y)
+
+
+class ParquetChunkedDataset(ChunkedDataset):
+    """
+    Random access to a Parquet table (file or directory), one row group per
+    chunk. Split and sample it like any map-style dataset; use
+    `ChunkShuffleSampler` for training so row groups are not decoded once per
+    sample.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        label_column: str = "label",
+        feature_columns: Optional[Sequence[str]] = None,
+        cache_chunks: int = 16,
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    ):
+        super().__init__(cache_chunks=cache_chunks, transform=transform)
+        self.path = Path(path)
+        self.label_column = label_column
+        self.files = parquet_files(self.path)
+        self.row_groups, sizes = _row_groups(self.files)
+        self.chunk_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.feature_columns = _feature_columns(
+            self.files, label_column, feature_columns
+        )
+        self._y: Optional[torch.Tensor] = None
+
+    def _read_chunk(self, i: int) -> Chunk:
+        file_idx, rg = self.row_groups[i]
+        table = pq.ParquetFile(self.files[file_idx]).read_row_group(
+            rg, columns=self.feature_columns + [self.label_column]
+        )
+        return _to_numpy(table, self.feature_columns, self.label_column)
+
+    @property
+    def y(self) -> torch.Tensor:
+        # Only the label column is read (e.g. for stratified splits).
+        if self._y is None:
+            labels = [
+                pq.read_table(f, columns=[self.label_column]).column(0).to_numpy()
+                for f in self.files
+            ]
+            self._y = torch.from_numpy(np.concatenate(labels).astype(np.int64))
+        return self._y
+{%- endif %}
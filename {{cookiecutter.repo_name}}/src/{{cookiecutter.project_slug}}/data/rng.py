@@ -0,0 +1,87 @@
+"""Counter-based random numbers (Philox4x32-10) in vectorized NumPy.
+
+Every value is a pure function of `(seed, row, column)`, so any subset of
+rows can be generated on demand, in any order, and is identical to the same
+rows of a full materialization.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_M0 = np.uint64(0xD2511F53)
+_M1 = np.uint64(0xCD9E8D57)
+_W0 = np.uint64(0x9E3779B9)
+_W1 = np.uint64(0xBB67AE85)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+
+FEATURE_STREAM = 0
+LABEL_STREAM = 1
+SAMPLE_STREAM = 2
+
+
+def philox4x32(counters: np.ndarray, seed: int) -> np.ndarray:
+    """Apply Philox4x32-10 to `counters` (`[N, 4]` uint32); returns `[N, 4]` uint32."""
+    c0, c1, c2, c3 = (counters[:, i].astype(np.uint64) for i in range(4))
+    k0 = np.uint64(seed & 0xFFFFFFFF)
+    k1 = np.uint64((seed >> 32) & 0xFFFFFFFF)
+    for _ in range(10):
+        p0 = _M0 * c0
+        p1 = _M1 * c2
+        c0, c1, c2, c3 = (
+            (p1 >> _SHIFT32) ^ c1 ^ k0,
+            p1 & _MASK32,
+            (p0 >> _SHIFT32) ^ c3 ^ k1,
+            p0 & _MASK32,
+        )
+        k0 = (k0 + _W0) & _MASK32
+        k1 = (k1 + _W1) & _MASK32
+    return np.stack([c0, c1, c2, c3], axis=1).astype(np.uint32)
+
+
+def _row_counters(rows: np.ndarray, n_words: int, stream: int) -> np.ndarray:
+    # Counter layout: (row low 32 bits, row high 32 bits, word index, stream).
+    rows = np.asarray(rows, dtype=np.uint64).reshape(-1)
+    counters = np.empty((rows.size, n_words, 4), dtype=np.uint32)
+    counters[..., 0] = (rows & _MASK32)[:, None]
+    counters[..., 1] = (rows >> _SHIFT32)[:, None]
+    counters[..., 2] = np.arange(n_words, dtype=np.uint32)[None, :]
+    counters[..., 3] = stream
+    return counters.reshape(-1, 4)
+
+
+def _uniform(bits: np.ndarray) -> np.ndarray:
+    # Maps uint32 to the open interval (0, 1), so log() below is always finite.
+    return (bits.astype(np.float64) + 0.5) * (1.0 / 2**32)
+
+
+def counter_normal(rows: np.ndarray, n_features: int, seed: int) -> np.ndarray:
+    """Standard-normal `[len(rows), n_features]` float32 features for `rows`."""
+    rows = np.asarray(rows).reshape(-1)
+    n_pairs = (n_features + 1) // 2
+    n_words = (2 * n_pairs + 3) // 4
+    bits = philox4x32(_row_counters(rows, n_words, FEATURE_STREAM), seed)
+    bits = bits.reshape(rows.size, -1)[:, : 2 * n_pairs]
+    u1, u2 = _uniform(bits[:, 0::2]), _uniform(bits[:, 1::2])
+    radius = np.sqrt(-2.0 * np.log(u1))
+    theta = 2.0 * np.pi * u2
+    out = np.empty((rows.size, 2 * n_pairs), dtype=np.float32)
+    out[:, 0::2] = radius * np.cos(theta)
+    out[:, 1::2] = radius * np.sin(theta)
+    return out[:, :n_features]
+
+
+def counter_integers(rows: np.ndarray, high: int, seed: int) -> np.ndarray:
+    """Integers in `[0, high)` (int64), one per row in `rows`."""
+    rows = np.asarray(rows).reshape(-1)
+    bits = philox4x32(_row_counters(rows, 1, LABEL_STREAM), seed)[:, 0]
+    return ((bits.astype(np.uint64) * np.uint64(high)) >> _SHIFT32).astype(np.int64)
+
+
+def counter_uniform(
+    rows: np.ndarray, seed: int, stream: int = SAMPLE_STREAM
+) -> np.ndarray:
+    """Uniform `(0, 1)` float64, one per row in `rows`."""
+    rows = np.asarray(rows).reshape(-1)
+    return _uniform(philox4x32(_row_counters(rows, 1, stream), seed)[:, 0])
@@ -0,0 +1,459 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    Union,
+    cast,
+)
+
+import numpy as np
+import torch.distributed as dist
+from torch.utils.data import Dataset, DistributedSampler
+
+
+def rank_and_world_size() -> Tuple[int, int]:
+    if dist.is_available() and dist.is_initialized():
+        return dist.get_rank(), dist.get_world_size()
+    return 0, 1
+
+
+class ResumableSampler(DistributedSampler[Any]):
+    """
+    Deterministic, rank-partitioned sampler that can resume mid-epoch.
+
+    The epoch's order is a pure function of `(seed, epoch)`: every rank draws
+    the same permutation (padded by wrapping, as `DistributedSampler` does, so
+    ranks get equal shares) and takes every `num_replicas`-th index. DataLoader
+    workers receive batches in sampler order and their results are returned in
+    that order, so the stream does not depend on `num_workers`.
+
+    `consumed` counts samples the training loop has actually seen (see
+    `advance`), not indices handed to prefetching workers. After
+    `load_state_dict`, the next `__iter__` skips that many samples of the
+    restored epoch. With `batch_size` set, yields lists of indices for
+    `DataLoader(batch_size=None)` and `BatchedSubset`.
+    """
+
+    def __init__(
+        self,
+        dataset: Sized,
+        shuffle: bool = True,
+        seed: int = 0,
+        batch_size: Optional[int] = None,
+        drop_last: bool = False,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+    ):
+        if num_replicas is None or rank is None:
+            default_rank, default_world_size = rank_and_world_size()
+            rank = default_rank if rank is None else rank
+            num_replicas = default_world_size if num_replicas is None else num_replicas
+        super().__init__(
+            # `DistributedSampler` only measures `dataset`.
+            cast(Dataset[Any], dataset),
+            num_replicas=num_replicas,
+            rank=rank,
+            shuffle=shuffle,
+            seed=seed,
+            drop_last=drop_last,
+        )
+        self.num_rows = len(dataset)
+        self.batch_size = batch_size
+        self.consumed = 0
+        self._resume_from = 0
+
+    def _rank_indices(self) -> np.ndarray:
+        n = self.num_rows
+        if self.shuffle:
+            order = np.random.default_rng([self.seed, self.epoch]).permutation(n)
+        else:
+            order = np.arange(n)
+        # np.resize repeats from the start when padding and truncates otherwise.
+        order = np.resize(order, self.total_size)
+        return order[self.rank : self.total_size : self.num_replicas]
+
+    def _resumed_indices(self) -> np.ndarray:
+        return self._rank_indices()[self._resume_from :]
+
+    def __iter__(self) -> Iterator[Any]:
+        indices = self._resumed_indices()
+        self._resume_from = 0
+        if self.batch_size is None:
+            yield from indices.tolist()
+            return
+        for start in range(0, len(indices), self.batch_size):
+            yield indices[start : start + self.batch_size].tolist()
+
+    def __len__(self) -> int:
+        # The full epoch, also when resuming: Lightning counts batches from
+        # the restored progress, not from zero.
+        if self.batch_size is None:
+            return self.num_samples
+        return -(-self.num_samples // self.batch_size)
+
+    def set_epoch(self, epoch: int) -> None:
+        if epoch != self.epoch:
+            self.consumed = 0
+            self._resume_from = 0
+        super().set_epoch(epoch)
+
+    def advance(self, n: int) -> None:
+        """Record `n` more samples of this epoch as consumed on this rank."""
+        self.consumed += n
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"epoch": self.epoch, "consumed": self.consumed, "seed": self.seed}
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        if state.get("seed", self.seed) != self.seed:
+            raise ValueError(
+                f"Sampler state was saved with seed {state['seed']}, not {self.seed}."
+            )
+        self.epoch = int(state["epoch"])
+        self.consumed = int(state["consumed"])
+        self._resume_from = self.consumed
+
+
+class ChunkShuffleSampler(ResumableSampler):
+    """
+    Two-level shuffle for chunked stores (see `data.chunks.ChunkedDataset`).
+
+    Each epoch permutes chunk order, gives every rank a contiguous, equally
+    sized run of the chunk-ordered rows, and shuffles rows only within windows
+    of `buffer_chunks` consecutive chunks. A window is read by one DataLoader
+    worker: windows are dealt to `num_workers` lanes and the lanes' batches are
+    interleaved in the round-robin order the DataLoader dispatches batches in.
+    Each chunk is therefore decoded about once per epoch, provided the
+    workers' LRU holds `buffer_chunks` chunks, instead of once per sample.
+
+    `chunk_ids[i]` is the chunk of dataset position `i`. Rank handling is
+    inherited from `ResumableSampler`. With lanes, the state also records
+    how far each lane got; a resumed stream drops those rows per lane and
+    deals the rest round-robin from lane 0 again, matching the fresh
+    DataLoader iterator that starts at worker 0.
+    """
+
+    def __init__(
+        self,
+        dataset: Sized,
+        chunk_ids: np.ndarray,
+        buffer_chunks: int = 8,
+        num_workers: int = 0,
+        lane_batch_size: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(dataset, **kwargs)
+        self.chunk_ids = np.asarray(chunk_ids)
+        if len(self.chunk_ids) != self.num_rows:
+            raise ValueError("chunk_ids must have one entry per dataset position.")
+        self.buffer_chunks = max(1, int(buffer_chunks))
+        self.lanes = max(1, int(num_workers))
+        self.lane_batch_size = lane_batch_size or self.batch_size
+        # Lane of every row of the current stream, and the lane positions it
+        # started from; with `consumed`, these give each lane's position.
+        self._stream_lanes: Optional[np.ndarray] = None
+        self._stream_start = 0
+        self._lane_start = np.zeros(self.lanes, dtype=np.int64)
+        self._lane_resume: Optional[np.ndarray] = None
+
+    @property
+    def _interleaved(self) -> bool:
+        return self.shuffle and self.lanes > 1 and bool(self.lane_batch_size)
+
+    def _rank_indices(self) -> np.ndarray:
+        rows, window = self._windowed_rows()
+        if not self._interleaved:
+            return rows
+        return self._interleave_lanes(rows, window % self.lanes)[0]
+
+    def _resumed_indices(self) -> np.ndarray:
+        if not self._interleaved or (self._resume_from and self._lane_resume is None):
+            # No lanes, or a checkpoint without lane positions: flat skip.
+            self._stream_lanes = None
+            return super()._resumed_indices()
+        start = self._lane_resume
+        if start is None:
+            start = np.zeros(self.lanes, dtype=np.int64)
+        rows, window = self._windowed_rows()
+        indices, self._stream_lanes = self._interleave_lanes(
+            rows, window % self.lanes, start
+        )
+        self._stream_start, self._lane_start = self.consumed, start
+        self._lane_resume = None
+        return indices
+
+    def _lane_positions(self) -> Optional[np.ndarray]:
+        if self._stream_lanes is None:
+            return self._lane_resume
+        done = self._stream_lanes[: self.consumed - self._stream_start]
+        return self._lane_start + np.bincount(done, minlength=self.lanes)
+
+    def set_epoch(self, epoch: int) -> None:
+        if epoch != self.epoch:
+            self._stream_lanes, self._lane_resume = None, None
+        super().set_epoch(epoch)
+
+    def state_dict(self) -> Dict[str, Any]:
+        state = super().state_dict()
+        positions = self._lane_positions() if self._interleaved else None
+        if positions is not None:
+            state["lane_consumed"] = positions.tolist()
+        return state
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        super().load_state_dict(state)
+        self._stream_lanes = None
+        lanes = state.get("lane_consumed")
+        if lanes is not None and len(lanes) != self.lanes:
+            raise ValueError(
+                f"Sampler state has {len(lanes)} lanes, not {self.lanes}; resume "
+                "with the same data.num_workers."
+            )
+        self._lane_resume = np.asarray(lanes, dtype=np.int64) if lanes else None
+
+    def _windowed_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        # The rank's rows, shuffled within windows, and the window of each row.
+        rng = np.random.default_rng([self.seed, self.epoch])
+        uniq, inverse = np.unique(self.chunk_ids, return_inverse=True)
+        if self.shuffle:
+            chunk_rank = rng.permutation(len(uniq))[inverse.reshape(-1)]
+        else:
+            chunk_rank = inverse.reshape(-1)
+        order = np.resize(np.argsort(chunk_rank, kind="stable"), self.total_size)
+        start = self.rank * self.num_samples
+        mine = order[start : start + self.num_samples]
+        if not self.shuffle:
+            return mine, np.zeros(len(mine), dtype=np.int64)
+
+        key = chunk_rank[mine]
+        new_chunk = np.concatenate([[True], key[1:] != key[:-1]])
+        window = (np.cumsum(new_chunk) - 1) // self.buffer_chunks
+        # Sort by window, then by a random key: shuffles within each window.
+        shuffled = np.lexsort((rng.random(len(mine)), window))
+        return mine[shuffled], window[shuffled]
+
+    def _interleave_lanes(
+        self, rows: np.ndarray, lane: np.ndarray, start: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Full batches of every lane, ordered (batch k of lane 0, of lane 1, ...);
+        # the lanes' partial tails go last, so re-batching the flat order by
+        # `lane_batch_size` reproduces exactly these batches. `start` skips
+        # each lane's consumed rows. Returns the rows and the lane of each.
+        bs = self.lane_batch_size
+        assert bs is not None
+        batches, keys, tails = [], [], []
+        for lane_id in range(self.lanes):
+            lane_rows = rows[lane == lane_id]
+            if start is not None:
+                lane_rows = lane_rows[int(start[lane_id]) :]
+            n_full = len(lane_rows) // bs
+            batches.append(lane_rows[: n_full * bs].reshape(n_full, bs))
+            keys.append(np.arange(n_full) * self.lanes + lane_id)
+            tails.append(lane_rows[n_full * bs :])
+        order = np.argsort(np.concatenate(keys), kind="stable")
+        full = np.concatenate(batches)[order]
+        full_lanes = np.concatenate(keys)[order] % self.lanes
+        row_lanes = [np.repeat(full_lanes, bs)]
+        row_lanes += [np.full(len(t), i) for i, t in enumerate(tails)]
+        return (
+            np.concatenate([full.reshape(-1), *tails]),
+            np.concatenate(row_lanes).astype(np.int64),
+        )
+
+
+class LengthBucketSampler(ResumableSampler):
+    """
+    Batches of similar-length sequences, to minimize padding.
+
+    Each epoch, the rank's shuffled indices are cut into pools of
+    `bucket_batches * bucket_batch_size` samples; each pool is sorted by
+    `lengths` and split into batches, and batch order is shuffled across the
+    whole epoch. Re-batching the flat order by `bucket_batch_size` (which is
+    what `ResumableSampler.__iter__` does with `batch_size` set) yields exactly
+    these batches. Larger pools pad less but make batch contents less random.
+    """
+
+    def __init__(
+        self,
+        dataset: Sized,
+        lengths: np.ndarray,
+        bucket_batches: int = 100,
+        bucket_batch_size: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(dataset, **kwargs)
+        self.lengths = np.asarray(lengths)
+        if len(self.lengths) != self.num_rows:
+            raise ValueError("lengths must have one entry per dataset position.")
+        self.bucket_batches = max(1, int(bucket_batches))
+        bucket_batch_size = bucket_batch_size or self.batch_size
+        if not bucket_batch_size:
+            raise ValueError("LengthBucketSampler needs a batch size.")
+        self.bucket_batch_size = bucket_batch_size
+
+    def _rank_indices(self) -> np.ndarray:
+        mine = super()._rank_indices()
+        if not self.shuffle or len(mine) == 0:
+            return mine
+        rng = np.random.default_rng([self.seed, self.epoch, 1])
+        bs = self.bucket_batch_size
+        pool = self.bucket_batches * bs
+        batches: List[np.ndarray] = []
+        for start in range(0, len(mine), pool):
+            part = mine[start : start + pool]
+            part = part[np.argsort(self.lengths[part], kind="stable")]
+            batches.extend(part[i : i + bs] for i in range(0, len(part), bs))
+        # A short batch can only come last, or re-batching would shift the rest.
+        tail = [batches.pop()] if len(batches[-1]) < bs else []
+        order = rng.permutation(len(batches))
+        return np.concatenate([batches[i] for i in order] + tail)
+
+
+class AliasTable:
+    """
+    Vose's alias method: O(1) draws from a discrete distribution.
+
+    Column `i` keeps itself with probability `prob[i]` and otherwise yields
+    `alias[i]`. The table is built without a Python loop: small items'
+    deficits and large items' excesses are laid on two tapes (cumulative
+    sums), and each small item is aliased to the large item whose excess
+    interval its deficit starts in. This is the pairing Vose's algorithm
+    produces when a large item that drops below 1 is topped up by the next
+    one. Storage is 8 bytes per item (float32 + int32).
+    """
+
+    def __init__(self, weights: Union[Sequence[float], np.ndarray]):
+        w = np.asarray(weights, dtype=np.float64)
+        if w.ndim != 1 or len(w) == 0 or (w < 0).any() or not w.sum() > 0:
+            raise ValueError("weights must be a non-empty, non-negative 1-D array.")
+        n = len(w)
+        q = w * (n / w.sum())
+        small = np.flatnonzero(q < 1.0)
+        large = np.flatnonzero(q >= 1.0)
+        index_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+        self.prob: np.ndarray = np.ones(n, dtype=np.float32)
+        self.alias: np.ndarray = np.arange(n, dtype=index_dtype)
+        if len(small) == 0 or len(large) == 0:
+            return
+        deficit_end = np.cumsum(1.0 - q[small])
+        deficit_start = deficit_end - (1.0 - q[small])
+        excess_end = np.cumsum(q[large] - 1.0)
+        last = len(large) - 1
+        owner = np.minimum(np.searchsorted(excess_end, deficit_start, "right"), last)
+        self.prob[small] = q[small]
+        self.alias[small] = large[owner]
+        # A large item gives away more than its excess when a deficit straddles
+        # the end of its interval; the overdraw is filled by the next large item.
+        k = np.searchsorted(deficit_end, excess_end, "right")
+        straddles = k < len(small)
+        k = np.minimum(k, len(small) - 1)
+        overdraw = np.where(
+            straddles & (deficit_start[k] < excess_end),
+            deficit_end[k] - excess_end,
+            0.0,
+        )
+        overdraw[last] = 0.0  # rounding error only
+        self.prob[large] = 1.0 - np.clip(overdraw, 0.0, 1.0)
+        self.alias[large[:-1]] = large[1:]
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        cols = rng.integers(0, len(self.prob), size=size)
+        keep = rng.random(size, dtype=np.float32) < self.prob[cols]
+        return np.where(keep, cols, self.alias[cols])
+
+
+class WeightedAliasSampler(ResumableSampler):
+    """
+    Draws `epoch_samples` dataset positions with replacement, deterministic in
+    `(seed, epoch, rank)`, for class balancing or per-row weights.
+
+    With `labels`, classes are drawn from an `AliasTable` over
+    `class_weights` ("balanced" weighs every present class equally) and rows
+    uniformly within the class, via one counting sort of the labels (4 bytes
+    per row). With `row_weights`, rows are drawn from a per-row table.
+    Batching, ranks and resuming are inherited from `ResumableSampler`.
+    """
+
+    def __init__(
+        self,
+        dataset: Sized,
+        labels: Optional[np.ndarray] = None,
+        class_weights: Union[str, Sequence[float]] = "balanced",
+        row_weights: Optional[np.ndarray] = None,
+        epoch_samples: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(dataset, **kwargs)
+        if (labels is None) == (row_weights is None):
+            raise ValueError("Pass exactly one of labels or row_weights.")
+        self._order: Optional[np.ndarray] = None
+        self._class_start: Optional[np.ndarray] = None
+        self._class_count: Optional[np.ndarray] = None
+        if row_weights is not None:
+            self.table = AliasTable(row_weights)
+        else:
+            labels = np.asarray(labels)
+            counts = np.bincount(labels)
+            if isinstance(class_weights, str):
+                if class_weights != "balanced":
+                    raise ValueError(f"Unknown class_weights {class_weights!r}")
+                weights = (counts > 0).astype(np.float64)
+            else:
+                # Indexed by class id; weights for classes absent from the
+                # labels are allowed and never drawn.
+                weights = np.asarray(class_weights, dtype=np.float64)
+                if weights.ndim != 1 or len(weights) < len(counts):
+                    raise ValueError(
+                        f"class_weights needs one weight per class id 0.."
+                        f"{len(counts) - 1}, got {len(np.atleast_1d(weights))}"
+                    )
+                counts = np.bincount(labels, minlength=len(weights))
+                weights = np.where(counts > 0, weights, 0.0)
+            self.table = AliasTable(weights)
+            # Stable argsort of <=16-bit keys is a radix sort: O(n).
+            keys = labels.astype(np.uint16 if len(counts) <= 2**16 else np.int64)
+            index_dtype = np.int32 if len(labels) < np.iinfo(np.int32).max else np.int64
+            self._order = np.argsort(keys, kind="stable").astype(index_dtype)
+            self._class_count = counts
+            self._class_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        if epoch_samples is not None:
+            self.num_samples = -(-int(epoch_samples) // self.num_replicas)
+            self.total_size = self.num_samples * self.num_replicas
+
+    def _rank_indices(self) -> np.ndarray:
+        rng = np.random.default_rng([self.seed, self.epoch, self.rank])
+        if self._order is None:
+            return self.table.sample(self.num_samples, rng)
+        cls = self.table.sample(self.num_samples, rng)
+        assert self._class_start is not None and self._class_count is not None
+        offset = (rng.random(self.num_samples) * self._class_count[cls]).astype(
+            np.int64
+        )
+        rows: np.ndarray = self._order[self._class_start[cls] + offset]
+        return rows
+
+
+def padding_fraction(
+    lengths: np.ndarray, batches: Iterable[Union[Sequence[int], np.ndarray]]
+) -> float:
+    """Share of padded positions when each batch is padded to its longest row."""
+    lengths = np.asarray(lengths)
+    real = padded = 0
+    for batch in batches:
+        batch_lengths = lengths[np.asarray(batch)]
+        real += int(batch_lengths.sum())
+        padded += int(batch_lengths.max()) * len(batch_lengths)
+    return 1.0 - real / max(padded, 1)
+{%- endif %}
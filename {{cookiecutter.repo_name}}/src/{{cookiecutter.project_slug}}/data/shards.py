@@ -0,0 +1,286 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+from {{cookiecutter.project_slug}}.data.chunks import Chunk, ChunkedDataset
+from {{cookiecutter.project_slug}}.data.memmap import GROUPS_FILE, LABELS_FILE, _to_numpy
+
+BLOCKS_FILE = "features.blocks"
+INDEX_FILE = "blocks.npy"  # int64 byte offsets, [n_blocks + 1]
+SHARD_META_FILE = "shards.json"
+_LABELS_TMP = ".labels.tmp"
+
+Codec = Tuple[Callable[[bytes], bytes], Callable[[memoryview], bytes]]
+
+
+def _codec(name: str, level: int = 3) -> Codec:
+    """`(compress, decompress)` for `name`; the libraries are optional extras."""
+    if name == "none":
+        return bytes, bytes
+    if name == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "codec 'zstd' needs zstandard (pip install -e '.[compression]')"
+            ) from e
+        compressor = zstandard.ZstdCompressor(level=level)
+        # Frames record their content size, so decompression is one call.
+        return compressor.compress, zstandard.ZstdDecompressor().decompress
+    if name == "lz4":
+        try:
+            import lz4.frame
+        except ImportError as e:
+            raise ImportError(
+                "codec 'lz4' needs lz4 (pip install -e '.[compression]')"
+            ) from e
+        return (
+            lambda data: lz4.frame.compress(data, compression_level=level),
+            lz4.frame.decompress,
+        )
+    raise ValueError(f"Unknown codec {name!r} (expected zstd | lz4 | none)")
+
+
+@dataclass(frozen=True)
+class ShardMeta:
+    n_samples: int
+    n_features: int
+    n_classes: int
+    block_rows: int
+    codec: str
+    level: int
+    # Store byte planes (all first bytes, then all second bytes, ...): float
+    # exponents and high mantissa bytes repeat, which compresses far better.
+    byte_shuffle: bool = True
+    dtype: str = "float32"
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+
+    @property
+    def n_blocks(self) -> int:
+        return -(-self.n_samples // self.block_rows)
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / max(self.compressed_bytes, 1)
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "ShardMeta":
+        return ShardMeta(**json.loads((Path(path) / SHARD_META_FILE).read_text()))
+
+
+def _encode(block: np.ndarray, byte_shuffle: bool) -> bytes:
+    raw: np.ndarray = np.ascontiguousarray(block).reshape(-1).view(np.uint8)
+    if byte_shuffle:
+        raw = raw.reshape(-1, block.dtype.itemsize).T
+    return np.ascontiguousarray(raw).tobytes()
+
+
+def _decode(data: bytes, meta: ShardMeta) -> np.ndarray:
+    dtype = np.dtype(meta.dtype)
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if meta.byte_shuffle:
+        raw = np.ascontiguousarray(raw.reshape(dtype.itemsize, -1).T)
+    # May be a read-only view; `ChunkedDataset` copies rows out of chunks.
+    return raw.view(dtype).reshape(-1, meta.n_features)
+
+
+class ShardDatasetWriter:
+    """
+    Writes a classification dataset as compressed fixed-size row blocks.
+
+    Features go to one file of independently compressed blocks of
+    `block_rows` rows plus an offset index, so a reader decompresses only the
+    blocks it touches. Labels (and optional groups) stay plain `.npy`: they
+    are small and splits need them without decoding features. Rows are
+    streamed, so the total count does not have to be known up front.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        n_features: int,
+        n_classes: Optional[int] = None,
+        dtype: str = "float32",
+        block_rows: int = 4096,
+        codec: str = "zstd",
+        level: int = 3,
+        byte_shuffle: bool = True,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._compress, _ = _codec(codec, level)
+        self.meta = ShardMeta(
+            n_samples=0,
+            n_features=n_features,
+            n_classes=n_classes or 0,
+            block_rows=block_rows,
+            codec=codec,
+            level=level,
+            byte_shuffle=byte_shuffle,
+            dtype=dtype,
+        )
+        self._infer_classes = n_classes is None
+        self._blocks = open(self.path / BLOCKS_FILE, "wb")
+        self._labels = open(self.path / _LABELS_TMP, "wb")
+        self._offsets = [0]
+        self._pending = np.empty((0, n_features), dtype=np.dtype(dtype))
+        self._n = 0
+
+    def _flush_block(self, block: np.ndarray) -> None:
+        data = self._compress(_encode(block, self.meta.byte_shuffle))
+        self._blocks.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def write(self, X: Any, y: Any) -> None:
+        X = _to_numpy(X).astype(self.meta.dtype, copy=False)
+        y = _to_numpy(y).astype(np.int64, copy=False)
+        if len(y) != len(X):
+            raise ValueError(f"Got {len(X)} feature rows but {len(y)} labels.")
+        if X.ndim != 2 or X.shape[1] != self.meta.n_features:
+            raise ValueError(
+                f"Expected [N, {self.meta.n_features}] features, got {X.shape}."
+            )
+        self._labels.write(y.tobytes())
+        self._n += len(X)
+        if self._infer_classes and len(y):
+            n_classes = max(self.meta.n_classes, int(y.max()) + 1)
+            self.meta = replace(self.meta, n_classes=n_classes)
+        rows = self.meta.block_rows
+        if len(self._pending):
+            X = np.concatenate([self._pending, X])
+        n_full = len(X) // rows * rows
+        for start in range(0, n_full, rows):
+            self._flush_block(X[start : start + rows])
+        self._pending = X[n_full:].copy()
+
+    def close(self) -> ShardMeta:
+        if len(self._pending):
+            self._flush_block(self._pending)
+        self._blocks.close()
+        self._labels.close()
+        labels_tmp = self.path / _LABELS_TMP
+        labels = np.lib.format.open_memmap(
+            self.path / LABELS_FILE, mode="w+", dtype=np.int64, shape=(self._n,)
+        )
+        if self._n:
+            labels[:] = np.memmap(labels_tmp, dtype=np.int64, mode="r")
+        labels.flush()
+        del labels
+        labels_tmp.unlink()
+        np.save(self.path / INDEX_FILE, np.asarray(self._offsets, dtype=np.int64))
+        itemsize = np.dtype(self.meta.dtype).itemsize
+        self.meta = replace(
+            self.meta,
+            n_samples=self._n,
+            raw_bytes=self._n * self.meta.n_features * itemsize,
+            compressed_bytes=self._offsets[-1],
+        )
+        meta_json = json.dumps(asdict(self.meta), indent=2)
+        (self.path / SHARD_META_FILE).write_text(meta_json)
+        return self.meta
+
+    def __enter__(self) -> "ShardDatasetWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._blocks.close()
+            self._labels.close()
+
+
+def write_shard_dataset(
+    path: Union[str, Path],
+    X: Any,
+    y: Any,
+    n_classes: Optional[int] = None,
+    chunk_rows: int = 65536,
+    groups: Any = None,
+    **writer_kwargs: Any,
+) -> ShardMeta:
+    """
+    Write `X`/`y` (and optional `groups`) as a shard directory.
+
+    `X` may be a memmap (e.g. an existing `features.npy`): it is read
+    `chunk_rows` at a time. `writer_kwargs` go to `ShardDatasetWriter`.
+    """
+    # np.asarray keeps memmaps lazy: nothing is read until a chunk is sliced.
+    X, y = _to_numpy(X), _to_numpy(y)
+    n_classes = int(n_classes if n_classes is not None else y.max() + 1)
+    with ShardDatasetWriter(
+        path, X.shape[1], n_classes, dtype=str(X.dtype), **writer_kwargs
+    ) as writer:
+        for start in range(0, len(X), chunk_rows):
+            writer.write(X[start : start + chunk_rows], y[start : start + chunk_rows])
+    if groups is not None:
+        np.save(Path(path) / GROUPS_FILE, _to_numpy(groups))
+    return writer.meta
+
+
+class ShardClassificationDataset(ChunkedDataset):
+    """
+    A classification dataset served from a directory written by
+    `ShardDatasetWriter`, one compressed block per chunk.
+
+    The block file is memory-mapped, so compressed bytes are shared through
+    the page cache and a block costs one slice and one decompression. Decoded
+    blocks live in the per-worker LRU of `ChunkedDataset`; train with
+    `ChunkShuffleSampler` (`data.shuffle_mode=chunk`) so each block is
+    decompressed about once per epoch.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        cache_chunks: int = 16,
+        transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    ):
+        super().__init__(cache_chunks=cache_chunks, transform=transform)
+        self.path = Path(path)
+        self.meta = ShardMeta.load(self.path)
+        self.index = np.load(self.path / INDEX_FILE)
+        self.chunk_offsets = np.minimum(
+            np.arange(self.meta.n_blocks + 1, dtype=np.int64) * self.meta.block_rows,
+            self.meta.n_samples,
+        )
+        self._blob: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._decompress: Optional[Callable[[memoryview], bytes]] = None
+
+    def _open(self) -> Tuple[np.ndarray, np.ndarray, Callable[[memoryview], bytes]]:
+        # Opened lazily and dropped when pickled, like the memmap dataset.
+        if self._blob is None or self._labels is None or self._decompress is None:
+            self._blob = np.memmap(self.path / BLOCKS_FILE, dtype=np.uint8, mode="r")
+            self._labels = np.load(self.path / LABELS_FILE, mmap_mode="r")
+            _, self._decompress = _codec(self.meta.codec, self.meta.level)
+        return self._blob, self._labels, self._decompress
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state.update(_blob=None, _labels=None, _decompress=None)
+        return state
+
+    def _read_chunk(self, i: int) -> Chunk:
+        blob, labels, decompress = self._open()
+        data = decompress(memoryview(blob[self.index[i] : self.index[i + 1]]))
+        start, stop = self.chunk_offsets[i], self.chunk_offsets[i + 1]
+        return _decode(data, self.meta), np.asarray(labels[start:stop])
+
+    @property
+    def y(self) -> torch.Tensor:
+        return torch.from_numpy(np.load(self.path / LABELS_FILE, mmap_mode="c"))
+
+    @property
+    def groups(self) -> Optional[np.ndarray]:
+        path = self.path / GROUPS_FILE
+        return np.load(path, mmap_mode="r") if path.exists() else None
+{%- endif %}
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import shutil
+import uuid
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
 
 import numpy as np
 
+SPLIT_MODES = ("random", "stratified", "group")
+
 
 @dataclass(frozen=True)
 class Split:
@@ -12,18 +21,205 @@ class Split:
     test_idx: np.ndarray
 
 
-def random_split_indices(
-    n: int, seed: int = 42, val_frac: float = 0.1, test_frac: float = 0.1
-) -> Split:
+def _check_fracs(val_frac: float, test_frac: float) -> None:
     assert (
         0.0 <= val_frac < 1.0 and 0.0 <= test_frac < 1.0 and val_frac + test_frac < 1.0
     )
-    rng = np.random.default_rng(seed)
-    idx = np.arange(n)
+
+
+def index_dtype(n: int) -> np.dtype:
+    # int32 halves the footprint of split/Subset indices below 2**31 rows.
+    return np.dtype(np.int32) if n < 2**31 else np.dtype(np.int64)
+
+
+def _shuffled_arange(n: int, rng: np.random.Generator) -> np.ndarray:
+    idx = np.arange(n, dtype=index_dtype(n))
     rng.shuffle(idx)
+    return idx
+
+
+def random_split_indices(
+    n: int, seed: int = 42, val_frac: float = 0.1, test_frac: float = 0.1
+) -> Split:
+    _check_fracs(val_frac, test_frac)
+    rng = np.random.default_rng(seed)
+    idx = _shuffled_arange(n, rng)
     n_test = int(n * test_frac)
     n_val = int(n * val_frac)
     test = idx[:n_test]
     val = idx[n_test : n_test + n_val]
     train = idx[n_test + n_val :]
     return Split(train, val, test)
+
+
+def _dense_codes(values: np.ndarray) -> np.ndarray:
+    # Small non-negative integer codes, as narrow as possible so that the stable
+    # argsort below runs as an O(n) radix sort.
+    is_int = np.issubdtype(values.dtype, np.integer)
+    if is_int and (values.size == 0 or values.min() >= 0):
+        codes = values
+    else:
+        codes = np.unique(values, return_inverse=True)[1].reshape(-1)
+    n_codes = int(codes.max()) + 1 if codes.size else 0
+    if n_codes <= 2**8:
+        return codes.astype(np.uint8, copy=False)
+    if n_codes <= 2**16:
+        return codes.astype(np.uint16, copy=False)
+    return codes.astype(np.int64, copy=False)
+
+
+def stratified_split_indices(
+    labels: np.ndarray, seed: int = 42, val_frac: float = 0.1, test_frac: float = 0.1
+) -> Split:
+    """Per-class random split: each class contributes the same fractions."""
+    _check_fracs(val_frac, test_frac)
+    labels = np.asarray(labels).reshape(-1)
+    n = len(labels)
+    rng = np.random.default_rng(seed)
+    perm = _shuffled_arange(n, rng)
+
+    codes = _dense_codes(labels)[perm]
+    order = np.argsort(codes, kind="stable")
+    grouped = perm[order]  # grouped by class, shuffled within each class
+    counts = np.bincount(codes, minlength=int(codes.max()) + 1 if n else 0)
+    starts = np.cumsum(counts) - counts
+    n_test = (counts * test_frac).astype(np.int64)
+    n_val = (counts * val_frac).astype(np.int64)
+
+    dtype = index_dtype(n)
+    cls = codes[order]
+    rank = np.arange(n, dtype=dtype) - starts.astype(dtype)[cls]
+    is_test = rank < n_test[cls]
+    is_val = ~is_test & (rank < (n_test + n_val)[cls])
+    return Split(grouped[~(is_test | is_val)], grouped[is_val], grouped[is_test])
+
+
+def group_split_indices(
+    groups: np.ndarray, seed: int = 42, val_frac: float = 0.1, test_frac: float = 0.1
+) -> Split:
+    """Random split of whole groups: rows sharing a group id never cross splits."""
+    _check_fracs(val_frac, test_frac)
+    groups = np.asarray(groups).reshape(-1)
+    n = len(groups)
+    rng = np.random.default_rng(seed)
+
+    _, inverse = np.unique(groups, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sizes = np.bincount(inverse)
+    order = rng.permutation(len(sizes))
+    filled = np.cumsum(sizes[order])
+    # 0 = test, 1 = val, 2 = train, by cumulative row count in shuffled group order.
+    split_of_group = np.empty(len(sizes), dtype=np.int8)
+    split_of_group[order] = np.searchsorted(
+        [n * test_frac, n * (test_frac + val_frac)], filled, side="left"
+    )
+    split_of_row = split_of_group[inverse]
+    dtype = index_dtype(n)
+    test, val, train = (
+        np.flatnonzero(split_of_row == s).astype(dtype) for s in (0, 1, 2)
+    )
+    return Split(train, val, test)
+
+
+def split_indices(
+    n: int,
+    seed: int = 42,
+    val_frac: float = 0.1,
+    test_frac: float = 0.1,
+    mode: str = "random",
+    labels: Optional[np.ndarray] = None,
+    groups: Optional[np.ndarray] = None,
+    keep: Optional[np.ndarray] = None,
+) -> Split:
+    """
+    Dispatch to the split function for `mode` (see `SPLIT_MODES`).
+
+    With a boolean `keep` mask (e.g. from `data.dedup`), only kept rows are
+    split; the returned indices still refer to positions in all `n` rows.
+    """
+    if keep is not None:
+        keep = np.asarray(keep, dtype=bool).reshape(-1)
+        if len(keep) != n:
+            raise ValueError(f"keep mask has {len(keep)} rows, dataset has {n}.")
+        kept = np.flatnonzero(keep).astype(index_dtype(n))
+        split = split_indices(
+            len(kept),
+            seed,
+            val_frac,
+            test_frac,
+            mode,
+            None if labels is None else np.asarray(labels).reshape(-1)[kept],
+            None if groups is None else np.asarray(groups).reshape(-1)[kept],
+        )
+        return Split(kept[split.train_idx], kept[split.val_idx], kept[split.test_idx])
+    if mode == "random":
+        return random_split_indices(n, seed, val_frac, test_frac)
+    if mode == "stratified":
+        if labels is None:
+            raise ValueError("Split mode 'stratified' needs labels.")
+        return stratified_split_indices(labels, seed, val_frac, test_frac)
+    if mode == "group":
+        if groups is None:
+            raise ValueError("Split mode 'group' needs groups.")
+        return group_split_indices(groups, seed, val_frac, test_frac)
+    raise ValueError(f"Unknown split mode {mode!r}; expected one of {SPLIT_MODES}")
+
+
+def array_digest(a: np.ndarray) -> str:
+    a = np.ascontiguousarray(a)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((a.dtype.str, a.shape)).encode("utf-8"))
+    h.update(memoryview(a).cast("B"))
+    return h.hexdigest()
+
+
+def cached_split(
+    cache_dir: Union[str, Path],
+    n: int,
+    seed: int = 42,
+    val_frac: float = 0.1,
+    test_frac: float = 0.1,
+    mode: str = "random",
+    labels: Optional[np.ndarray] = None,
+    groups: Optional[np.ndarray] = None,
+    keep: Optional[np.ndarray] = None,
+) -> Split:
+    """
+    Compute a split once and reuse it from `cache_dir` afterwards.
+
+    Indices are stored as `.npy` files in a directory keyed by
+    `(mode, n, seed, fractions, digest of labels/groups and keep mask)` and
+    loaded as read-only memmaps on reuse.
+    """
+    by = {"stratified": labels, "group": groups}.get(mode)
+    key_src = {
+        "mode": mode,
+        "n": n,
+        "seed": seed,
+        "val_frac": val_frac,
+        "test_frac": test_frac,
+        "digest": array_digest(by) if by is not None else None,
+    }
+    if keep is not None:
+        key_src["keep"] = array_digest(np.asarray(keep, dtype=bool))
+    key = hashlib.sha256(json.dumps(key_src, sort_keys=True).encode()).hexdigest()[:32]
+    entry = Path(cache_dir) / key
+    names = ("train_idx", "val_idx", "test_idx")
+    if (entry / "split.json").exists():
+        return Split(*(np.load(entry / f"{k}.npy", mmap_mode="r") for k in names))
+
+    split = split_indices(n, seed, val_frac, test_frac, mode, labels, groups, keep)
+
+    tmp = entry.parent / f".{key}.{uuid.uuid4().hex}.tmp"
+    tmp.mkdir(parents=True)
+    try:
+        for k in names:
+            np.save(tmp / f"{k}.npy", getattr(split, k))
+        (tmp / "split.json").write_text(json.dumps(key_src, indent=2))
+        os.rename(tmp, entry)
+    except OSError:
+        if not (entry / "split.json").exists():
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return split
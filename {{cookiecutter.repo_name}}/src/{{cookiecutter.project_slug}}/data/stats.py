@@ -0,0 +1,250 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from loguru import logger
+from torch.utils.data import Dataset
+
+from {{cookiecutter.project_slug}}.data.rng import counter_uniform
+from {{cookiecutter.project_slug}}.data.transforms import Standardize
+
+DEFAULT_QUANTILES = (0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999)
+
+
+class StreamingStats:
+    """
+    Mergeable one-pass feature statistics.
+
+    Moments are accumulated per chunk with vectorized float64 reductions and
+    combined with Chan et al.'s parallel update, which is the batched form of
+    Welford's algorithm. Quantiles come from a bottom-k sample: each row gets
+    a priority that is a pure function of `(seed, row)`, and the `sample_size`
+    rows with the smallest priorities are kept. Shards can therefore be
+    processed in any order or in parallel, and merging them gives exactly the
+    single-pass result.
+    """
+
+    def __init__(self, n_features: int, sample_size: int = 8192, seed: int = 0):
+        self.n_features = n_features
+        self.sample_size = sample_size
+        self.seed = seed
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.class_counts = np.zeros(0, dtype=np.int64)
+        self._sample = np.empty((0, n_features), dtype=np.float32)
+        self._priority = np.empty(0)
+
+    def _merge_moments(self, n: int, mean: np.ndarray, m2: np.ndarray) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta**2 * (self.count * n / total)
+        self.count = total
+
+    def _keep_smallest(self, sample: np.ndarray, priority: np.ndarray) -> None:
+        if len(priority) > self.sample_size:
+            keep = np.argpartition(priority, self.sample_size)[: self.sample_size]
+            sample, priority = sample[keep], priority[keep]
+        self._sample, self._priority = sample, priority
+
+    def _add_class_counts(self, counts: np.ndarray) -> None:
+        size = max(len(counts), len(self.class_counts))
+        merged = np.zeros(size, dtype=np.int64)
+        merged[: len(self.class_counts)] += self.class_counts
+        merged[: len(counts)] += counts
+        self.class_counts = merged
+
+    def update(
+        self, x: Any, y: Any = None, rows: Optional[np.ndarray] = None
+    ) -> "StreamingStats":
+        """Add a `[N, F]` chunk; `rows` are its global row ids (default: running)."""
+        x = np.asarray(x).reshape(-1, self.n_features)
+        n = len(x)
+        if n == 0:
+            return self
+        if rows is None:
+            rows = np.arange(self.count, self.count + n)
+        x64 = x.astype(np.float64, copy=False)
+        mean = x64.mean(axis=0)
+        m2 = ((x64 - mean) ** 2).sum(axis=0)
+        self._merge_moments(n, mean, m2)
+        np.minimum(self.min, x64.min(axis=0), out=self.min)
+        np.maximum(self.max, x64.max(axis=0), out=self.max)
+
+        priority = counter_uniform(rows, self.seed)
+        self._keep_smallest(
+            np.concatenate([self._sample, x.astype(np.float32, copy=False)]),
+            np.concatenate([self._priority, priority]),
+        )
+        if y is not None:
+            self._add_class_counts(np.bincount(np.asarray(y).reshape(-1)))
+        return self
+
+    def merge(self, other: "StreamingStats") -> "StreamingStats":
+        if other.count == 0:
+            return self
+        self._merge_moments(other.count, other.mean, other.m2)
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        self._keep_smallest(
+            np.concatenate([self._sample, other._sample]),
+            np.concatenate([self._priority, other._priority]),
+        )
+        self._add_class_counts(other.class_counts)
+        return self
+
+    def finalize(
+        self, quantiles: Sequence[float] = DEFAULT_QUANTILES
+    ) -> "DatasetStats":
+        if self.count == 0:
+            raise ValueError("No rows were seen.")
+        qs = np.quantile(self._sample, quantiles, axis=0)
+        return DatasetStats(
+            n_samples=self.count,
+            mean=self.mean.tolist(),
+            std=np.sqrt(self.m2 / self.count).tolist(),
+            min=self.min.tolist(),
+            max=self.max.tolist(),
+            quantiles={repr(float(q)): row.tolist() for q, row in zip(quantiles, qs)},
+            class_counts=self.class_counts.tolist(),
+            sample_size=len(self._sample),
+        )
+
+
+@dataclass(frozen=True)
+class DatasetStats:
+    """Per-feature moments, approximate quantiles and class counts (JSON-able)."""
+
+    n_samples: int
+    mean: List[float]
+    std: List[float]
+    min: List[float]
+    max: List[float]
+    quantiles: Dict[str, List[float]] = field(default_factory=dict)
+    class_counts: List[int] = field(default_factory=list)
+    # Rows behind the quantile estimates (rank error is about 1/sqrt(sample_size)).
+    sample_size: int = 0
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2))
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "DatasetStats":
+        return DatasetStats(**json.loads(Path(path).read_text()))
+
+    def standardize(self) -> Standardize:
+        # Constant features keep a unit scale instead of blowing up.
+        std = np.asarray(self.std)
+        return Standardize(self.mean, np.where(std > 0, std, 1.0).tolist())
+
+
+def _shard_stats(
+    dataset: Dataset[Any],
+    indices: np.ndarray,
+    n_features: int,
+    chunk_rows: int,
+    sample_size: int,
+    seed: int,
+) -> StreamingStats:
+    stats = StreamingStats(n_features, sample_size=sample_size, seed=seed)
+    for start in range(0, len(indices), chunk_rows):
+        rows = indices[start : start + chunk_rows]
+        x, y = dataset[rows]
+        stats.update(np.asarray(x), np.asarray(y), rows=rows)
+    return stats
+
+
+def compute_dataset_stats(
+    dataset: Dataset[Any],
+    indices: Optional[np.ndarray] = None,
+    chunk_rows: int = 65536,
+    n_jobs: Optional[int] = None,
+    sample_size: int = 8192,
+    seed: int = 0,
+) -> DatasetStats:
+    """
+    One pass over `dataset[indices]` (all rows by default) in parallel shards.
+
+    The dataset must accept index arrays (see `BatchedSubset`). Shards run in
+    threads: the reductions are NumPy/torch calls that release the GIL, and
+    memmap pages are read by the OS.
+    """
+    # Statistics do not depend on row order, so read in storage order.
+    if indices is None:
+        assert isinstance(dataset, Sized)
+        indices = np.arange(len(dataset))
+    else:
+        indices = np.sort(indices)
+    n_jobs = n_jobs or min(8, os.cpu_count() or 1)
+    n_features = int(np.asarray(dataset[indices[:1]][0]).shape[-1])
+    shards = [s for s in np.array_split(indices, n_jobs) if len(s)]
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        parts = list(
+            pool.map(
+                lambda s: _shard_stats(
+                    dataset, s, n_features, chunk_rows, sample_size, seed
+                ),
+                shards,
+            )
+        )
+    total = parts[0]
+    for part in parts[1:]:
+        total.merge(part)
+    return total.finalize()
+
+
+def compute_batch_stats(
+    batches: Iterable[Tuple[object, object]], sample_size: int = 8192, seed: int = 0
+) -> DatasetStats:
+    """One pass over an iterable of `(x, y)` batches (e.g. a Parquet stream)."""
+    stats: Optional[StreamingStats] = None
+    for x, y in batches:
+        x = np.asarray(x)
+        if stats is None:
+            stats = StreamingStats(x.shape[-1], sample_size=sample_size, seed=seed)
+        stats.update(x, y)
+    if stats is None:
+        raise ValueError("No batches were seen.")
+    return stats.finalize()
+
+
+def cached_stats(
+    cache_dir: Union[str, Path], key: str, compute: Callable[[], DatasetStats]
+) -> Tuple[DatasetStats, Path]:
+    """Load `cache_dir/<key>.json`, computing and saving it on first use."""
+    path = Path(cache_dir) / f"{key}.json"
+    if path.exists():
+        logger.info("Dataset stats cache hit: {}", path)
+        return DatasetStats.load(path), path
+    logger.info("Computing dataset stats -> {}", path)
+    stats = compute()
+    stats.save(path)
+    return stats, path
+{%- endif %}
@@ -0,0 +1,265 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""Tokenized text classification data (needs the `bigmodels` extra)."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pyarrow.compute as pc
+import torch
+from loguru import logger
+from torch.utils.data import Dataset
+
+from {{cookiecutter.project_slug}}.data.cache import DatasetCache, fingerprint
+from {{cookiecutter.project_slug}}.data.memmap import LABELS_FILE, META_FILE
+from {{cookiecutter.project_slug}}.integrations.dvc import dataset_digest
+
+TOKENS_FILE = "tokens.npy"  # all token ids, concatenated
+OFFSETS_FILE = "offsets.npy"  # int64 [N + 1]: row i is tokens[offsets[i]:offsets[i+1]]
+BUILDERS = {
+    ".parquet": "parquet",
+    ".jsonl": "json",
+    ".json": "json",
+    ".csv": "csv",
+    ".txt": "text",
+}
+
+
+@dataclass(frozen=True)
+class TextCacheMeta:
+    n_samples: int
+    n_tokens: int
+    max_len: int
+    vocab_size: int
+    pad_token_id: int
+    n_classes: int
+    dtype: str
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "TextCacheMeta":
+        return TextCacheMeta(**json.loads((Path(path) / META_FILE).read_text()))
+
+
+def _data_files(path: Path) -> List[Path]:
+    if path.is_file():
+        files = [path]
+    else:
+        files = sorted(f for f in path.rglob("*") if f.suffix in BUILDERS)
+    builders = {BUILDERS.get(f.suffix) for f in files}
+    if not files or len(builders) != 1 or None in builders:
+        raise ValueError(
+            f"Expected text data files of one kind ({', '.join(BUILDERS)}) under {path}"
+        )
+    return files
+
+
+def _load_tokenizer(tokenizer_path: Union[str, Path]) -> Any:
+    try:
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise ImportError(
+            "Text data needs transformers (pip install -e '.[bigmodels]')"
+        ) from e
+    # Local files only: the cache key hashes them, so they must be what is used.
+    return AutoTokenizer.from_pretrained(str(tokenizer_path), local_files_only=True)
+
+
+def build_token_cache(
+    out: Union[str, Path],
+    data_path: Union[str, Path],
+    tokenizer_path: Union[str, Path],
+    text_column: str = "text",
+    label_column: str = "label",
+    max_len: int = 512,
+    num_proc: Optional[int] = None,
+    batch_size: int = 1000,
+) -> TextCacheMeta:
+    """
+    Tokenize `data_path` with `datasets.map(batched=True, num_proc=...)` and
+    flatten the ragged ids into a memmap cache at `out`.
+    """
+    try:
+        import datasets
+    except ImportError as e:
+        raise ImportError(
+            "Text data needs datasets (pip install -e '.[bigmodels]')"
+        ) from e
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    files = _data_files(Path(data_path))
+    tokenizer = _load_tokenizer(tokenizer_path)
+    raw = datasets.load_dataset(
+        BUILDERS[files[0].suffix],
+        data_files=[str(f) for f in files],
+        split="train",
+        cache_dir=str(out / "hf"),
+    )
+
+    def tokenize(batch: Dict[str, List[Any]]) -> Any:
+        return tokenizer(
+            batch[text_column],
+            truncation=True,
+            max_length=max_len,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+
+    tokenized = raw.map(
+        tokenize,
+        batched=True,
+        batch_size=batch_size,
+        num_proc=num_proc,
+        remove_columns=[c for c in raw.column_names if c != label_column],
+        load_from_cache_file=False,
+        desc="Tokenizing",
+    )
+
+    # Flatten the Arrow list column chunk by chunk: lengths first, to size
+    # the memmap, then the values, without building Python lists.
+    ids = tokenized.data.column("input_ids")
+    lengths = np.concatenate(
+        [pc.list_value_length(c).to_numpy(zero_copy_only=False) for c in ids.chunks]
+    ).astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    vocab_size = len(tokenizer)
+    dtype = np.uint16 if vocab_size <= np.iinfo(np.uint16).max + 1 else np.int32
+    tokens = np.lib.format.open_memmap(
+        out / TOKENS_FILE, mode="w+", dtype=dtype, shape=(int(offsets[-1]),)
+    )
+    pos = 0
+    for chunk in ids.chunks:
+        values = chunk.flatten().to_numpy(zero_copy_only=False)
+        tokens[pos : pos + len(values)] = values
+        pos += len(values)
+    tokens.flush()
+    del tokens
+    labels = np.asarray(tokenized.data.column(label_column).to_numpy(), dtype=np.int64)
+    np.save(out / OFFSETS_FILE, offsets)
+    np.save(out / LABELS_FILE, labels)
+    shutil.rmtree(out / "hf", ignore_errors=True)
+
+    pad = tokenizer.pad_token_id
+    meta = TextCacheMeta(
+        n_samples=len(lengths),
+        n_tokens=int(offsets[-1]),
+        max_len=max_len,
+        vocab_size=vocab_size,
+        pad_token_id=int(pad if pad is not None else 0),
+        n_classes=int(labels.max()) + 1 if len(labels) else 0,
+        dtype=np.dtype(dtype).name,
+    )
+    # Written last: DatasetCache treats its presence as a complete entry.
+    (out / META_FILE).write_text(json.dumps(asdict(meta), indent=2))
+    return meta
+
+
+def cached_tokens(
+    data_path: Union[str, Path],
+    tokenizer_path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    text_column: str = "text",
+    label_column: str = "label",
+    max_len: int = 512,
+    num_proc: Optional[int] = None,
+    digest_cache_dir: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Token cache entry keyed by (tokenizer files, max_len, data digest),
+    building it on first use.
+
+    Both digests come from `integrations.dvc.dataset_digest`, which only
+    re-reads files whose (inode, size, mtime) changed, so a cache hit costs a
+    directory walk rather than a pass over the corpus.
+    """
+    tokenizer_digest = dataset_digest(tokenizer_path).digest
+    data_digest = dataset_digest(data_path, cache_dir=digest_cache_dir).digest
+    key = fingerprint(
+        "tokens", tokenizer_digest, max_len, data_digest, text_column, label_column
+    )
+    logger.info("Token cache key {} (tokenizer {})", key, tokenizer_digest[:12])
+    cache = DatasetCache(cache_dir)
+    return cache.get_or_build(
+        key,
+        lambda tmp: build_token_cache(
+            tmp,
+            data_path,
+            tokenizer_path,
+            text_column=text_column,
+            label_column=label_column,
+            max_len=max_len,
+            num_proc=num_proc,
+        ),
+    )
+
+
+class TokenizedTextDataset(Dataset[Tuple[Any, torch.Tensor]]):
+    """
+    Token ids served from a cache built by `build_token_cache`.
+
+    An index array returns a batch padded to its longest row:
+    `({"input_ids": [B, L], "attention_mask": [B, L]}, labels)`, gathered
+    with one vectorized fancy-index. Pair with `LengthBucketSampler` (via
+    `data.shuffle_mode=length`) so `L` stays close to every row's length.
+    A scalar index returns the unpadded `(ids, label)`.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        transform: Optional[Callable[[Dict[str, torch.Tensor]], Any]] = None,
+    ):
+        self.path = Path(path)
+        self.transform = transform
+        self.meta = TextCacheMeta.load(self.path)
+        self._tokens: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Opened lazily, like the memmap dataset, so workers map the files.
+        if self._tokens is None or self._offsets is None or self._labels is None:
+            self._tokens = np.load(self.path / TOKENS_FILE, mmap_mode="r")
+            self._offsets = np.load(self.path / OFFSETS_FILE)
+            self._labels = np.load(self.path / LABELS_FILE, mmap_mode="c")
+        return self._tokens, self._offsets, self._labels
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.update(_tokens=None, _offsets=None, _labels=None)
+        return state
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self._arrays()[1])
+
+    @property
+    def y(self) -> torch.Tensor:
+        return torch.from_numpy(self._arrays()[2])
+
+    def __len__(self) -> int:
+        return self.meta.n_samples
+
+    def __getitem__(self, idx: Any) -> Tuple[Any, torch.Tensor]:
+        tokens, offsets, labels = self._arrays()
+        if np.ndim(idx) == 0:
+            ids = tokens[offsets[idx] : offsets[idx + 1]].astype(np.int64)
+            return torch.from_numpy(ids), torch.tensor(int(labels[idx]))
+        rows = np.asarray(idx)
+        starts, lengths = offsets[rows], offsets[rows + 1] - offsets[rows]
+        width = int(lengths.max()) if len(rows) else 0
+        mask = np.arange(width) < lengths[:, None]
+        input_ids = np.full(mask.shape, self.meta.pad_token_id, dtype=np.int64)
+        input_ids[mask] = tokens[(starts[:, None] + np.arange(width))[mask]]
+        x: Dict[str, torch.Tensor] = {
+            "input_ids": torch.from_numpy(input_ids),
+            "attention_mask": torch.from_numpy(mask.astype(np.int64)),
+        }
+        if self.transform:
+            x = self.transform(x)
+        return x, torch.from_numpy(np.asarray(labels[rows]))
+{%- endif %}
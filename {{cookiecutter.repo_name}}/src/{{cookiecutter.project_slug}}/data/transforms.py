@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
 import torch
 
 
 class Identity:
-    def __call__(self, x):
+    def __call__(self, x: Any) -> Any:
         return x
 
 
@@ -12,10 +14,201 @@ def to_float32(x: torch.Tensor) -> torch.Tensor:
     return x.to(torch.float32)
 
 
-def compose(*fns):
-    def _c(x):
+def compose(*fns: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def _c(x: Any) -> Any:
         for fn in fns:
             x = fn(x)
         return x
 
     return _c
+
+
+# --------------------------------------------------------------------
+# Batch transforms
+#
+# Vectorized transforms over `[B, F]` feature tensors (a single `[F]` row also
+# works). They run once per batch, either in the DataLoader (as the dataset
+# transform with `data.batch_fetch`) or on the training device in
+# `ClassificationModule.on_after_batch_transfer`.
+#
+# `apply_` may modify its input in place; `BatchCompose` copies the batch once
+# and then runs every step on that buffer.
+# --------------------------------------------------------------------
+
+
+class BatchTransform:
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        raise NotImplementedError
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return self.apply_(x.to(torch.float32, copy=True))
+
+
+class Standardize(BatchTransform):
+    def __init__(self, mean: Sequence[float], std: Sequence[float], eps: float = 1e-8):
+        self.mean = torch.as_tensor(mean, dtype=torch.float32)
+        self.inv_std = 1.0 / (torch.as_tensor(std, dtype=torch.float32) + eps)
+
+    @classmethod
+    def from_affine(cls, mean: torch.Tensor, inv_std: torch.Tensor) -> "Standardize":
+        t = cls.__new__(cls)
+        t.mean, t.inv_std = mean, inv_std
+        return t
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        mean, inv_std = self.mean.to(x.device), self.inv_std.to(x.device)
+        return x.sub_(mean).mul_(inv_std)
+
+
+class Clip(BatchTransform):
+    def __init__(self, min: Optional[float] = None, max: Optional[float] = None):
+        self.min = min
+        self.max = max
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        return x.clamp_(self.min, self.max)
+
+
+class Log1p(BatchTransform):
+    """`sign(x) * log1p(|x|)` on `columns` (all columns if None)."""
+
+    def __init__(self, columns: Optional[Sequence[int]] = None):
+        self.columns = list(columns) if columns is not None else None
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        if self.columns is None:
+            sign = x.sign()
+            return x.abs_().log1p_().mul_(sign)
+        cols = x[..., self.columns]
+        x[..., self.columns] = cols.abs().log1p_().mul_(cols.sign())
+        return x
+
+
+class SelectFeatures(BatchTransform):
+    def __init__(self, indices: Sequence[int]):
+        self.indices = torch.as_tensor(list(indices), dtype=torch.long)
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        return x.index_select(-1, self.indices.to(x.device))
+
+
+class OneHot(BatchTransform):
+    """
+    Replaces integer-coded `column` with `num_classes` one-hot columns.
+    Codes outside `0..num_classes - 1` (unknown categories) get all zeros.
+    """
+
+    def __init__(self, column: int, num_classes: int):
+        self.column = column
+        self.num_classes = num_classes
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        codes = x[..., self.column].long()
+        known = (codes >= 0) & (codes < self.num_classes)
+        onehot = torch.nn.functional.one_hot(
+            codes.clamp(0, self.num_classes - 1), self.num_classes
+        )
+        onehot = onehot.mul_(known.unsqueeze(-1)).to(x.dtype)
+        c = self.column % x.shape[-1]
+        return torch.cat([x[..., :c], onehot, x[..., c + 1 :]], dim=-1)
+
+
+class ToFloat(BatchTransform):
+    """Float32 copy of the batch times `scale`, e.g. `1/255` for uint8 images."""
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        return x.mul_(self.scale) if self.scale != 1.0 else x
+
+
+class Flatten(BatchTransform):
+    """
+    Merges the trailing `dims` dimensions into one feature dimension, e.g.
+    `[B, 3, H, W] -> [B, 3 * H * W]` images for an MLP. Counting from the end
+    keeps single rows (`[3, H, W] -> [3 * H * W]`, `batch_fetch: false`) and
+    batches consistent.
+    """
+
+    def __init__(self, dims: int = 3):
+        self.dims = dims
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        return x.flatten(start_dim=-self.dims)
+
+
+class BatchCompose(BatchTransform):
+    """
+    Fused pipeline of batch transforms.
+
+    The input is copied to float32 once; adjacent `Standardize` steps are
+    folded into one affine step and all element-wise steps then update the
+    same buffer in place, so a pipeline costs one allocation plus one pass per
+    step rather than one new tensor per step.
+    """
+
+    def __init__(self, *transforms: BatchTransform):
+        self.transforms = _fold_affine(list(transforms))
+
+    def apply_(self, x: torch.Tensor) -> torch.Tensor:
+        for t in self.transforms:
+            x = t.apply_(x)
+        return x
+
+
+def append_transform(
+    transform: Optional[Callable[[Any], Any]], step: BatchTransform
+) -> Callable[[Any], Any]:
+    """`transform` followed by `step`, fused when `transform` is a pipeline."""
+    if transform is None or isinstance(transform, Identity):
+        return step
+    if isinstance(transform, BatchCompose):
+        return BatchCompose(*transform.transforms, step)
+    if isinstance(transform, BatchTransform):
+        return BatchCompose(transform, step)
+    return compose(transform, step)
+
+
+def _fold_affine(transforms: List[BatchTransform]) -> List[BatchTransform]:
+    folded: List[BatchTransform] = []
+    for t in transforms:
+        prev = folded[-1] if folded else None
+        if isinstance(t, Standardize) and isinstance(prev, Standardize):
+            # ((x - m1) * s1 - m2) * s2 == (x - (m1 + m2 / s1)) * (s1 * s2)
+            folded[-1] = Standardize.from_affine(
+                prev.mean + t.mean / prev.inv_std, prev.inv_std * t.inv_std
+            )
+        else:
+            folded.append(t)
+    return folded
+
+
+BATCH_TRANSFORMS: Dict[str, Callable[..., BatchTransform]] = {
+    "standardize": Standardize,
+    "clip": Clip,
+    "log1p": Log1p,
+    "select": SelectFeatures,
+    "one_hot": OneHot,
+    "to_float": ToFloat,
+    "flatten": Flatten,
+}
+
+
+def build_batch_transform(
+    specs: Optional[Sequence[Mapping[str, Any]]],
+) -> Optional[BatchCompose]:
+    """Build a `BatchCompose` from `[{name: ..., **kwargs}, ...]` specs."""
+    if not specs:
+        return None
+    steps = []
+    for spec in specs:
+        kwargs = dict(spec)
+        name = kwargs.pop("name")
+        if name not in BATCH_TRANSFORMS:
+            raise ValueError(
+                f"Unknown batch transform {name!r}; "
+                f"expected one of {sorted(BATCH_TRANSFORMS)}"
+            )
+        steps.append(BATCH_TRANSFORMS[name](**kwargs))
+    return BatchCompose(*steps)
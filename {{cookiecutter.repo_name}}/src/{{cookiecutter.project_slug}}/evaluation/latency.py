@@ -0,0 +1,52 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+import torch
+
+
+@dataclass(frozen=True)
+class Latency:
+    batch_size: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    rows_per_sec: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+def measure_latency(
+    model: Callable[[torch.Tensor], torch.Tensor],
+    input_shape: Sequence[int],
+    batch_sizes: Sequence[int] = (1, 256),
+    iters: int = 200,
+    warmup: int = 20,
+) -> Dict[int, Latency]:
+    """
+    Per-call latency of `model` on random `[bs, *input_shape]` batches under
+    `no_grad`, timed call by call after `warmup` untimed calls. Throughput
+    uses the median, so a few slow calls do not skew it.
+    """
+    results = {}
+    with torch.no_grad():
+        for bs in batch_sizes:
+            x = torch.randn(int(bs), *input_shape)
+            for _ in range(warmup):
+                model(x)
+            times = np.empty(iters)
+            for i in range(iters):
+                t0 = time.perf_counter()
+                model(x)
+                times[i] = time.perf_counter() - t0
+            p50, p90, p99 = np.percentile(times, [50, 90, 99])
+            results[int(bs)] = Latency(
+                int(bs), p50 * 1e3, p90 * 1e3, p99 * 1e3, bs / p50
+            )
+    return results
+{%- endif %}
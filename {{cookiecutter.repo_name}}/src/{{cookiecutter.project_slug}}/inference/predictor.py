@@ -3,20 +3,104 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 {% if cookiecutter.ml_framework == 'pytorch' %}
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
 import torch
 from torch import nn
 
+from {{cookiecutter.project_slug}}.data.stats import DatasetStats
+from {{cookiecutter.project_slug}}.models.compile import (
+    CompileConfig,
+    compile_module,
+    warm_up,
+)
+from {{cookiecutter.project_slug}}.models.ensemble import StackedEnsemble
+from {{cookiecutter.project_slug}}.models.lightning.modules import ClassificationModule
+from {{cookiecutter.project_slug}}.models.torch.nets import MLPClassifier
+
 
 @dataclass
 class Predictor:
     model: nn.Module
     device: str = "cpu"
+    # Feature preprocessing applied before the model, e.g. the training
+    # `Standardize` (see `from_stats`).
+    transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None
+    # The device-side `batch_transform` the model trained with (see
+    # `from_lightning_module`), applied after `transform` on `device`.
+    # TorchScript files from `to_torchscript` already contain it.
+    batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None
+
+    @classmethod
+    def from_lightning_module(
+        cls,
+        lightning_module: ClassificationModule,
+        stats_path: Optional[Union[str, Path]] = None,
+        device: str = "cpu",
+    ) -> "Predictor":
+        """Serve a trained module with the same inputs it saw in training."""
+        transform = DatasetStats.load(stats_path).standardize() if stats_path else None
+        model = lightning_module.model.to(device)
+        return cls(model, device, transform, lightning_module.batch_transform)
+
+    @classmethod
+    def from_stats(
+        cls, model: nn.Module, stats_path: Union[str, Path], device: str = "cpu"
+    ) -> "Predictor":
+        """Serve with the normalization of a training run (`data_stats.json`)."""
+        return cls(model, device, DatasetStats.load(stats_path).standardize())
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        stats_path: Optional[Union[str, Path]] = None,
+        device: str = "cpu",
+    ) -> "Predictor":
+        """
+        Serve a TorchScript file, e.g. an int8 model from `cli.quantize`
+        (run it with the same `torch.backends.quantized.engine`).
+        """
+        model = torch.jit.load(  # type: ignore[no-untyped-call]
+            str(path), map_location=device
+        )
+        transform = DatasetStats.load(stats_path).standardize() if stats_path else None
+        return cls(model, device, transform)
+
+    @classmethod
+    def from_ensemble(
+        cls,
+        members: Sequence[MLPClassifier],
+        stats_path: Optional[Union[str, Path]] = None,
+        device: str = "cpu",
+        combine: str = "prob",
+    ) -> "Predictor":
+        """Serve `members` as one `StackedEnsemble` (averaged probabilities)."""
+        model = StackedEnsemble(members, combine=combine).eval()
+        transform = DatasetStats.load(stats_path).standardize() if stats_path else None
+        return cls(model.to(device), device, transform)
+
+    def compile(self, cfg: CompileConfig, input_shape: Sequence[int]) -> "Predictor":
+        """
+        Compile the model for inference (see `models.compile`) and warm it up
+        on `[bs, *input_shape]` batches, so the first request is not the one
+        that pays for compilation. Call once at startup.
+        """
+        self.model = compile_module(self.model.to(self.device), cfg, inference=True)
+        if cfg.backend != "none" and cfg.warmup_batch_sizes:
+            warm_up(self.model, input_shape, cfg.warmup_batch_sizes, self.device)
+        return self
 
     def predict_proba(self, x: torch.Tensor) -> torch.Tensor:
         self.model.eval()
         with torch.no_grad():
             x = x.to(self.device)
-            logits = self.model(x)
+            if self.transform is not None:
+                x = self.transform(x)
+            if self.batch_transform is not None:
+                x = self.batch_transform(x)
+            logits: torch.Tensor = self.model(x)
             return logits.softmax(dim=-1)
 
 {% elif cookiecutter.ml_framework == 'tensorflow' %}
@@ -3,3 +3,168 @@
 Policy: do not inject dynamic DVC metadata into Hydra configs.
 Log dynamic lineage to MLflow at runtime instead.
 """
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import yaml
+from loguru import logger
+
+READ_BYTES = 8 * 1024**2
+# Files are hashed in pieces of this size so one large file still uses every
+# thread; a file's digest is the hash of its piece digests.
+PIECE_BYTES = 256 * 1024**2
+
+
+@dataclass(frozen=True)
+class DatasetDigest:
+    digest: str
+    n_files: int
+    n_bytes: int
+    # Files (and bytes) actually read this time; the rest came from the cache.
+    n_hashed: int
+    hashed_bytes: int
+
+    def tags(self, prefix: str = "data") -> Dict[str, str]:
+        return {
+            f"{prefix}_digest": self.digest,
+            f"{prefix}_n_files": str(self.n_files),
+            f"{prefix}_bytes": str(self.n_bytes),
+        }
+
+
+def _list_files(root: Path) -> List[Tuple[str, os.stat_result]]:
+    if root.is_file():
+        return [(root.name, root.stat())]
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in filenames:
+            path = Path(dirpath) / name
+            files.append((path.relative_to(root).as_posix(), path.stat()))
+    return sorted(files)
+
+
+def _hash_piece(path: Path, offset: int, length: int, algorithm: str) -> bytes:
+    # hashlib releases the GIL on large updates, so threads hash in parallel.
+    h = hashlib.new(algorithm)
+    buf = bytearray(min(READ_BYTES, max(length, 1)))
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        f.seek(offset)
+        remaining = length
+        while remaining:
+            n = f.readinto(view[: min(len(buf), remaining)])
+            if not n:
+                raise OSError(f"{path} changed while hashing")
+            h.update(view[:n])
+            remaining -= n
+    return h.digest()
+
+
+def _cache_path(cache_dir: Path, root: Path, algorithm: str) -> Path:
+    # Digests of files larger than one piece depend on the piece size.
+    spec = f"{root.resolve()}|{algorithm}|{PIECE_BYTES}"
+    key = hashlib.sha256(spec.encode()).hexdigest()[:16]
+    return cache_dir / f"{key}.json"
+
+
+def _load_cache(path: Optional[Path]) -> Dict[str, List[Any]]:
+    if path is None or not path.exists():
+        return {}
+    try:
+        entries: Dict[str, List[Any]] = json.loads(path.read_text())
+        return entries
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable digest cache {}", path)
+        return {}
+
+
+def _save_cache(path: Path, entries: Dict[str, List[Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(entries))
+    os.replace(tmp, path)
+
+
+def dataset_digest(
+    path: Union[str, Path],
+    cache_dir: Optional[Union[str, Path]] = None,
+    n_jobs: Optional[int] = None,
+    algorithm: str = "sha256",
+) -> DatasetDigest:
+    """
+    Content digest of a file or directory tree.
+
+    Hashes every file (in sorted relative-path order) with a thread pool and
+    combines `(relative path, size, file digest)` records into one digest, so
+    renames and content changes both change it. With `cache_dir`, file
+    digests are cached per `(inode, size, mtime_ns)` and only new or modified
+    files are read again on the next call.
+    """
+    root = Path(path)
+    if not root.exists():
+        raise FileNotFoundError(root)
+    cache_path = _cache_path(Path(cache_dir), root, algorithm) if cache_dir else None
+    cached = _load_cache(cache_path)
+
+    files = _list_files(root)
+    base = root.parent if root.is_file() else root
+    entries: Dict[str, List[Any]] = {}
+    pieces: Dict[str, List[Any]] = {}
+    jobs = []
+    for rel, st in files:
+        key = [st.st_ino, st.st_size, st.st_mtime_ns]
+        hit = cached.get(rel)
+        if hit is not None and hit[:3] == key:
+            entries[rel] = hit
+            continue
+        entries[rel] = key
+        offsets = range(0, max(st.st_size, 1), PIECE_BYTES)
+        pieces[rel] = [None] * len(offsets)
+        for i, offset in enumerate(offsets):
+            length = min(PIECE_BYTES, st.st_size - offset)
+            jobs.append((rel, i, base / rel, offset, length))
+
+    n_jobs = n_jobs or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [
+            (rel, i, pool.submit(_hash_piece, p, offset, length, algorithm))
+            for rel, i, p, offset, length in jobs
+        ]
+        for rel, i, future in futures:
+            pieces[rel][i] = future.result()
+    for rel, parts in pieces.items():
+        if len(parts) > 1:
+            parts = [hashlib.new(algorithm, b"".join(parts)).digest()]
+        entries[rel] = [*entries[rel], parts[0].hex()]
+
+    total = hashlib.new(algorithm)
+    for rel, st in files:
+        total.update(f"{rel}\0{st.st_size}\0{entries[rel][3]}\n".encode())
+    if cache_path is not None:
+        _save_cache(cache_path, entries)
+
+    return DatasetDigest(
+        digest=total.hexdigest(),
+        n_files=len(files),
+        n_bytes=sum(st.st_size for _, st in files),
+        n_hashed=len(pieces),
+        hashed_bytes=sum(entries[rel][1] for rel in pieces),
+    )
+
+
+def dvc_md5(path: Union[str, Path]) -> Optional[str]:
+    """The md5 DVC recorded for `path` in its `<path>.dvc` file, if tracked."""
+    dvc_file = Path(f"{Path(path)}.dvc")
+    if not dvc_file.exists():
+        return None
+    outs = (yaml.safe_load(dvc_file.read_text()) or {}).get("outs") or []
+    return outs[0].get("md5") if outs else None
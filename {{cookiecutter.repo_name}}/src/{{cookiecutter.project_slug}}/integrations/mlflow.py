@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import os
 from contextlib import contextmanager
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional, Union
 
 import mlflow
 from loguru import logger
+from mlflow.data.meta_dataset import MetaDataset
+from mlflow.data.sources import LocalArtifactDatasetSource  # type: ignore[attr-defined]
 from omegaconf import DictConfig, OmegaConf
 
+from {{cookiecutter.project_slug}}.integrations.dvc import dataset_digest, dvc_md5
+
 
 def _tracking_uri(cfg: DictConfig) -> Optional[str]:
     # Prefer env var (opsec); fall back to cfg.mlflow.tracking_uri if explicitly set.
@@ -15,7 +20,7 @@ def _tracking_uri(cfg: DictConfig) -> Optional[str]:
 
 
 @contextmanager
-def maybe_init_mlflow(cfg: DictConfig):
+def maybe_init_mlflow(cfg: DictConfig) -> Iterator[None]:
     if not bool(cfg.mlflow.get("enabled", True)):
         yield None
         return
@@ -50,3 +55,52 @@ def log_resolved_config(cfg: DictConfig, artifact_path: str = "config") -> None:
         return
     resolved = OmegaConf.to_yaml(cfg, resolve=True)
     mlflow.log_text(resolved, f"{artifact_path}/resolved.yaml")
+
+
+def maybe_log_artifact(
+    path: Union[str, Path], artifact_path: Optional[str] = None
+) -> None:
+    """Log a local file to the active MLflow run, if there is one."""
+    if mlflow.active_run() is None:
+        return
+    mlflow.log_artifact(str(path), artifact_path=artifact_path)
+
+
+def log_dataset_digest(cfg: DictConfig) -> None:
+    """
+    Tag the active run with a content digest of `data.path` and log it as a
+    dataset input (`mlflow.log_datasets`). Unchanged files are not re-read.
+    """
+    if not bool(cfg.mlflow.get("log_datasets", True)) or mlflow.active_run() is None:
+        return
+    path = cfg.data.get("path")
+    if path is None or not Path(str(path)).exists():
+        logger.info("No dataset at data.path; skipping dataset digest.")
+        return
+    opts = cfg.mlflow.get("dataset_digest") or {}
+    digest = dataset_digest(
+        str(path),
+        cache_dir=opts.get("cache_dir"),
+        n_jobs=opts.get("n_jobs"),
+        algorithm=str(opts.get("algorithm", "sha256")),
+    )
+    logger.info(
+        "Dataset digest {} ({} files; rehashed {} files / {} bytes)",
+        digest.digest[:12],
+        digest.n_files,
+        digest.n_hashed,
+        digest.hashed_bytes,
+    )
+    tags = digest.tags()
+    md5 = dvc_md5(str(path))
+    if md5:
+        tags["data_dvc_md5"] = md5
+    mlflow.set_tags(tags)
+    # `profile` is abstract in the stubs but defaults to None at run time.
+    dataset = MetaDataset(  # type: ignore[abstract]
+        LocalArtifactDatasetSource(str(path)),
+        name=str(cfg.data.name),
+        # MLflow caps dataset digests at 36 characters; the tag has all of it.
+        digest=digest.digest[:32],
+    )
+    mlflow.log_input(dataset, context="training")
@@ -0,0 +1,182 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""
+Opt-in model compilation (`model/compile=none|torchscript|inductor`).
+
+- torchscript: `torch.jit.script`; for inference also frozen and
+  optimized (constant-folded weights, fused ops).
+- inductor: `nn.Module.compile` (torch.compile in place, so state_dict keys
+  are unchanged) with the configured mode. For inference, inductor
+  freezing is enabled for that module's compiles only: weights are folded
+  in as constants and prepacked for the CPU GEMM kernels, so later weight
+  updates are not seen.
+
+Compilation happens on the first call for each new input shape, so
+`warm_up` runs the representative batch sizes once up front: training
+steps and API requests then start on compiled code. With `cache_dir` the
+inductor/autograd caches live there, so later runs, and pods that mount or
+bake in the directory, reuse compiled kernels instead of compiling again.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, Tuple, Union
+
+import torch
+from loguru import logger
+from torch import nn
+
+BACKENDS = ("none", "torchscript", "inductor")
+MODES = ("default", "reduce-overhead", "max-autotune", "max-autotune-no-cudagraphs")
+
+
+@dataclass(frozen=True)
+class CompileConfig:
+    backend: str = "none"
+    # torch.compile options (inductor only)
+    mode: str = "default"
+    dynamic: Optional[bool] = None
+    fullgraph: bool = False
+    # Batch sizes run once after compiling; two or more also compile the
+    # dynamic-shape graph up front (e.g. [1, batch_size]).
+    warmup_batch_sizes: Tuple[int, ...] = ()
+    cache_dir: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.backend not in BACKENDS:
+            raise ValueError(
+                f"model.compile.backend must be {'|'.join(BACKENDS)}, "
+                f"got {self.backend!r}"
+            )
+        if self.backend == "inductor" and self.mode not in MODES:
+            raise ValueError(
+                f"model.compile.mode must be {'|'.join(MODES)}, got {self.mode!r}"
+            )
+
+    @staticmethod
+    def from_config(node: Any) -> "CompileConfig":
+        """From a `model.compile` config node (None => no compilation)."""
+        if not node or str(node.get("backend", "none")) == "none":
+            return CompileConfig()
+        dynamic = node.get("dynamic")
+        cache_dir = node.get("cache_dir")
+        return CompileConfig(
+            backend=str(node.get("backend")),
+            mode=str(node.get("mode", "default")),
+            dynamic=bool(dynamic) if dynamic is not None else None,
+            fullgraph=bool(node.get("fullgraph", False)),
+            warmup_batch_sizes=tuple(
+                int(b) for b in node.get("warmup_batch_sizes") or ()
+            ),
+            cache_dir=str(cache_dir) if cache_dir else None,
+        )
+
+
+def enable_compile_cache(cache_dir: Union[str, Path]) -> Path:
+    """Keep inductor's FX-graph, autograd and kernel caches under `cache_dir`."""
+    import torch._functorch.config as functorch_config
+    import torch._inductor.config as inductor_config
+
+    path = Path(cache_dir).resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    # Read when a cache is first accessed, so this must run before compiling.
+    os.environ["TORCHINDUCTOR_CACHE_DIR"] = str(path)
+    os.environ.setdefault("TRITON_CACHE_DIR", str(path / "triton"))
+    inductor_config.fx_graph_cache = True
+    if hasattr(functorch_config, "enable_autograd_cache"):
+        functorch_config.enable_autograd_cache = True
+    return path
+
+
+def compile_module(
+    module: nn.Module, cfg: CompileConfig, inference: bool = False
+) -> nn.Module:
+    """
+    Compile `module` per `cfg`. Returns the module to call from now on: the
+    same object for inductor (compiled in place), a ScriptModule for
+    torchscript. `inference=True` puts it in eval mode and, for
+    torchscript, freezes it.
+    """
+    if cfg.backend == "none":
+        return module
+    if inference:
+        module.eval()
+    if cfg.backend == "torchscript":
+        scripted: torch.jit.ScriptModule = torch.jit.script(module)
+        if inference:
+            scripted = torch.jit.optimize_for_inference(torch.jit.freeze(scripted))
+        return scripted
+    if cfg.cache_dir is not None:
+        enable_compile_cache(cfg.cache_dir)
+    module.compile(mode=cfg.mode, dynamic=cfg.dynamic, fullgraph=cfg.fullgraph)
+    if inference:
+        compiled = module._compiled_call_impl
+        assert compiled is not None
+        module._compiled_call_impl = _with_freezing(compiled)
+    return module
+
+
+def _with_freezing(compiled: Callable[..., Any]) -> Callable[..., Any]:
+    # Inductor freezing is a global config flag that dynamo reads while
+    # tracing, and compilation happens lazily inside calls. The flag is
+    # therefore patched only around calls that can compile, i.e. the first
+    # call per input signature, so it neither leaks into other compiled
+    # modules nor costs a config patch per request.
+    import torch._inductor.config as inductor_config
+
+    seen = set()
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        key = tuple(
+            (tuple(a.shape), a.dtype, a.device)
+            for a in args
+            if isinstance(a, torch.Tensor)
+        )
+        if key in seen:
+            return compiled(*args, **kwargs)
+        with inductor_config.patch(freezing=True):
+            out = compiled(*args, **kwargs)
+        seen.add(key)
+        return out
+
+    return call
+
+
+def warm_up(
+    module: nn.Module,
+    input_shape: Sequence[int],
+    batch_sizes: Sequence[int],
+    device: Union[str, torch.device] = "cpu",
+    train: bool = False,
+) -> float:
+    """
+    Call `module` once per batch size on zeros of `[bs, *input_shape]`
+    (with a backward pass when `train`), so compilation happens here and
+    not on the first real batch. Gradients and the RNG state are left as
+    they were. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    # Frozen TorchScript modules have no `training` flag (always eval).
+    was_training = getattr(module, "training", False)
+    module.train(train)
+    with torch.random.fork_rng(devices=[]):
+        for bs in batch_sizes:
+            x = torch.zeros(int(bs), *input_shape, device=device)
+            if train:
+                module(x).float().sum().backward()
+            else:
+                with torch.no_grad():
+                    module(x)
+    if train:
+        for p in module.parameters():
+            p.grad = None
+    module.train(was_training)
+    elapsed = time.perf_counter() - t0
+    logger.info(
+        "Compile warm-up for batch sizes {} took {:.1f}s", list(batch_sizes), elapsed
+    )
+    return elapsed
+{%- endif %}
@@ -0,0 +1,130 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""
+Compression of `MLPClassifier` into physically smaller dense models.
+
+- `prune_hidden_units`: structured magnitude pruning. Each block keeps the
+  hidden units with the largest `||incoming row|| * ||outgoing column||`,
+  and the model is rebuilt at the smaller width, so there are no masks and
+  every matmul really shrinks.
+- `factorize_linears`: SVD low-rank factorization. A Linear `W` (out x in)
+  becomes `up(down(x))` with `down` r x in and `up` out x r, at the
+  smallest rank `r` keeping `energy` of the squared singular values, and
+  only where `r * (in + out) < in * out`.
+
+Both return new modules and leave the input untouched; fine-tune the
+result briefly (see `cli.compress`) to recover accuracy.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import asdict, dataclass
+from typing import Dict, Tuple, cast
+
+import torch
+from torch import nn
+
+from {{cookiecutter.project_slug}}.models.torch.nets import MLPBlock, MLPClassifier
+
+
+@dataclass(frozen=True)
+class ModelCost:
+    params: int
+    # Multiply-adds x 2 in Linear layers, per input row
+    flops_per_row: int
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def model_cost(model: nn.Module) -> ModelCost:
+    params = sum(p.numel() for p in model.parameters())
+    flops = sum(
+        2 * m.in_features * m.out_features
+        for m in model.modules()
+        if isinstance(m, nn.Linear)
+    )
+    return ModelCost(params, flops)
+
+
+def prune_hidden_units(model: MLPClassifier, keep_ratio: float) -> MLPClassifier:
+    """Keep `keep_ratio` of the hidden units of every block (same width for all)."""
+    if not 0 < keep_ratio <= 1:
+        raise ValueError(f"keep_ratio must be in (0, 1], got {keep_ratio}")
+    blocks = [cast(MLPBlock, b) for b in model.blocks]
+    if not all(isinstance(b.linear, nn.Linear) for b in blocks):
+        raise TypeError("prune before factorizing: blocks must hold plain nn.Linear")
+    first = blocks[0]
+    width = max(1, round(model.head.in_features * keep_ratio))
+    pruned = MLPClassifier(
+        first.linear.in_features,
+        model.head.out_features,
+        hidden=width,
+        num_layers=len(blocks),
+        dropout=first.dropout.p,
+        activation=first.activation,
+        fused=first.fused,
+        checkpoint=model.checkpoint,
+    )
+    layers = [b.linear for b in blocks] + [model.head]
+    new_layers = [cast(MLPBlock, b).linear for b in pruned.blocks] + [pruned.head]
+    kept = torch.arange(first.linear.in_features)
+    with torch.no_grad():
+        for i, (layer, new) in enumerate(zip(layers, new_layers)):
+            rows = torch.arange(layer.out_features)
+            if i < len(blocks):
+                score = layer.weight.norm(dim=1) * layers[i + 1].weight.norm(dim=0)
+                rows = score.topk(width).indices.sort().values
+            new.weight.copy_(layer.weight[rows][:, kept])
+            new.bias.copy_(layer.bias[rows])
+            kept = rows
+    return pruned.train(model.training)
+
+
+def low_rank_linear(linear: nn.Linear, rank: int) -> nn.Sequential:
+    """Truncated SVD of `linear` as `Linear(in, r, bias=False) -> Linear(r, out)`."""
+    u, s, vh = torch.linalg.svd(linear.weight.detach().double(), full_matrices=False)
+    root = s[:rank].sqrt()
+    down = nn.Linear(linear.in_features, rank, bias=False)
+    up = nn.Linear(rank, linear.out_features, bias=linear.bias is not None)
+    with torch.no_grad():
+        down.weight.copy_(root[:, None] * vh[:rank])
+        up.weight.copy_(u[:, :rank] * root)
+        if linear.bias is not None:
+            up.bias.copy_(linear.bias)
+    return nn.Sequential(down, up)
+
+
+def energy_rank(weight: torch.Tensor, energy: float) -> int:
+    """Smallest rank whose singular values hold `energy` of the squared total."""
+    s = torch.linalg.svdvals(weight.detach().double())
+    share = (s**2).cumsum(0) / (s**2).sum()
+    rank = int(torch.searchsorted(share, torch.tensor(energy, dtype=share.dtype))) + 1
+    return min(rank, len(s))
+
+
+def factorize_linears(
+    model: nn.Module, energy: float = 0.9, include_head: bool = False
+) -> Tuple[nn.Module, Dict[str, int]]:
+    """
+    Copy of `model` with its Linear layers factorized where that saves work.
+
+    Returns the model and the chosen rank per replaced layer. The output
+    head (`head`) is kept unless `include_head`: it is usually small and
+    the layer most sensitive to approximation.
+    """
+    if not 0 < energy <= 1:
+        raise ValueError(f"energy must be in (0, 1], got {energy}")
+    model = copy.deepcopy(model)
+    ranks: Dict[str, int] = {}
+    for name, linear in list(model.named_modules()):
+        if not isinstance(linear, nn.Linear) or (name == "head" and not include_head):
+            continue
+        rank = energy_rank(linear.weight, energy)
+        if rank * (linear.in_features + linear.out_features) >= linear.weight.numel():
+            continue
+        parent, _, attr = name.rpartition(".")
+        setattr(model.get_submodule(parent), attr, low_rank_linear(linear, rank))
+        ranks[name] = rank
+    return model, ranks
+{%- endif %}
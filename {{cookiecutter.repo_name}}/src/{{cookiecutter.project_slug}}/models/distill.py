@@ -0,0 +1,122 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""
+Knowledge distillation: teacher logits cache and the student loss.
+
+The teacher runs once over every row of the dataset (in row order, with the
+same transforms the student sees) and its logits are stored as a float32
+`.npy` memmap in a `DatasetCache` entry keyed by teacher version, dataset
+fingerprint and device batch transform. Training then reads them alongside
+each batch (see `ClassificationDataModule.soft_targets`), so the teacher
+never runs per epoch and later students reuse the same entry.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Optional, Sized, Union
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch import nn
+from torch.utils.data import Dataset
+
+from {{cookiecutter.project_slug}}.data.cache import DatasetCache, fingerprint
+from {{cookiecutter.project_slug}}.data.memmap import META_FILE
+
+LOGITS_FILE = "logits.npy"
+
+
+def teacher_logits_key(
+    teacher_version: str,
+    dataset_fingerprint: str,
+    batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+) -> str:
+    # Raw logits are cached, so the distillation temperature and mixing
+    # weight can change without recomputing them. The dataset fingerprint
+    # only covers loader-side transforms; the device-side `batch_transform`
+    # also shapes the teacher's inputs.
+    return fingerprint(
+        "teacher-logits", teacher_version, dataset_fingerprint, batch_transform
+    )
+
+
+def teacher_version(teacher: nn.Module) -> str:
+    """Content hash of the teacher's parameters and buffers."""
+    return fingerprint(teacher.state_dict())
+
+
+def cached_teacher_logits(
+    cache_dir: Union[str, Path],
+    key: str,
+    teacher: nn.Module,
+    dataset: Dataset[Any],
+    batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    chunk_rows: int = 8192,
+    device: Union[str, torch.device] = "cpu",
+    max_bytes: Optional[int] = None,
+) -> Path:
+    """
+    Path of the `[len(dataset), n_classes]` teacher logits `.npy` for `key`,
+    computed on a cache miss.
+
+    `dataset` must accept index arrays (like the datasets in `data`);
+    `batch_transform` is the device-side transform the teacher trained with.
+    """
+    device = torch.device(device)
+    assert isinstance(dataset, Sized)
+
+    def build(tmp: Path) -> None:
+        tmp.mkdir(parents=True)
+        n = len(dataset)
+        model = teacher.to(device).eval()
+        out = None
+        with torch.no_grad():
+            for start in range(0, n, chunk_rows):
+                x = dataset[np.arange(start, min(start + chunk_rows, n))][0]
+                x = x.to(device)
+                if batch_transform is not None:
+                    x = batch_transform(x)
+                logits = model(x).float().cpu().numpy()
+                if out is None:
+                    out = np.lib.format.open_memmap(
+                        tmp / LOGITS_FILE,
+                        mode="w+",
+                        dtype=np.float32,
+                        shape=(n, logits.shape[1]),
+                    )
+                out[start : start + len(logits)] = logits
+        if out is None:
+            raise ValueError("Cannot compute teacher logits for an empty dataset.")
+        out.flush()
+        meta = {"n_samples": n, "n_classes": int(out.shape[1])}
+        del out
+        (tmp / META_FILE).write_text(json.dumps(meta, indent=2))
+
+    cache = DatasetCache(cache_dir, max_bytes)
+    return cache.get_or_build(key, build) / LOGITS_FILE
+
+
+def distillation_loss(
+    student_logits: torch.Tensor,
+    teacher_logits: torch.Tensor,
+    target: torch.Tensor,
+    temperature: float = 4.0,
+    alpha: float = 0.5,
+) -> torch.Tensor:
+    """
+    `alpha * T^2 * KL(teacher_T || student_T) + (1 - alpha) * CE(student, y)`.
+
+    `T^2` keeps the soft-target gradients on the same scale as the hard
+    ones as the temperature changes.
+    """
+    soft = F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=1),
+        F.log_softmax(teacher_logits / temperature, dim=1),
+        log_target=True,
+        reduction="batchmean",
+    )
+    hard = F.cross_entropy(student_logits, target)
+    return alpha * temperature**2 * soft + (1 - alpha) * hard
+{%- endif %}
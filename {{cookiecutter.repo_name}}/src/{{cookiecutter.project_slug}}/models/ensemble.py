@@ -0,0 +1,104 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+import math
+from typing import Sequence, cast
+
+import torch
+from torch import nn
+
+from {{cookiecutter.project_slug}}.models.torch.nets import ACTIVATIONS, MLPBlock, MLPClassifier
+
+COMBINE_MODES = ("prob", "logit")
+
+
+class StackedLinear(nn.Module):
+    """`M` Linear layers applied at once, `[M, B, in] -> [M, B, out]`."""
+
+    def __init__(self, linears: Sequence[nn.Linear]):
+        super().__init__()
+        # Stored as `[M, in, out]` so the forward is one batched matmul.
+        weights = [lin.weight.detach().t() for lin in linears]
+        biases = [lin.bias.detach()[None] for lin in linears]
+        self.weight = nn.Parameter(torch.stack(weights))
+        self.bias = nn.Parameter(torch.stack(biases))
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return torch.baddbmm(self.bias, x, self.weight)
+
+
+class SharedInputLinear(nn.Module):
+    """
+    `M` Linear layers reading the same input, `[B, in] -> [M, B, out]`.
+
+    The weights are concatenated into one `[in, M * out]` matrix, so the
+    first layer is a single wide GEMM rather than `M` copies of the input.
+    """
+
+    def __init__(self, linears: Sequence[nn.Linear]):
+        super().__init__()
+        self.n_members = len(linears)
+        weights = [lin.weight.detach().t() for lin in linears]
+        self.weight = nn.Parameter(torch.cat(weights, dim=1))
+        self.bias = nn.Parameter(torch.cat([lin.bias.detach() for lin in linears]))
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        h = torch.addmm(self.bias, x, self.weight)
+        return h.view(x.shape[0], self.n_members, -1).transpose(0, 1)
+
+
+class StackedEnsemble(nn.Module):
+    """
+    `M` same-architecture `MLPClassifier` members evaluated as one model.
+
+    Member parameters are stacked along a leading axis, so each layer is a
+    single batched matmul over all members instead of `M` forward passes.
+    The ops are plain matmul/add/activation/log-softmax, so the module
+    scripts (`models.compile`), serves through `Predictor` and exports to
+    ONNX like a single MLP: input `[B, F]`, output `[B, C]`.
+
+    `combine="prob"` returns `log(mean_m softmax(z_m))`, whose softmax is
+    the averaged member probabilities; `combine="logit"` averages logits.
+    Inference only: member dropout is not applied.
+    """
+
+    def __init__(self, members: Sequence[MLPClassifier], combine: str = "prob"):
+        super().__init__()
+        if not members:
+            raise ValueError("an ensemble needs at least one member")
+        if combine not in COMBINE_MODES:
+            raise ValueError(
+                f"combine must be {'|'.join(COMBINE_MODES)}, got {combine!r}"
+            )
+        first = members[0]
+        blocks = [[cast(MLPBlock, b) for b in m.blocks] for m in members]
+        if not all(isinstance(b.linear, nn.Linear) for b in blocks[0]):
+            raise TypeError("members must hold plain nn.Linear blocks (not factorized)")
+        shapes = {name: p.shape for name, p in first.state_dict().items()}
+        for m, m_blocks in zip(members[1:], blocks[1:]):
+            same = {name: p.shape for name, p in m.state_dict().items()} == shapes
+            if not same or m_blocks[0].activation != blocks[0][0].activation:
+                raise ValueError("ensemble members must share one architecture")
+        self.first = SharedInputLinear([b[0].linear for b in blocks])
+        self.layers = nn.ModuleList(
+            StackedLinear([b[i].linear for b in blocks])
+            for i in range(1, len(blocks[0]))
+        )
+        self.head = StackedLinear([m.head for m in members])
+        self.act = ACTIVATIONS[blocks[0][0].activation]()
+        self.combine = combine
+        self.n_members = len(members)
+
+    def member_logits(self, x: torch.Tensor) -> torch.Tensor:
+        """Per-member logits, `[M, B, C]`."""
+        h = self.act(self.first(x))
+        for layer in self.layers:
+            h = self.act(layer(h))
+        logits: torch.Tensor = self.head(h)
+        return logits
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        logits = self.member_logits(x)
+        if self.combine == "logit":
+            return logits.mean(dim=0)
+        log_probs = torch.log_softmax(logits, dim=-1)
+        return torch.logsumexp(log_probs, dim=0) - math.log(self.n_members)
+{%- endif %}
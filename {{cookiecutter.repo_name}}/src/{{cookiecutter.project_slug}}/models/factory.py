@@ -0,0 +1,109 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from functools import partial
+from typing import Sequence
+
+import torch
+from omegaconf import DictConfig, OmegaConf
+from torch import nn
+
+from {{cookiecutter.project_slug}}.data.transforms import build_batch_transform
+from {{cookiecutter.project_slug}}.models.compile import (
+    CompileConfig,
+    compile_module,
+    warm_up,
+)
+from {{cookiecutter.project_slug}}.models.lightning.modules import ClassificationModule
+from {{cookiecutter.project_slug}}.models.torch.nets import MLPClassifier
+
+
+def _n_features(cfg: DictConfig) -> int:
+    # `format: imagefolder` serves [B, 3, H, W] images, flattened for the MLP
+    # by the `flatten` transform (see config/data/imagefolder.yaml).
+    if cfg.data.get("n_features") is None and cfg.data.get("format") == "imagefolder":
+        size = (cfg.data.get("image") or {}).get("size", 224)
+        height, width = (size, size) if isinstance(size, int) else size
+        return 3 * int(height) * int(width)
+    return int(cfg.data.get("n_features", 32))
+
+
+def build_lightning_module(cfg: DictConfig) -> ClassificationModule:
+    n_features = _n_features(cfg)
+    n_classes = int(cfg.data.get("n_classes", 2))
+    # `hidden` is the pre-`hidden_dim` key, still honored for old configs.
+    hidden = int(cfg.model.get("hidden_dim", cfg.model.get("hidden", 128)))
+    num_layers = int(cfg.model.get("num_layers", 1))
+    dropout = float(cfg.model.get("dropout", 0.0))
+    # `model.lr`/`model.weight_decay` (config/model/base.yaml); the same keys
+    # under `trainer` are honored as a fallback.
+    trainer = cfg.get("trainer") or {}
+    lr = float(cfg.model.get("lr", trainer.get("lr", 1e-3)))
+    wd = float(cfg.model.get("weight_decay", trainer.get("weight_decay", 0.0)))
+
+    batch_transform = None
+    if cfg.data.get("transforms_on", "loader") == "device":
+        specs = cfg.data.get("transforms")
+        specs = OmegaConf.to_container(specs, resolve=True) if specs else []
+        if not isinstance(specs, list):
+            raise ValueError("data.transforms must be a list of {name: ...} specs")
+        batch_transform = build_batch_transform(specs)
+
+    model = MLPClassifier(
+        n_features=n_features,
+        n_classes=n_classes,
+        hidden=hidden,
+        num_layers=num_layers,
+        dropout=dropout,
+        activation=str(cfg.model.get("activation", "relu")),
+        fused=bool(cfg.model.get("fused", False)),
+        checkpoint=bool(cfg.model.get("checkpoint", False)),
+    )
+    compile_cfg = CompileConfig.from_config(cfg.model.get("compile"))
+    compiled = compile_module(model, compile_cfg)
+    warmup = None
+    if compile_cfg.backend != "none" and compile_cfg.warmup_batch_sizes:
+        warmup = partial(_warm_up_on, (n_features,), compile_cfg.warmup_batch_sizes)
+    return ClassificationModule(
+        model=compiled,
+        lr=lr,
+        weight_decay=wd,
+        batch_transform=batch_transform,
+        warmup=warmup,
+    )
+
+
+def _warm_up_on(
+    input_shape: Sequence[int],
+    batch_sizes: Sequence[int],
+    model: nn.Module,
+    device: torch.device,
+) -> None:
+    # Module-level (not a lambda) so the LightningModule stays picklable.
+    warm_up(model, input_shape, batch_sizes, device=device, train=True)
+{%- elif cookiecutter.ml_framework == 'tensorflow' -%}
+import tensorflow as tf
+from omegaconf import DictConfig
+from tensorflow import keras
+
+def build_keras_model(cfg: DictConfig, n_features: int, n_classes: int) -> keras.Model:
+    hidden = int(cfg.model.get("hidden_dim", cfg.model.get("hidden", 128)))
+    num_layers = int(cfg.model.get("num_layers", 1))
+    dropout = float(cfg.model.get("dropout", 0.0))
+    activation = str(cfg.model.get("activation", "relu"))
+    lr = float(cfg.trainer.get("lr", 1e-3))
+
+    layers = [keras.Input(shape=(n_features,))]
+    for _ in range(num_layers):
+        layers += [
+            keras.layers.Dense(hidden, activation=activation),
+            keras.layers.Dropout(dropout),
+        ]
+    layers.append(keras.layers.Dense(n_classes, activation='softmax'))
+    model = keras.Sequential(layers)
+    
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=lr),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+{%- endif %}
@@ -0,0 +1,117 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional
+
+import pytorch_lightning as pl
+import torch
+from torch import nn
+
+from {{cookiecutter.project_slug}}.models.distill import distillation_loss
+
+
+class ClassificationModule(pl.LightningModule):
+    def __init__(
+        self,
+        model: nn.Module,
+        lr: float = 1e-3,
+        weight_decay: float = 0.0,
+        batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+        warmup: Optional[Callable[[nn.Module, torch.device], Any]] = None,
+    ):
+        super().__init__()
+        self.model = model
+        self.lr = lr
+        self.weight_decay = weight_decay
+        # Vectorized feature transform run on the training device (see data.transforms).
+        self.batch_transform = batch_transform
+        # Called as `warmup(model, device)` once the model is on its training
+        # device, e.g. to compile before the first step (see models.compile).
+        self.warmup = warmup
+        self.loss_fn = nn.CrossEntropyLoss()
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        logits: torch.Tensor = self.model(x)
+        return logits
+
+    def on_fit_start(self) -> None:
+        if self.warmup is not None:
+            self.warmup(self.model, self.device)
+
+    def on_train_epoch_start(self) -> None:
+        # Streaming datamodules reshuffle per epoch; Lightning only forwards
+        # the epoch to samplers, which iterable datasets do not have.
+        datamodule = getattr(self.trainer, "datamodule", None)
+        set_epoch = getattr(datamodule, "set_epoch", None)
+        if callable(set_epoch):
+            set_epoch(self.current_epoch)
+
+    def on_after_batch_transfer(self, batch: Any, dataloader_idx: int) -> Any:
+        if self.batch_transform is None:
+            return batch
+        x, y = batch
+        return self.batch_transform(x), y
+
+    def training_step(self, batch: Any, batch_idx: int) -> torch.Tensor:
+        x, y = batch
+        logits = self(x)
+        loss: torch.Tensor = self.loss_fn(logits, y)
+        self.log("train_loss", loss, prog_bar=True)
+        return loss
+
+    def validation_step(self, batch: Any, batch_idx: int) -> Dict[str, torch.Tensor]:
+        x, y = batch
+        logits = self(x)
+        loss = self.loss_fn(logits, y)
+        acc = (logits.argmax(dim=1) == y).float().mean()
+        self.log("val_loss", loss, prog_bar=True)
+        self.log("val_acc", acc, prog_bar=True)
+        return {"val_loss": loss, "val_acc": acc}
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        return torch.optim.AdamW(
+            self.parameters(), lr=self.lr, weight_decay=self.weight_decay
+        )
+
+
+class DistillationModule(ClassificationModule):
+    """
+    Trains `model` (the student) on a teacher's soft targets.
+
+    Batches are `(x, y, teacher_logits)` (see `models.distill`); the loss is
+    `distillation_loss`. Validation reports plain accuracy, so students and
+    their teachers compare directly. The checkpointed `model.*` weights load
+    into a `ClassificationModule` of the student's architecture.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        lr: float = 1e-3,
+        weight_decay: float = 0.0,
+        batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+        warmup: Optional[Callable[[nn.Module, torch.device], Any]] = None,
+        temperature: float = 4.0,
+        alpha: float = 0.5,
+    ):
+        super().__init__(model, lr, weight_decay, batch_transform, warmup)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def on_after_batch_transfer(self, batch: Any, dataloader_idx: int) -> Any:
+        x, *rest = batch
+        if self.batch_transform is not None:
+            x = self.batch_transform(x)
+        return (x, *rest)
+
+    def training_step(self, batch: Any, batch_idx: int) -> torch.Tensor:
+        x, y, teacher_logits = batch
+        loss = distillation_loss(
+            self(x), teacher_logits, y, self.temperature, self.alpha
+        )
+        self.log("train_loss", loss, prog_bar=True)
+        return loss
+
+    def validation_step(self, batch: Any, batch_idx: int) -> Dict[str, torch.Tensor]:
+        return super().validation_step(batch[:2], batch_idx)
+{%- endif %}
@@ -0,0 +1,130 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""
+Post-training int8 quantization for CPU serving.
+
+- dynamic: `nn.Linear` weights stored as int8; activations are quantized
+  per batch at run time. No calibration data needed.
+- static: FX graph mode; activation ranges are calibrated once on
+  representative batches, so the whole MLP runs in int8 end to end.
+
+`evaluate_accuracy` and `check_accuracy` form the gate used by
+`cli.quantize`: a variant whose accuracy drops more than the tolerance
+below fp32 is reported but not written.
+"""
+
+from __future__ import annotations
+
+import copy
+import io
+from typing import Any, Callable, Iterable, Optional
+
+import torch
+from torch import nn
+
+from {{cookiecutter.project_slug}}.evaluation.metrics import accuracy
+
+QUANT_METHODS = ("dynamic", "static")
+
+
+def quantize_model(
+    model: nn.Module,
+    method: str,
+    calibration: Optional[Iterable[torch.Tensor]] = None,
+    engine: str = "x86",
+) -> nn.Module:
+    """
+    int8 copy of `model` (which is left untouched), in eval mode.
+
+    `engine` selects the kernels (`x86`/`fbgemm` on Intel/AMD, `qnnpack` on
+    ARM); serving must use the same `torch.backends.quantized.engine`.
+    Static quantization needs `calibration` input batches.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    if method not in QUANT_METHODS:
+        raise ValueError(f"method must be {'|'.join(QUANT_METHODS)}, got {method!r}")
+    torch.backends.quantized.engine = engine
+    model = copy.deepcopy(model).eval()
+    if method == "dynamic":
+        quantized: nn.Module = quantize_dynamic(  # type: ignore[no-untyped-call]
+            model, {nn.Linear}, dtype=torch.qint8
+        )
+        return quantized
+
+    batches = list(calibration or [])
+    if not batches:
+        raise ValueError("static quantization needs calibration batches")
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), (batches[0],))
+    with torch.no_grad():
+        for x in batches:
+            prepared(x)
+    return convert_fx(prepared)
+
+
+def evaluate_accuracy(
+    model: Callable[[torch.Tensor], torch.Tensor],
+    loader: Iterable[Any],
+    batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+) -> float:
+    """`evaluation.metrics.accuracy` over every batch of `loader` (row-weighted)."""
+    correct, total = 0.0, 0
+    with torch.no_grad():
+        for x, y in loader:
+            if batch_transform is not None:
+                x = batch_transform(x)
+            correct += float(accuracy(model(x), y)) * len(y)
+            total += len(y)
+    if total == 0:
+        raise ValueError("accuracy needs a non-empty evaluation loader")
+    return correct / total
+
+
+def check_accuracy(
+    fp32_accuracy: float, quant_accuracy: float, max_drop: float
+) -> bool:
+    """True when the quantized model is within `max_drop` (absolute) of fp32."""
+    return fp32_accuracy - quant_accuracy <= max_drop
+
+
+class _Preprocessed(nn.Module):
+    # `model(transform(x))` as one module, so tracing records the transform.
+    def __init__(
+        self, model: nn.Module, transform: Callable[[torch.Tensor], torch.Tensor]
+    ):
+        super().__init__()
+        self.model = model
+        self.transform = transform
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        logits: torch.Tensor = self.model(self.transform(x))
+        return logits
+
+
+def to_torchscript(
+    model: nn.Module,
+    example: torch.Tensor,
+    transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+) -> torch.jit.ScriptModule:
+    """
+    Traced, frozen TorchScript for serving (see `Predictor.load`).
+
+    `transform` is the device-side `batch_transform` the model trained with;
+    it is traced into the artifact, which then takes the same raw batches as
+    training (`example` is such a raw batch).
+    """
+    if transform is not None:
+        model = _Preprocessed(model, transform)
+    with torch.no_grad():
+        traced = torch.jit.trace(  # type: ignore[no-untyped-call]
+            model.eval(), example
+        )
+    frozen: torch.jit.ScriptModule = torch.jit.freeze(traced)
+    return frozen
+
+
+def serialized_bytes(module: torch.jit.ScriptModule) -> int:
+    buf = io.BytesIO()
+    torch.jit.save(module, buf)
+    return buf.getbuffer().nbytes
+{%- endif %}
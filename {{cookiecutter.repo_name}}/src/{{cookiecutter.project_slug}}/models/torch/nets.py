@@ -0,0 +1,108 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+from typing import Callable, Dict
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+from torch.utils.checkpoint import checkpoint
+
+ACTIVATIONS: Dict[str, Callable[[], nn.Module]] = {
+    "relu": nn.ReLU,
+    "gelu": nn.GELU,
+    "silu": nn.SiLU,
+    "tanh": nn.Tanh,
+}
+
+
+class MLPBlock(nn.Module):
+    """
+    `Linear -> activation -> Dropout`.
+
+    With `fused=True` the block runs as one functional expression that
+    `torch.compile` lowers to the matmul plus a single elementwise epilogue
+    (bias, activation and dropout in one pass over the output). In eager
+    mode ReLU runs in place, saving a transient `[B, hidden]` allocation.
+    Parameters are the same `nn.Linear` either way, so checkpoints load
+    into both paths.
+    """
+
+    def __init__(
+        self,
+        in_features: int,
+        out_features: int,
+        activation: str = "relu",
+        dropout: float = 0.0,
+        fused: bool = False,
+    ):
+        super().__init__()
+        if activation not in ACTIVATIONS:
+            raise ValueError(
+                f"activation must be one of {sorted(ACTIVATIONS)}, got {activation!r}"
+            )
+        self.linear = nn.Linear(in_features, out_features)
+        self.activation = activation
+        self.act = ACTIVATIONS[activation]()
+        self.dropout = nn.Dropout(dropout)
+        self.fused = fused
+        self.inplace_relu = fused and activation == "relu"
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if not self.fused:
+            out: torch.Tensor = self.dropout(self.act(self.linear(x)))
+            return out
+        h = self.linear(x)
+        h = F.relu(h, inplace=True) if self.inplace_relu else self.act(h)
+        return F.dropout(h, self.dropout.p, self.training)
+
+
+class MLPClassifier(nn.Module):
+    """
+    `num_layers` hidden blocks of width `hidden`, then a linear head.
+
+    `checkpoint=True` recomputes each block's activations in the backward
+    pass instead of storing them, so training keeps only block inputs
+    (`[B, hidden]` per block) at the cost of one extra forward. Use it for
+    wide/deep variants or large batches that would not fit in memory.
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        n_classes: int,
+        hidden: int = 128,
+        num_layers: int = 1,
+        dropout: float = 0.0,
+        activation: str = "relu",
+        fused: bool = False,
+        checkpoint: bool = False,
+    ):
+        super().__init__()
+        if num_layers < 1:
+            raise ValueError(f"num_layers must be >= 1, got {num_layers}")
+        self.blocks = nn.ModuleList(
+            MLPBlock(
+                n_features if i == 0 else hidden, hidden, activation, dropout, fused
+            )
+            for i in range(num_layers)
+        )
+        self.head = nn.Linear(hidden, n_classes)
+        self.checkpoint = checkpoint
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if self.checkpoint and self.training and torch.is_grad_enabled():
+            return self._forward_checkpointed(x)
+        for block in self.blocks:
+            x = block(x)
+        logits: torch.Tensor = self.head(x)
+        return logits
+
+    @torch.jit.unused
+    def _forward_checkpointed(self, x: torch.Tensor) -> torch.Tensor:
+        # Non-reentrant: works with torch.compile and inputs that do not
+        # require grad; the RNG state is restored, so dropout draws the same
+        # mask when the block is recomputed. Not available under TorchScript.
+        for block in self.blocks:
+            x = checkpoint(block, x, use_reentrant=False)
+        logits: torch.Tensor = self.head(x)
+        return logits
+{%- endif %}
@@ -1,26 +1,85 @@
 {% if cookiecutter.ml_framework == 'pytorch' %}
 from __future__ import annotations
+
+import inspect
+from typing import Any, Dict, List, cast
+
 import pytorch_lightning as pl
+import torch
+from hydra.utils import instantiate
 from loguru import logger
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
+from pytorch_lightning.callbacks import Callback, ModelCheckpoint
+
+# Used when the trainer config does not set them (Lightning's own defaults
+# would e.g. train for 1000 epochs).
+TRAINER_DEFAULTS: Dict[str, Any] = {
+    "max_epochs": 3,
+    "accelerator": "auto",
+    "devices": "auto",
+    "log_every_n_steps": 50,
+}
+# Keys of `cfg.trainer` consumed elsewhere, not `pl.Trainer` arguments.
+NON_TRAINER_KEYS = ("_target_", "callbacks", "lr", "weight_decay", "precision_check")
+
+
+def cpu_has_native_bf16() -> bool:
+    """True when the CPU has bf16 matmul instructions (AVX512-BF16 or AMX)."""
+    checks = ("_is_avx512_bf16_supported", "_is_amx_tile_supported")
+    return any(getattr(torch.cpu, name, lambda: False)() for name in checks)
+
+
+def _uses_cpu(accelerator: object) -> bool:
+    if accelerator == "auto":
+        return not (torch.cuda.is_available() or torch.backends.mps.is_available())
+    return accelerator == "cpu"
+
+
+def _check_precision(precision: str, accelerator: object) -> None:
+    # Lightning itself rejects fp16 on CPU; bf16 runs anywhere but is only
+    # fast with hardware support.
+    if precision.startswith("bf16") and _uses_cpu(accelerator):
+        if not cpu_has_native_bf16():
+            logger.warning(
+                "trainer.precision={} on a CPU without AVX512-BF16/AMX: bf16 is "
+                "emulated and usually slower than fp32.",
+                precision,
+            )
+
+
+def build_callbacks(cfg: DictConfig) -> List[Callback]:
+    """
+    Instantiate `trainer.callbacks` (the `trainer/callbacks` group); entries
+    set to null are skipped, e.g. `trainer.callbacks.early_stopping=null`.
+    """
+    specs = cfg.trainer.get("callbacks") or {}
+    callbacks = [instantiate(spec) for spec in specs.values() if spec is not None]
+    if not bool(cfg.trainer.get("enable_checkpointing", True)):
+        callbacks = [c for c in callbacks if not isinstance(c, ModelCheckpoint)]
+    return callbacks
 
 
 def build_trainer(cfg: DictConfig) -> pl.Trainer:
-    max_epochs = int(cfg.trainer.get("max_epochs", 3))
-    accelerator = cfg.trainer.get("accelerator", "auto")
-    devices = cfg.trainer.get("devices", "auto")
-    log_every_n_steps = int(cfg.trainer.get("log_every_n_steps", 50))
-    enable_checkpointing = bool(cfg.trainer.get("enable_checkpointing", True))
-    enable_progress_bar = bool(cfg.trainer.get("enable_progress_bar", True))
-
-    return pl.Trainer(
-        max_epochs=max_epochs,
-        accelerator=accelerator,
-        devices=devices,
-        log_every_n_steps=log_every_n_steps,
-        enable_checkpointing=enable_checkpointing,
-        enable_progress_bar=enable_progress_bar,
-    )
+    """
+    `pl.Trainer` from the whole `trainer` config: every key other than
+    `NON_TRAINER_KEYS` is passed through (precision, accumulation,
+    `limit_*_batches`, `benchmark`, strategy, ...), and unknown keys fail
+    here rather than being silently ignored.
+    """
+    kwargs: Dict[str, Any] = {
+        **TRAINER_DEFAULTS,
+        **cast(Dict[str, Any], OmegaConf.to_container(cfg.trainer, resolve=True)),
+    }
+    for key in NON_TRAINER_KEYS:
+        kwargs.pop(key, None)
+    accepted = inspect.signature(pl.Trainer.__init__).parameters
+    unknown = sorted(set(kwargs) - set(accepted))
+    if unknown:
+        raise ValueError(f"Unknown pl.Trainer arguments in trainer config: {unknown}")
+    if "precision" in kwargs:
+        kwargs["precision"] = str(kwargs["precision"])
+        _check_precision(kwargs["precision"], kwargs["accelerator"])
+    return pl.Trainer(callbacks=build_callbacks(cfg), **kwargs)
 
 
 def fit(
@@ -29,7 +88,7 @@ def fit(
     datamodule: pl.LightningDataModule,
 ) -> pl.Trainer:
     trainer = build_trainer(cfg)
-    logger.info("Fitting model...")
+    logger.info("Fitting model (precision={})...", trainer.precision)
     trainer.fit(lightning_module, datamodule=datamodule)
     return trainer
 {% else %}
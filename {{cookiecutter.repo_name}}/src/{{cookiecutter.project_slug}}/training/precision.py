@@ -0,0 +1,158 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+"""
+Numerical parity of mixed-precision training against fp32.
+
+After a `bf16-mixed` (or `16-mixed`) run, `maybe_check_precision_parity`
+evaluates the trained weights on the validation set twice, in fp32 and
+under the run's autocast dtype, and reports how far the two disagree.
+Enabled by `trainer.precision_check.enabled`; `cli.train` writes the
+report to `precision_parity.json` in the run directory.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sized
+
+import pytorch_lightning as pl
+import torch
+import torch.nn.functional as F
+from loguru import logger
+from omegaconf import DictConfig
+
+AUTOCAST_DTYPES = {"bf16-mixed": torch.bfloat16, "16-mixed": torch.float16}
+
+
+@dataclass(frozen=True)
+class PrecisionParity:
+    precision: str
+    n_rows: int
+    fp32_loss: float
+    mixed_loss: float
+    fp32_accuracy: float
+    mixed_accuracy: float
+    # Share of rows whose predicted class is the same in both precisions
+    argmax_agreement: float
+    max_abs_logit_diff: float
+    mean_abs_logit_diff: float
+
+    @property
+    def accuracy_drop(self) -> float:
+        return self.fp32_accuracy - self.mixed_accuracy
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "accuracy_drop": self.accuracy_drop}
+
+
+def precision_parity(
+    model: torch.nn.Module,
+    loader: Iterable[Any],
+    precision: str = "bf16-mixed",
+    batch_transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    device: Optional[torch.device] = None,
+) -> PrecisionParity:
+    """Compare `model` in fp32 and under `precision` autocast on `loader`."""
+    if precision not in AUTOCAST_DTYPES:
+        raise ValueError(f"precision must be one of {sorted(AUTOCAST_DTYPES)}")
+    device = device or next(model.parameters()).device
+    dtype = AUTOCAST_DTYPES[precision]
+    n = 0
+    sums = dict(loss32=0.0, loss_mixed=0.0, acc32=0.0, acc_mixed=0.0, agree=0.0)
+    max_diff, total_diff = 0.0, 0.0
+    was_training = model.training
+    model.eval()
+    with torch.no_grad():
+        for x, y, *_ in loader:
+            x, y = x.to(device), y.to(device)
+            if batch_transform is not None:
+                x = batch_transform(x)
+            fp32 = model(x).float()
+            with torch.autocast(device_type=device.type, dtype=dtype):
+                mixed = model(x).float()
+            diff = (fp32 - mixed).abs()
+            max_diff = max(max_diff, float(diff.max()))
+            total_diff += float(diff.mean(dim=1).sum())
+            sums["loss32"] += float(F.cross_entropy(fp32, y, reduction="sum"))
+            sums["loss_mixed"] += float(F.cross_entropy(mixed, y, reduction="sum"))
+            sums["acc32"] += float((fp32.argmax(1) == y).sum())
+            sums["acc_mixed"] += float((mixed.argmax(1) == y).sum())
+            sums["agree"] += float((fp32.argmax(1) == mixed.argmax(1)).sum())
+            n += len(y)
+    model.train(was_training)
+    if n == 0:
+        raise ValueError("precision parity needs a non-empty validation loader")
+    return PrecisionParity(
+        precision=precision,
+        n_rows=n,
+        fp32_loss=sums["loss32"] / n,
+        mixed_loss=sums["loss_mixed"] / n,
+        fp32_accuracy=sums["acc32"] / n,
+        mixed_accuracy=sums["acc_mixed"] / n,
+        argmax_agreement=sums["agree"] / n,
+        max_abs_logit_diff=max_diff,
+        mean_abs_logit_diff=total_diff / n,
+    )
+
+
+def maybe_check_precision_parity(
+    cfg: DictConfig,
+    trainer: pl.Trainer,
+    datamodule: pl.LightningDataModule,
+    lightning_module: pl.LightningModule,
+    out_dir: Optional[Path] = None,
+) -> Optional[PrecisionParity]:
+    """
+    Run `precision_parity` after a mixed-precision fit, log it and write
+    `precision_parity.json` to `out_dir`. Accuracy drops beyond
+    `trainer.precision_check.max_accuracy_drop` are logged as warnings, or
+    raise with `fail_on_drop: true`. Skipped, with a warning, when the val
+    split is empty.
+    """
+    check = cfg.trainer.get("precision_check") or {}
+    precision = str(trainer.precision)
+    if not bool(check.get("enabled", False)) or precision not in AUTOCAST_DTYPES:
+        return None
+    loader = datamodule.val_dataloader()
+    if isinstance(loader, Sized) and len(loader) == 0:
+        logger.warning(
+            "Skipping the {} vs fp32 parity check: the val split is empty.", precision
+        )
+        return None
+    model = lightning_module.model
+    assert isinstance(model, torch.nn.Module)
+    parity = precision_parity(
+        model,
+        loader,
+        precision,
+        batch_transform=getattr(lightning_module, "batch_transform", None),
+        device=lightning_module.device,
+    )
+    logger.info(
+        "{} vs fp32 on {} val rows: accuracy {:.4f} vs {:.4f}, loss {:.4f} vs "
+        "{:.4f}, argmax agreement {:.4f}, max |logit diff| {:.3g}",
+        precision,
+        parity.n_rows,
+        parity.mixed_accuracy,
+        parity.fp32_accuracy,
+        parity.mixed_loss,
+        parity.fp32_loss,
+        parity.argmax_agreement,
+        parity.max_abs_logit_diff,
+    )
+    if out_dir is not None:
+        path = Path(out_dir) / "precision_parity.json"
+        path.write_text(json.dumps(parity.to_dict(), indent=2))
+    max_drop = float(check.get("max_accuracy_drop", 0.005))
+    if parity.accuracy_drop > max_drop:
+        message = (
+            f"{precision} accuracy is {parity.accuracy_drop:.4f} below fp32 on "
+            f"the val set (tolerance {max_drop}); train in fp32 "
+            "(trainer.precision=32) or raise the tolerance."
+        )
+        if bool(check.get("fail_on_drop", False)):
+            raise RuntimeError(message)
+        logger.warning(message)
+    return parity
+{%- endif %}
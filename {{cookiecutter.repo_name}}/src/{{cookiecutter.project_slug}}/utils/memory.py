@@ -0,0 +1,101 @@
+"""Process memory accounting for DataLoader workers (Linux `/proc`, stdlib only).
+
+RSS counts shared pages once per process, so N workers mapping the same
+shared-memory dataset each report its full size. PSS splits shared pages
+between the processes that map them and USS counts only private pages; sum
+PSS across processes to see what a pod actually costs.
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from loguru import logger
+
+_ROLLUP_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """Memory of `pid` in bytes: `rss`, `pss`, `uss` (private) and `shared`."""
+    rollup = Path(f"/proc/{pid}/smaps_rollup")
+    if rollup.exists():
+        values = dict.fromkeys(_ROLLUP_FIELDS.values(), 0)
+        for line in rollup.read_text().splitlines():
+            name, _, rest = line.partition(":")
+            if name in _ROLLUP_FIELDS:
+                values[_ROLLUP_FIELDS[name]] = int(rest.split()[0]) * 1024
+        return {
+            "rss": values["rss"],
+            "pss": values["pss"],
+            "uss": values["private_clean"] + values["private_dirty"],
+            "shared": values["shared_clean"] + values["shared_dirty"],
+        }
+    if pid != "self" and pid != os.getpid():
+        raise OSError(f"Per-process memory for pid {pid} needs Linux /proc")
+    # Peak RSS only; ru_maxrss is KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return {"rss": rss, "pss": rss, "uss": rss, "shared": 0}
+
+
+def child_pids(pid: Union[int, str] = "self") -> List[int]:
+    """Direct children of `pid` (e.g. the DataLoader workers of this process)."""
+    children: List[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children.extend(int(c) for c in (task / "children").read_text().split())
+        except OSError:
+            continue
+    return sorted(set(children))
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def memory_report(pids: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+    """Memory of this process and of `pids` (default: its live children)."""
+    report = {os.getpid(): process_memory()}
+    for pid in child_pids() if pids is None else pids:
+        try:
+            report[pid] = process_memory(pid)
+        except OSError:
+            continue  # exited in the meantime
+    return report
+
+
+def log_memory_report(report: Dict[int, Dict[str, int]]) -> None:
+    for pid, mem in report.items():
+        logger.info(
+            "pid {}: rss={} pss={} uss={} shared={}",
+            pid,
+            *(format_bytes(mem[k]) for k in ("rss", "pss", "uss", "shared")),
+        )
+    total_pss = sum(mem["pss"] for mem in report.values())
+    logger.info("total pss over {} processes: {}", len(report), format_bytes(total_pss))
+
+
+def log_worker_memory(worker_id: int) -> None:
+    """`DataLoader` `worker_init_fn` that logs the worker's memory at start-up."""
+    mem = process_memory()
+    logger.info(
+        "DataLoader worker {} (pid {}): rss={} pss={} uss={}",
+        worker_id,
+        os.getpid(),
+        *(format_bytes(mem[k]) for k in ("rss", "pss", "uss")),
+    )
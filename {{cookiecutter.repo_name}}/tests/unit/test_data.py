@@ -0,0 +1,633 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+import dataclasses
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import pytorch_lightning as pl
+import torch
+from torch.utils.data import DataLoader
+
+from {{cookiecutter.project_slug}}.data.cache import DatasetCache, fingerprint
+from {{cookiecutter.project_slug}}.data.datamodule import (
+    DataModuleConfig,
+    ImageFolderDataModule,
+    MemmapDataModule,
+    ParquetDataModule,
+    ParquetTableDataModule,
+    RandomDataModule,
+)
+from {{cookiecutter.project_slug}}.data.datasets import (
+    RandomClassificationDataset,
+    RandomDatasetConfig,
+)
+from {{cookiecutter.project_slug}}.data.dedup import find_duplicates
+from {{cookiecutter.project_slug}}.data.memmap import (
+    MemmapClassificationDataset,
+    write_memmap_dataset,
+)
+from {{cookiecutter.project_slug}}.data.parquet import ParquetIterableDataset
+from {{cookiecutter.project_slug}}.data.rng import philox4x32
+from {{cookiecutter.project_slug}}.data.samplers import (
+    AliasTable,
+    ChunkShuffleSampler,
+    LengthBucketSampler,
+    ResumableSampler,
+    WeightedAliasSampler,
+    padding_fraction,
+)
+from {{cookiecutter.project_slug}}.data.shards import ShardClassificationDataset, write_shard_dataset
+from {{cookiecutter.project_slug}}.data.splits import (
+    cached_split,
+    group_split_indices,
+    stratified_split_indices,
+)
+from {{cookiecutter.project_slug}}.data.stats import StreamingStats, compute_dataset_stats
+from {{cookiecutter.project_slug}}.data.text import TextCacheMeta, TokenizedTextDataset
+from {{cookiecutter.project_slug}}.data.transforms import (
+    build_batch_transform,
+    compose,
+    to_float32,
+)
+from {{cookiecutter.project_slug}}.utils.memory import memory_report
+
+
+def test_memmap_roundtrip_is_zero_copy(tmp_path: Path) -> None:
+    X = torch.randn(100, 8)
+    y = torch.randint(0, 3, (100,))
+    meta = write_memmap_dataset(tmp_path / "ds", X, y, chunk_rows=32)
+    assert (meta.n_samples, meta.n_features, meta.n_classes) == (100, 8, 3)
+
+    ds = MemmapClassificationDataset(tmp_path / "ds")
+    x0, y0 = ds[7]
+    assert torch.equal(x0, X[7]) and int(y0) == int(y[7])
+    assert np.shares_memory(x0.numpy(), ds._arrays()[0])
+
+
+def test_memmap_datamodule_loaders(tmp_path: Path) -> None:
+    X, y = torch.randn(50, 4), torch.randint(0, 2, (50,))
+    write_memmap_dataset(tmp_path / "ds", X, y)
+    dm = MemmapDataModule(str(tmp_path / "ds"), DataModuleConfig(batch_size=8))
+    dm.setup()
+    xb, yb = next(iter(dm.train_dataloader()))
+    assert xb.shape == (8, 4) and yb.shape == (8,)
+
+
+def test_shard_roundtrip_decompresses_only_touched_blocks(tmp_path: Path) -> None:
+    pytest.importorskip("zstandard")
+    X = torch.randn(1000, 8).round(decimals=1)
+    y = torch.randint(0, 3, (1000,))
+    meta = write_shard_dataset(tmp_path / "ds", X, y, chunk_rows=300, block_rows=128)
+    assert (meta.n_samples, meta.n_blocks, meta.n_classes) == (1000, 8, 3)
+    assert meta.ratio > 1.5
+
+    ds = ShardClassificationDataset(tmp_path / "ds")
+    rows = np.array([5, 900, 7, 999, 130])
+    xb, yb = ds[rows]
+    assert torch.equal(xb, X[rows]) and torch.equal(yb, y[rows])
+    assert ds.decodes == 3  # blocks 0, 1 and 7
+
+
+def test_image_folder_is_decoded_once_into_uint8_cache(tmp_path: Path) -> None:
+    Image = pytest.importorskip("PIL.Image")
+    for i in range(12):
+        cls = tmp_path / "images" / ("cat" if i % 3 else "dog")
+        cls.mkdir(parents=True, exist_ok=True)
+        pixels = np.full((40, 60, 3), i * 20, dtype=np.uint8)
+        Image.fromarray(pixels).save(cls / f"{i:02d}.png")
+
+    def build() -> ImageFolderDataModule:
+        dm = ImageFolderDataModule(
+            str(tmp_path / "images"),
+            DataModuleConfig(batch_size=4, val_frac=0.25, test_frac=0.0),
+            image_size=(16, 16),
+            image_cache_dir=str(tmp_path / "cache"),
+            classmap_file=str(tmp_path / "class_to_idx.json"),
+            n_jobs=2,
+        )
+        dm.setup()
+        return dm
+
+    dm = build()
+    assert (tmp_path / "class_to_idx.json").exists()
+    ds = dm._dataset
+    assert ds.class_to_idx == {"cat": 0, "dog": 1}
+    assert ds.files[0] == "cat/01.png" and int(ds.y[0]) == 0
+    x, y = next(iter(dm.train_dataloader()))
+    assert x.dtype == torch.uint8 and x.shape == (4, 3, 16, 16)
+    assert int(ds[0][0][:, 8, 8].float().mean()) == 20  # row 0 is cat/01.png
+
+    entry = dm._entry
+    assert entry is not None
+    images_mtime = (entry / "images.npy").stat().st_mtime_ns
+    assert build()._entry == entry  # cache hit: nothing is decoded again
+    assert (entry / "images.npy").stat().st_mtime_ns == images_mtime
+
+
+def test_batch_fetch_matches_per_sample_collate() -> None:
+    ds_cfg = RandomDatasetConfig(n_samples=200, n_features=4)
+    batches = []
+    for batch_fetch in (False, True):
+        dm_cfg = DataModuleConfig(batch_size=16, batch_fetch=batch_fetch)
+        dm = RandomDataModule(ds_cfg, dm_cfg)
+        dm.setup()
+        batches.append(list(dm.val_dataloader()))
+    assert len(batches[0]) == len(batches[1])
+    for (xa, ya), (xb, yb) in zip(*batches):
+        assert torch.equal(xa, xb) and torch.equal(ya, yb)
+
+
+def test_shared_memory_dataset_is_served_by_workers() -> None:
+    ds_cfg = RandomDatasetConfig(n_samples=256, n_features=4)
+    shared_cfg = DataModuleConfig(
+        batch_size=32, num_workers=2, share_memory=True, log_worker_memory=True
+    )
+    shared = RandomDataModule(ds_cfg, shared_cfg)
+    shared.setup()
+    assert shared._dataset.X.is_shared() and shared._dataset.y.is_shared()
+
+    plain = RandomDataModule(ds_cfg, DataModuleConfig(batch_size=32))
+    plain.setup()
+    for (xa, ya), (xb, yb) in zip(shared.val_dataloader(), plain.val_dataloader()):
+        assert torch.equal(xa, xb) and torch.equal(ya, yb)
+
+    report = memory_report()
+    assert all(mem["rss"] >= mem["uss"] > 0 for mem in report.values())
+
+
+@pytest.mark.parametrize(
+    "counter, key, expected",
+    [
+        # Random123 known-answer vectors (kat_vectors, philox4x32 10 rounds)
+        ([0, 0, 0, 0], [0, 0], [0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8]),
+        (
+            [0xFFFFFFFF] * 4,
+            [0xFFFFFFFF] * 2,
+            [0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD],
+        ),
+        (
+            [0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344],
+            [0xA4093822, 0x299F31D0],
+            [0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1],
+        ),
+    ],
+)
+def test_philox_matches_known_answer_vectors(
+    counter: List[int], key: List[int], expected: List[int]
+) -> None:
+    counters = np.array([counter, counter], dtype=np.uint32)
+    out = philox4x32(counters, seed=key[0] | key[1] << 32)
+    assert out.dtype == np.uint32
+    assert out.tolist() == [expected, expected]
+
+
+def test_lazy_synthetic_rows_match_eager() -> None:
+    eager = RandomClassificationDataset(RandomDatasetConfig(n_samples=300), seed=7)
+    lazy = RandomClassificationDataset(
+        RandomDatasetConfig(n_samples=300, lazy=True), seed=7
+    )
+    assert lazy.X is None
+    idx = np.array([299, 3, 150, 3])
+    for i in (0, 123, idx):
+        xe, ye = eager[i]
+        xl, yl = lazy[i]
+        assert torch.equal(xe, xl) and torch.equal(ye, yl)
+    assert torch.equal(eager.y, lazy.y)
+
+
+def test_transformed_dataset_is_cached_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ds_cfg = RandomDatasetConfig(n_samples=64, n_features=4)
+    dm_cfg = DataModuleConfig(cache_dir=str(tmp_path / "cache"))
+    transform = compose(to_float32, lambda x: x * 2)
+
+    first = RandomDataModule(ds_cfg, dm_cfg, transform=transform)
+    first.setup()
+    x, _ = first._dataset[5]
+    assert torch.equal(x, RandomClassificationDataset(ds_cfg)[5][0] * 2)
+    entry = first._dataset.path
+
+    # A hit is served from the entry without building the source dataset.
+    def build_dataset(self: RandomDataModule) -> Any:
+        raise AssertionError("cache hit built the source dataset")
+
+    with monkeypatch.context() as m:
+        m.setattr(RandomDataModule, "_build_dataset", build_dataset)
+        again = RandomDataModule(ds_cfg, dm_cfg, transform=transform)
+        again.setup()
+    assert again._dataset.path == entry
+    assert fingerprint(ds_cfg, transform) != fingerprint(ds_cfg, to_float32)
+
+    # Same qualified name, different constant: must not reuse the entry.
+    edited_transform = compose(to_float32, lambda x: x * 3)
+    edited = RandomDataModule(ds_cfg, dm_cfg, transform=edited_transform)
+    edited.setup()
+    assert edited._dataset.path != entry
+
+
+def test_dataset_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = DatasetCache(tmp_path, max_bytes=2500)
+    for key in ("a", "b", "c"):
+        X, y = torch.zeros(20, 8), torch.zeros(20, dtype=torch.long)
+        cache.get_or_build(key, lambda p: write_memmap_dataset(p, X, y))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["b", "c"]
+
+
+def test_batch_transform_pipeline_matches_stepwise_reference() -> None:
+    x = torch.randn(16, 4) * 10
+    t = build_batch_transform(
+        [
+            {"name": "standardize", "mean": [1.0] * 4, "std": [2.0] * 4},
+            {"name": "standardize", "mean": [0.5] * 4, "std": [4.0] * 4},
+            {"name": "log1p", "columns": [0, 2]},
+            {"name": "clip", "min": -1.0, "max": 1.0},
+            {"name": "one_hot", "column": 3, "num_classes": 3},
+            {"name": "select", "indices": [0, 1, 2, 5]},
+        ]
+    )
+    assert t is not None
+    assert len(t.transforms) == 5  # the two standardize steps are folded
+
+    ref = ((x - 1.0) / 2.0 - 0.5) / 4.0
+    ref[:, [0, 2]] = ref[:, [0, 2]].sign() * ref[:, [0, 2]].abs().log1p()
+    ref = ref.clamp(-1.0, 1.0)
+    codes = ref[:, 3].long()
+    onehot = torch.nn.functional.one_hot(codes.clamp(0, 2), 3).float()
+    onehot[(codes < 0) | (codes > 2)] = 0.0
+    ref = torch.cat([ref[:, :3], onehot], dim=1)[:, [0, 1, 2, 5]]
+
+    x_before = x.clone()
+    assert torch.allclose(t(x), ref, atol=1e-5)
+    assert torch.equal(x, x_before)  # the input batch is never modified
+
+    # Unknown codes become all-zero rows instead of aliasing a valid class.
+    one_hot = build_batch_transform(
+        [{"name": "one_hot", "column": 0, "num_classes": 3}]
+    )
+    assert one_hot is not None
+    codes = torch.tensor([[-1.0], [0.0], [2.0], [3.0], [7.0]])
+    expected = torch.tensor([[0, 0, 0], [1, 0, 0], [0, 0, 1], [0, 0, 0], [0, 0, 0]])
+    assert torch.equal(one_hot(codes), expected.float())
+
+    # Image flattening is the same for one row and for a batch of rows.
+    flatten = build_batch_transform([{"name": "flatten"}])
+    assert flatten is not None
+    images = torch.rand(4, 3, 5, 5)
+    assert flatten(images).shape == (4, 75)
+    assert torch.equal(flatten(images[1]), flatten(images)[1])
+
+
+def test_streaming_stats_merge_matches_single_pass() -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(3.0, 2.0, size=(5000, 3)).astype(np.float32)
+    y = rng.integers(0, 4, 5000)
+    whole = StreamingStats(3, sample_size=512).update(X, y).finalize()
+    parts = [StreamingStats(3, sample_size=512) for _ in range(3)]
+    for part, rows in zip(parts, np.array_split(rng.permutation(5000), 3)):
+        for chunk in np.array_split(rows, 7):
+            part.update(X[chunk], y[chunk], rows=chunk)
+    merged = parts[2].merge(parts[0]).merge(parts[1]).finalize()
+
+    np.testing.assert_allclose(merged.mean, X.mean(0, dtype=np.float64), rtol=1e-9)
+    np.testing.assert_allclose(merged.std, X.std(0, dtype=np.float64), rtol=1e-9)
+    assert merged.quantiles == whole.quantiles and merged.min == whole.min
+    assert merged.class_counts == np.bincount(y).tolist()
+
+
+def test_normalize_uses_cached_train_stats(tmp_path: Path) -> None:
+    X = torch.randn(400, 3) * 5 + 10
+    write_memmap_dataset(tmp_path / "ds", X, torch.randint(0, 2, (400,)))
+    dm_cfg = DataModuleConfig(
+        batch_size=400, normalize=True, stats_dir=str(tmp_path / "stats")
+    )
+    dm = MemmapDataModule(str(tmp_path / "ds"), dm_cfg)
+    dm.setup()
+    assert dm._split is not None and dm.stats_path is not None
+    train_idx = np.asarray(dm._split.train_idx)
+    ds = MemmapClassificationDataset(tmp_path / "ds")
+    expected = compute_dataset_stats(ds, train_idx)
+    assert dm.stats == expected and dm.stats_path.exists()
+
+    xb, _ = next(iter(dm.train_dataloader()))
+    assert torch.allclose(xb.mean(0), torch.zeros(3), atol=1e-4)
+    assert torch.allclose(xb.std(0, unbiased=False), torch.ones(3), atol=1e-4)
+
+    again = MemmapDataModule(str(tmp_path / "ds"), dm_cfg)
+    again.setup()
+    assert again.stats == dm.stats and len(list((tmp_path / "stats").iterdir())) == 1
+
+
+def test_stratified_split_keeps_class_fractions() -> None:
+    labels = np.repeat(np.arange(3), [1000, 200, 50])
+    split = stratified_split_indices(labels, seed=0, val_frac=0.1, test_frac=0.2)
+    assert split.train_idx.dtype == np.int32
+    assert np.bincount(labels[split.test_idx]).tolist() == [200, 40, 10]
+    assert np.bincount(labels[split.val_idx]).tolist() == [100, 20, 5]
+    everything = np.concatenate([split.train_idx, split.val_idx, split.test_idx])
+    assert np.array_equal(np.sort(everything), np.arange(len(labels)))
+
+
+def test_group_split_never_shares_groups() -> None:
+    groups = np.random.default_rng(0).integers(0, 100, 5000)
+    split = group_split_indices(groups, seed=0)
+    train, val, test = (
+        set(groups[i]) for i in (split.train_idx, split.val_idx, split.test_idx)
+    )
+    assert not (train & val or train & test or val & test)
+
+
+def test_cached_split_is_reused(tmp_path: Path) -> None:
+    labels = np.random.default_rng(0).integers(0, 4, 1000)
+    first = cached_split(tmp_path, len(labels), mode="stratified", labels=labels)
+    again = cached_split(tmp_path, len(labels), mode="stratified", labels=labels)
+    assert isinstance(again.train_idx, np.memmap)
+    assert np.array_equal(first.train_idx, again.train_idx)
+    cached_split(tmp_path, len(labels), mode="stratified", labels=labels[::-1].copy())
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_resumable_sampler_partitions_ranks_deterministically() -> None:
+    data = list(range(103))
+    shards = [
+        list(ResumableSampler(data, seed=3, num_replicas=4, rank=r)) for r in range(4)
+    ]
+    assert all(len(s) == 26 for s in shards)
+    assert set().union(*shards) == set(data)
+    assert shards[0] == list(ResumableSampler(data, seed=3, num_replicas=4, rank=0))
+
+    sampler = ResumableSampler(data, seed=3, batch_size=10)
+    sampler.set_epoch(2)
+    epoch = list(sampler)
+    sampler.advance(35)
+    resumed = ResumableSampler(data, seed=3, batch_size=10)
+    resumed.load_state_dict(sampler.state_dict())
+    resumed.set_epoch(2)
+    assert sum(list(resumed), []) == sum(epoch, [])[35:]
+
+
+class _RecordRows(pl.LightningModule):
+    def __init__(self) -> None:
+        super().__init__()
+        self.layer = torch.nn.Linear(1, 2)
+        self.seen: List[int] = []
+
+    def training_step(self, batch: Any, batch_idx: int) -> torch.Tensor:
+        x, y = batch
+        self.seen.extend(x[:, 0].long().tolist())
+        return torch.nn.functional.cross_entropy(self.layer(x), y)
+
+    def configure_optimizers(self) -> torch.optim.Optimizer:
+        return torch.optim.SGD(self.parameters(), lr=0.1)
+
+
+def test_datamodule_resumes_mid_epoch_from_checkpoint(
+    tmp_path_with_logs: Path,
+) -> None:
+    tmp_path = tmp_path_with_logs
+    write_memmap_dataset(
+        tmp_path / "ds", torch.arange(200.0)[:, None], torch.zeros(200)
+    )
+    dm_cfg = DataModuleConfig(batch_size=16, val_frac=0.0, test_frac=0.0)
+    trainer_kwargs: Dict[str, Any] = dict(
+        default_root_dir=tmp_path,
+        max_epochs=2,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+        limit_val_batches=0,
+    )
+
+    full = _RecordRows()
+    pl.Trainer(**trainer_kwargs).fit(
+        full, MemmapDataModule(str(tmp_path / "ds"), dm_cfg)
+    )
+
+    # 13 batches per epoch: "preempted" after batch 4 of epoch 1.
+    first = _RecordRows()
+    checkpoint = pl.callbacks.ModelCheckpoint(
+        dirpath=tmp_path, filename="mid", every_n_train_steps=17
+    )
+    pl.Trainer(
+        **{**trainer_kwargs, "enable_checkpointing": True},
+        max_steps=17,
+        callbacks=[checkpoint],
+    ).fit(first, MemmapDataModule(str(tmp_path / "ds"), dm_cfg))
+
+    rest = _RecordRows()
+    pl.Trainer(**trainer_kwargs).fit(
+        rest,
+        MemmapDataModule(str(tmp_path / "ds"), dm_cfg),
+        ckpt_path=tmp_path / "mid.ckpt",
+    )
+    assert first.seen + rest.seen == full.seen
+
+
+def test_parquet_row_groups_are_split_without_overlap(tmp_path: Path) -> None:
+    for i in range(3):
+        ids = np.arange(i * 100, (i + 1) * 100)
+        table = pa.table({"f0": ids.astype(np.float32), "label": ids % 2})
+        pq.write_table(table, tmp_path / f"part-{i}.parquet", row_group_size=25)
+
+    seen = []
+    for rank in range(2):
+        ds = ParquetIterableDataset(tmp_path, batch_size=10, shuffle=True)
+        ds.rank, ds.world_size = rank, 2
+        for x, y in DataLoader(ds, batch_size=None, num_workers=2):
+            assert x.dtype == torch.float32 and x.shape[1] == 1
+            seen.extend(x[:, 0].long().tolist())
+    assert sorted(seen) == list(range(300))
+
+
+def test_parquet_shuffle_changes_every_epoch_with_persistent_workers(
+    tmp_path: Path,
+) -> None:
+    ids = np.arange(200)
+    table = pa.table({"f0": ids.astype(np.float32), "label": ids % 2})
+    pq.write_table(table, tmp_path / "part.parquet", row_group_size=20)
+    ds = ParquetIterableDataset(
+        tmp_path, batch_size=10, shuffle=True, shuffle_buffer_chunks=2
+    )
+    loader = DataLoader(ds, batch_size=None, num_workers=2, persistent_workers=True)
+
+    def epoch(i: int) -> List[int]:
+        ds.set_epoch(i)
+        return torch.cat([x[:, 0] for x, _ in loader]).long().tolist()
+
+    first, second = epoch(0), epoch(1)
+    assert sorted(first) == sorted(second) == list(range(200))
+    assert first != second
+    assert epoch(0) == first
+
+
+def test_parquet_datamodule_shuffles_rows_by_default(tmp_path: Path) -> None:
+    ids = np.arange(200)
+    table = pa.table({"f0": ids.astype(np.float32), "label": ids % 2})
+    (tmp_path / "train").mkdir()
+    pq.write_table(table, tmp_path / "train" / "part.parquet", row_group_size=20)
+    dm = ParquetDataModule(str(tmp_path), DataModuleConfig(batch_size=20))
+    assert dm.dm_cfg.shuffle_mode == "full"
+    batches = [x[:, 0].long().tolist() for x, _ in dm.train_dataloader()]
+    assert sorted(sum(batches, [])) == list(range(200))
+    # Not just row groups in a new order: rows arrive out of storage order.
+    assert all(b != sorted(b) for b in batches)
+
+    bad_options: List[Dict[str, Any]] = [
+        {"class_weights": "balanced"},
+        {"split_mode": "stratified"},
+        {"shuffle_mode": "length"},
+    ]
+    for bad in bad_options:
+        with pytest.raises(ValueError, match=next(iter(bad))):
+            ParquetDataModule(str(tmp_path), DataModuleConfig(**bad))
+
+
+def test_chunk_shuffle_decodes_each_row_group_once(tmp_path: Path) -> None:
+    ids = np.arange(2000)
+    table = pa.table({"f0": ids.astype(np.float32), "label": ids % 3})
+    pq.write_table(table, tmp_path / "table.parquet", row_group_size=50)
+
+    decodes, seen = {}, {}
+    for mode in ("full", "chunk"):
+        dm_cfg = DataModuleConfig(
+            batch_size=32, shuffle_mode=mode, shuffle_buffer_chunks=4
+        )
+        dm = ParquetTableDataModule(str(tmp_path / "table.parquet"), dm_cfg)
+        dm.setup()
+        seen[mode] = sorted(
+            int(v) for x, _ in dm.train_dataloader() for v in x[:, 0].tolist()
+        )
+        decodes[mode] = dm._dataset.decodes
+    assert dm._split is not None
+    assert seen["chunk"] == seen["full"] == sorted(dm._split.train_idx.tolist())
+    assert decodes["chunk"] == 40 and decodes["full"] > 10 * decodes["chunk"]
+
+
+def test_chunk_shuffle_lanes_follow_worker_round_robin() -> None:
+    chunk_ids = np.repeat(np.arange(24), 50)
+    sampler = ChunkShuffleSampler(
+        list(range(len(chunk_ids))),
+        chunk_ids,
+        buffer_chunks=3,
+        num_workers=2,
+        batch_size=25,
+        seed=1,
+    )
+    batches = list(sampler)
+    assert sorted(sum(batches, [])) == list(range(len(chunk_ids)))
+    # The DataLoader hands batch k to worker k % 2: the workers' chunk sets
+    # must not overlap, so no chunk is decoded by both.
+    lanes = [set(chunk_ids[sum(batches[w::2], [])]) for w in range(2)]
+    assert not lanes[0] & lanes[1]
+
+    # Resuming after an odd number of batches: the fresh DataLoader starts at
+    # worker 0 again, so the rest must be dealt from lane 0 again. Lane 1 is
+    # then one batch longer, so only the very last batch changes worker.
+    for batch in batches[:5]:
+        sampler.advance(len(batch))
+    resumed = ChunkShuffleSampler(
+        list(range(len(chunk_ids))),
+        chunk_ids,
+        buffer_chunks=3,
+        num_workers=2,
+        batch_size=25,
+        seed=1,
+    )
+    resumed.load_state_dict(sampler.state_dict())
+    rest = list(resumed)
+    assert sorted(sum(batches[:5] + rest, [])) == list(range(len(chunk_ids)))
+    for w in range(2):
+        assert set(chunk_ids[sum(rest[:-1][w::2], [])]) <= lanes[w]
+
+
+def test_dedup_keep_mask_drops_copies_from_every_split(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 64)).astype(np.float32)
+    X[1500:1600] = X[:100]  # exact copies
+    X[1600:1700] = X[100:200] + 1e-4  # near copies
+    X[1700] = -0.0 * X[1700]  # all -0.0: must match the +0.0 row below
+    X[1701] = 0.0
+    y = rng.integers(0, 2, len(X))
+    write_memmap_dataset(tmp_path / "ds", X, y, n_classes=2)
+
+    ds = MemmapClassificationDataset(tmp_path / "ds")
+    keep, report = find_duplicates(ds, chunk_rows=256)
+    expected = np.ones(len(X), dtype=bool)
+    expected[1500:1700] = False
+    expected[1701] = False
+    assert np.array_equal(keep, expected)
+    assert (report.n_exact, report.n_near) == (101, 100)
+
+    np.save(tmp_path / "keep.npy", keep)
+    dm = MemmapDataModule(
+        str(tmp_path / "ds"), DataModuleConfig(keep_mask=str(tmp_path / "keep.npy"))
+    )
+    dm.setup("fit")
+    split = dm._split
+    assert split is not None
+    used = np.concatenate([split.train_idx, split.val_idx, split.test_idx])
+    assert np.array_equal(np.sort(used), np.flatnonzero(keep))
+    with pytest.raises(ValueError, match="keep_mask"):
+        ParquetDataModule(str(tmp_path), DataModuleConfig(keep_mask="keep.npy"))
+
+
+def test_length_buckets_cut_padding_and_keep_every_row() -> None:
+    lengths = np.random.default_rng(0).integers(1, 512, size=3000)
+    full = ResumableSampler(range(3000), seed=1, batch_size=32)
+    bucketed = LengthBucketSampler(range(3000), lengths, seed=1, batch_size=32)
+    batches = list(bucketed)
+    assert sorted(np.concatenate(batches).tolist()) == list(range(3000))
+    assert padding_fraction(lengths, batches) < 0.05
+    assert padding_fraction(lengths, list(full)) > 0.4
+
+    resumed = LengthBucketSampler(range(3000), lengths, seed=1, batch_size=32)
+    resumed.load_state_dict({"epoch": 0, "consumed": 32 * 10, "seed": 1})
+    assert list(resumed) == batches[10:]
+
+
+def test_tokenized_batches_are_padded_to_longest_row(tmp_path: Path) -> None:
+    rows = [[5, 6, 7], [8], [9, 10]]
+    np.save(tmp_path / "tokens.npy", np.concatenate(rows).astype(np.uint16))
+    np.save(tmp_path / "offsets.npy", np.array([0, 3, 4, 6]))
+    np.save(tmp_path / "labels.npy", np.array([1, 0, 1]))
+    meta = TextCacheMeta(3, 6, 8, 32, pad_token_id=0, n_classes=2, dtype="uint16")
+    (tmp_path / "meta.json").write_text(json.dumps(dataclasses.asdict(meta)))
+
+    ds = TokenizedTextDataset(tmp_path)
+    x, y = ds[np.array([1, 2])]
+    assert x["input_ids"].tolist() == [[8, 0], [9, 10]]
+    assert x["attention_mask"].tolist() == [[1, 0], [1, 1]]
+    assert y.tolist() == [0, 1] and ds.lengths.tolist() == [3, 1, 2]
+
+
+def test_alias_table_and_class_balanced_sampler() -> None:
+    w = np.random.default_rng(0).pareto(1.0, 10_000)
+    table = AliasTable(w)
+    implied = table.prob.astype(np.float64)
+    np.add.at(implied, table.alias, 1.0 - implied)
+    np.testing.assert_allclose(implied / len(w), w / w.sum(), atol=1e-9)
+
+    labels = (np.arange(100_000) % 1000 == 0).astype(np.int64)  # 1:999
+    sampler = WeightedAliasSampler(
+        range(len(labels)), labels=labels, seed=3, epoch_samples=20_000
+    )
+    rows = np.fromiter(sampler, dtype=np.int64)
+    assert len(rows) == 20_000 and np.array_equal(rows, list(sampler))
+    assert abs(labels[rows].mean() - 0.5) < 0.02
+    sampler.set_epoch(1)
+    assert not np.array_equal(rows, list(sampler))
+
+    # Weights are indexed by class id: extra entries for absent classes are
+    # never drawn, too few entries fail loudly.
+    padded = WeightedAliasSampler(
+        range(len(labels)), labels=labels, class_weights=[1.0, 1.0, 5.0], seed=3
+    )
+    assert set(labels[list(padded)].tolist()) == {0, 1}
+    with pytest.raises(ValueError, match="one weight per class"):
+        WeightedAliasSampler(range(len(labels)), labels=labels, class_weights=[1.0])
+{%- endif %}
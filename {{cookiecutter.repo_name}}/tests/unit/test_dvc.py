@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.project_slug}}.integrations import dvc
+from {{cookiecutter.project_slug}}.integrations.dvc import dataset_digest
+
+
+def test_dataset_digest_rehashes_only_changed_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(dvc, "PIECE_BYTES", 64)  # exercise multi-piece files
+    data, cache = tmp_path / "data", tmp_path / "cache"
+    (data / "sub").mkdir(parents=True)
+    (data / "a.bin").write_bytes(bytes(range(200)))
+    (data / "sub" / "b.bin").write_bytes(b"b" * 10)
+    (data / "empty").write_bytes(b"")
+
+    first = dataset_digest(data, cache_dir=cache)
+    assert (first.n_files, first.n_hashed, first.n_bytes) == (3, 3, 210)
+    again = dataset_digest(data, cache_dir=cache)
+    assert again.digest == first.digest and again.n_hashed == 0
+    assert dataset_digest(data).digest == first.digest  # same without cache
+
+    (data / "sub" / "b.bin").write_bytes(b"c" * 11)
+    changed = dataset_digest(data, cache_dir=cache)
+    assert changed.digest != first.digest
+    assert (changed.n_hashed, changed.hashed_bytes) == (1, 11)
+
+    # Another piece size changes multi-piece digests: the cache must not apply.
+    monkeypatch.setattr(dvc, "PIECE_BYTES", 128)
+    resized = dataset_digest(data, cache_dir=cache)
+    assert resized.n_hashed == 3
+    assert resized.digest == dataset_digest(data).digest
@@ -0,0 +1,363 @@
+{% if cookiecutter.ml_framework == 'pytorch' -%}
+import io
+import json
+from pathlib import Path
+from typing import Sized, cast
+
+import numpy as np
+import pytest
+import pytorch_lightning as pl
+import torch
+from hydra import compose, initialize_config_dir
+from omegaconf import OmegaConf
+
+from {{cookiecutter.project_slug}}.data.datamodule import ClassificationDataModule
+from {{cookiecutter.project_slug}}.data.factory import build_datamodule
+from {{cookiecutter.project_slug}}.data.transforms import build_batch_transform
+from {{cookiecutter.project_slug}}.inference.predictor import Predictor
+from {{cookiecutter.project_slug}}.models.compile import CompileConfig
+from {{cookiecutter.project_slug}}.models.compress import (
+    factorize_linears,
+    low_rank_linear,
+    model_cost,
+    prune_hidden_units,
+)
+from {{cookiecutter.project_slug}}.models.distill import (
+    cached_teacher_logits,
+    distillation_loss,
+    teacher_logits_key,
+    teacher_version,
+)
+from {{cookiecutter.project_slug}}.models.ensemble import StackedEnsemble
+from {{cookiecutter.project_slug}}.models.factory import build_lightning_module
+from {{cookiecutter.project_slug}}.models.lightning.modules import DistillationModule
+from {{cookiecutter.project_slug}}.models.quantize import (
+    check_accuracy,
+    evaluate_accuracy,
+    quantize_model,
+    to_torchscript,
+)
+from {{cookiecutter.project_slug}}.models.torch.nets import MLPBlock, MLPClassifier
+from {{cookiecutter.project_slug}}.training.loops import build_trainer, fit
+from {{cookiecutter.project_slug}}.training.precision import maybe_check_precision_parity
+
+CONFIG_DIR = Path(__file__).resolve().parents[2] / "config"
+
+
+def test_deep_mlp_fused_and_checkpointed_paths_match() -> None:
+    cfg = OmegaConf.create(
+        {
+            "data": {"n_features": 12, "n_classes": 3},
+            "model": {"hidden_dim": 48, "num_layers": 3, "dropout": 0.2},
+        }
+    )
+    model = build_lightning_module(cfg).model
+    assert isinstance(model, MLPClassifier)
+    assert len(model.blocks) == 3 and model.head.in_features == 48
+
+    x, y = torch.randn(64, 12), torch.randint(0, 3, (64,))
+    grads = []
+    for fused, ckpt in [(False, False), (True, False), (True, True)]:
+        variant = MLPClassifier(12, 3, 48, 3, 0.2, fused=fused, checkpoint=ckpt)
+        variant.load_state_dict(model.state_dict())
+        torch.manual_seed(0)  # same dropout masks in every variant
+        loss = torch.nn.functional.cross_entropy(variant(x), y)
+        loss.backward()  # type: ignore[no-untyped-call]
+        grads.append(
+            torch.cat(
+                [cast(torch.Tensor, p.grad).flatten() for p in variant.parameters()]
+            )
+        )
+    for g in grads[1:]:
+        torch.testing.assert_close(g, grads[0])
+
+
+def test_torchscript_predictor_matches_eager_and_trains() -> None:
+    cfg = OmegaConf.create(
+        {
+            "data": {"n_features": 8, "n_classes": 3},
+            "model": {
+                "hidden_dim": 16,
+                "num_layers": 2,
+                "compile": {"backend": "torchscript", "warmup_batch_sizes": [1, 4]},
+            },
+        }
+    )
+    lm = build_lightning_module(cfg)
+    assert isinstance(lm.model, torch.jit.ScriptModule)
+    assert lm.warmup is not None
+    lm.warmup(lm.model, torch.device("cpu"))
+    assert all(p.grad is None for p in lm.model.parameters())
+
+    eager = MLPClassifier(8, 3, 16, 2).eval()
+    x = torch.randn(5, 8)
+    expected = Predictor(eager).predict_proba(x)
+    compiled = Predictor(MLPClassifier(8, 3, 16, 2))
+    compiled.model.load_state_dict(eager.state_dict())
+    compiled.compile(CompileConfig("torchscript", warmup_batch_sizes=(1, 5)), (8,))
+    torch.testing.assert_close(compiled.predict_proba(x), expected)
+
+
+def test_imagefolder_config_trains_the_mlp_on_uint8_images(tmp_path: Path) -> None:
+    Image = pytest.importorskip("PIL.Image")
+    for i in range(8):
+        cls = tmp_path / "images" / ("cat" if i % 2 else "dog")
+        cls.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(np.full((12, 12, 3), i * 30, dtype=np.uint8)).save(
+            cls / f"{i}.png"
+        )
+    overrides = [
+        "data=imagefolder",
+        f"data.path={tmp_path / 'images'}",
+        f"data.image.cache_dir={tmp_path / 'cache'}",
+        "data.image.size=8",
+        "data.image.n_jobs=1",
+        "data.split_cache_dir=null",
+        "data.stats_dir=null",
+        "data.num_workers=0",
+        "data.persistent_workers=false",
+        "data.batch_size=4",
+        "+data.val_frac=0.25",
+        "+data.test_frac=0.0",
+    ]
+    with initialize_config_dir(str(CONFIG_DIR), version_base=None):
+        cfg = compose("config", overrides=overrides)
+    dm = build_datamodule(cfg)
+    lm = build_lightning_module(cfg)
+    assert isinstance(lm.model, MLPClassifier)
+    block = lm.model.blocks[0]
+    assert isinstance(block, MLPBlock) and block.linear.in_features == 3 * 8 * 8
+
+    trainer = pl.Trainer(
+        max_steps=1,
+        limit_val_batches=1,
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+    )
+    trainer.fit(lm, datamodule=dm)
+    assert trainer.global_step == 1
+
+
+def test_optimizer_settings_come_from_the_model_config() -> None:
+    overrides = ["model.lr=0.05", "model.weight_decay=0.01"]
+    with initialize_config_dir(str(CONFIG_DIR), version_base=None):
+        cfg = compose("config", overrides=overrides)
+    lm = build_lightning_module(cfg)
+    assert (lm.lr, lm.weight_decay) == (0.05, 0.01)
+
+    legacy = OmegaConf.create(
+        {"data": {}, "model": {}, "trainer": {"lr": 0.2, "weight_decay": 0.1}}
+    )
+    lm = build_lightning_module(legacy)
+    assert (lm.lr, lm.weight_decay) == (0.2, 0.1)
+
+
+def test_serving_applies_the_training_batch_transform(tmp_path: Path) -> None:
+    cfg = OmegaConf.create(
+        {
+            "data": {
+                "n_features": 4,
+                "transforms_on": "device",
+                "transforms": [{"name": "log1p"}, {"name": "clip", "max": 2.0}],
+            },
+            "model": {"hidden_dim": 8},
+        }
+    )
+    lm = build_lightning_module(cfg)
+    x = torch.randn(6, 4) * 10
+    assert lm.batch_transform is not None
+    with torch.no_grad():
+        expected = lm.model.eval()(lm.batch_transform(x)).softmax(dim=-1)
+
+    served = Predictor.from_lightning_module(lm).predict_proba(x)
+    torch.testing.assert_close(served, expected)
+    path = tmp_path / "model.pt"
+    torch.jit.save(to_torchscript(lm.model, x[:1], lm.batch_transform), str(path))
+    torch.testing.assert_close(Predictor.load(path).predict_proba(x), expected)
+
+
+def test_int8_variants_pass_the_accuracy_gate_and_load(tmp_path: Path) -> None:
+    torch.manual_seed(0)
+    x = torch.randn(512, 8)
+    y = (x[:, 0] + x[:, 1] > 0).long()
+    model = MLPClassifier(8, 2, 32, 2)
+    opt = torch.optim.Adam(model.parameters(), lr=1e-2)
+    for _ in range(100):
+        opt.zero_grad()
+        loss = torch.nn.functional.cross_entropy(model(x), y)
+        loss.backward()  # type: ignore[no-untyped-call]
+        opt.step()
+    loader = [(x[i : i + 128], y[i : i + 128]) for i in range(0, 512, 128)]
+    fp32_acc = evaluate_accuracy(model.eval(), loader)
+    assert fp32_acc > 0.9
+
+    for method in ("dynamic", "static"):
+        qmodel = quantize_model(model, method, calibration=[x[:256]])
+        acc = evaluate_accuracy(qmodel, loader)
+        assert check_accuracy(fp32_acc, acc, max_drop=0.02)
+        assert not check_accuracy(fp32_acc, acc, max_drop=-1.0)
+        torch.jit.save(to_torchscript(qmodel, x[:1]), str(tmp_path / f"{method}.pt"))
+        served = Predictor.load(tmp_path / f"{method}.pt").predict_proba(x)
+        assert abs(float((served.argmax(1) == y).float().mean()) - acc) < 1e-6
+
+
+def test_pruning_and_low_rank_shrink_the_dense_model() -> None:
+    torch.manual_seed(0)
+    model = MLPClassifier(16, 3, 64, 2, activation="gelu").eval()
+    x = torch.randn(32, 16)
+    expected = model(x)
+
+    # Lossless settings reproduce the model exactly.
+    torch.testing.assert_close(prune_hidden_units(model, 1.0)(x), expected)
+    block = model.blocks[0]
+    assert isinstance(block, MLPBlock)
+    first = block.linear
+    full_rank = low_rank_linear(first, rank=16)
+    torch.testing.assert_close(full_rank(x), first(x), atol=1e-5, rtol=1e-5)
+
+    pruned = prune_hidden_units(model, 0.5)
+    assert pruned.head.in_features == 32 and pruned.blocks[0].activation == "gelu"
+    small, ranks = factorize_linears(pruned, energy=0.5)
+    assert ranks and all(r < 32 for r in ranks.values())
+    assert "head" not in ranks
+    base, cost = model_cost(model), model_cost(small)
+    assert cost.params < base.params / 2 and cost.flops_per_row < base.flops_per_row / 2
+    assert small(x).shape == (32, 3)
+    assert isinstance(to_torchscript(small, x[:1]), torch.jit.ScriptModule)
+
+
+def test_teacher_logits_are_cached_once_and_served_with_batches(tmp_path: Path) -> None:
+    cfg = OmegaConf.create(
+        {"data": {"n_features": 8, "n_classes": 3, "batch_size": 32}, "model": {}}
+    )
+    dm = build_datamodule(cfg)
+    assert isinstance(dm, ClassificationDataModule)
+    dm.setup("fit")
+    teacher = MLPClassifier(8, 3, 32).eval()
+    key = teacher_logits_key(teacher_version(teacher), dm.dataset_fingerprint())
+    path = cached_teacher_logits(tmp_path, key, teacher, dm.dataset, chunk_rows=100)
+    assert isinstance(dm.dataset, Sized)
+    x, _ = dm.dataset[np.arange(len(dm.dataset))]
+    with torch.no_grad():
+        expected = teacher(x)
+    torch.testing.assert_close(torch.from_numpy(np.load(path)), expected)
+    # A hit returns the stored logits without running the model again.
+    other = MLPClassifier(8, 3, 4)
+    assert cached_teacher_logits(tmp_path, key, other, dm.dataset) == path
+    torch.testing.assert_close(torch.from_numpy(np.load(path)), expected)
+
+    # Editing the device-side transform (e.g. `data.transforms` with
+    # `transforms_on: device`) misses and recomputes the logits.
+    log1p = build_batch_transform([{"name": "log1p"}])
+    clip = build_batch_transform([{"name": "clip", "min": -1.0, "max": 1.0}])
+    version = teacher_version(teacher)
+    log_key = teacher_logits_key(version, dm.dataset_fingerprint(), log1p)
+    clip_key = teacher_logits_key(version, dm.dataset_fingerprint(), clip)
+    assert len({key, log_key, clip_key}) == 3 and log1p is not None
+    log_path = cached_teacher_logits(tmp_path, log_key, teacher, dm.dataset, log1p)
+    assert log_path != path
+    with torch.no_grad():
+        torch.testing.assert_close(
+            torch.from_numpy(np.load(log_path)), teacher(log1p(x))
+        )
+
+    dm.soft_targets = str(path)
+    dm.setup("fit")  # Trainer.fit sets the datamodule up again
+    student = DistillationModule(MLPClassifier(8, 3, 16), temperature=2.0)
+    x, y, logits = student.on_after_batch_transfer(next(iter(dm.train_dataloader())), 0)
+    assert logits.shape == (len(y), 3)
+    with torch.no_grad():
+        torch.testing.assert_close(logits, teacher(x))
+    loss = distillation_loss(student(x), logits, y, temperature=2.0, alpha=0.5)
+    loss.backward()  # type: ignore[no-untyped-call]
+    hard = distillation_loss(student(x), logits, y, alpha=0.0)
+    torch.testing.assert_close(hard, torch.nn.functional.cross_entropy(student(x), y))
+
+
+def test_stacked_ensemble_matches_members_and_serves() -> None:
+    torch.manual_seed(0)
+    members = [MLPClassifier(8, 3, 16, 2, activation="silu").eval() for _ in range(5)]
+    x = torch.randn(7, 8)
+    with torch.no_grad():
+        probs = torch.stack([m(x).softmax(-1) for m in members]).mean(0)
+        mean_logits = torch.stack([m(x) for m in members]).mean(0)
+
+    predictor = Predictor.from_ensemble(members)
+    torch.testing.assert_close(predictor.predict_proba(x), probs)
+    logit_avg = StackedEnsemble(members, combine="logit").eval()
+    torch.testing.assert_close(logit_avg(x), mean_logits)
+    predictor.compile(CompileConfig("torchscript", warmup_batch_sizes=(1,)), (8,))
+    torch.testing.assert_close(predictor.predict_proba(x), probs)
+    with pytest.raises(ValueError):
+        StackedEnsemble(members + [MLPClassifier(8, 3, 32, 2)])
+
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxscript")
+    buf = io.BytesIO()
+    torch.onnx.export(
+        StackedEnsemble(members).eval(),
+        (x,),
+        buf,  # type: ignore[arg-type]
+        input_names=["input"],
+        output_names=["output"],
+        dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+    )
+    assert buf.getbuffer().nbytes > 0
+
+
+def test_trainer_config_is_passed_through_with_bf16_parity(tmp_path: Path) -> None:
+    cfg = OmegaConf.create(
+        {
+            "data": {"n_features": 8, "n_classes": 3, "batch_size": 32},
+            "model": {"hidden_dim": 16},
+            "trainer": {
+                "_target_": "pytorch_lightning.Trainer",
+                "max_epochs": 1,
+                "accelerator": "cpu",
+                "devices": 1,
+                "precision": "bf16-mixed",
+                "accumulate_grad_batches": 2,
+                "limit_train_batches": 4,
+                "limit_val_batches": 2,
+                "logger": False,
+                "enable_progress_bar": False,
+                "default_root_dir": str(tmp_path),
+                "lr": 1e-2,
+                "callbacks": {
+                    "model_checkpoint": {
+                        "_target_": "pytorch_lightning.callbacks.ModelCheckpoint",
+                        "dirpath": str(tmp_path),
+                        "save_last": True,
+                    },
+                    "early_stopping": None,
+                },
+                "precision_check": {"enabled": True},
+            },
+        }
+    )
+    dm, lm = build_datamodule(cfg), build_lightning_module(cfg)
+    trainer = fit(cfg, lightning_module=lm, datamodule=dm)
+    assert trainer.precision == "bf16-mixed"
+    assert trainer.global_step == 2  # 4 batches, 2 per optimizer step
+    assert (tmp_path / "last.ckpt").exists()
+
+    parity = maybe_check_precision_parity(cfg, trainer, dm, lm, out_dir=tmp_path)
+    val_dataset = dm.val_dataloader().dataset
+    assert parity is not None and isinstance(val_dataset, Sized)
+    assert parity.n_rows == len(val_dataset)
+    assert parity.argmax_agreement > 0.9 and parity.max_abs_logit_diff < 0.1
+    report = json.loads((tmp_path / "precision_parity.json").read_text())
+    assert report["precision"] == "bf16-mixed"
+
+    # No val rows (data.val_frac=0): the check is skipped instead of failing.
+    cfg.data.val_frac = 0.0
+    no_val = build_datamodule(cfg)
+    no_val.setup("fit")
+    assert maybe_check_precision_parity(cfg, trainer, no_val, lm) is None
+
+    cfg.trainer.max_epoch = 3  # typo: must not be silently ignored
+    with pytest.raises(ValueError, match="max_epoch"):
+        build_trainer(cfg)
+{%- endif %}